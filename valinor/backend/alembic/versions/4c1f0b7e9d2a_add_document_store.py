@@ -0,0 +1,53 @@
+"""Add documents and document_operations for the delta document store
+
+Revision ID: 4c1f0b7e9d2a
+Revises: 557064818aad
+Create Date: 2026-10-19 12:40:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4c1f0b7e9d2a"
+down_revision: Union[str, None] = "557064818aad"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("length", sa.Integer(), nullable=False),
+        sa.Column("snapshot", sa.Text(), nullable=False),
+        sa.Column("snapshot_version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("project_id"),
+    )
+    op.create_index(op.f("ix_documents_id"), "documents", ["id"], unique=False)
+    op.create_table(
+        "document_operations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("ops", sa.Text(), nullable=False),
+        sa.Column("client_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("document_id", "version", name="uq_document_operations_document_version"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("document_operations")
+    op.drop_index(op.f("ix_documents_id"), table_name="documents")
+    op.drop_table("documents")
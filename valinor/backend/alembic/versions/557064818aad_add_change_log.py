@@ -0,0 +1,37 @@
+"""Add change_log for the delta-sync feed
+
+Revision ID: 557064818aad
+Revises: 781369946af3
+Create Date: 2026-10-19 11:02:17.320945
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "557064818aad"
+down_revision: Union[str, None] = "781369946af3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_log",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("entity_type", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("operation", sa.String(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_change_log_project_id"), "change_log", ["project_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_change_log_project_id"), table_name="change_log")
+    op.drop_table("change_log")
@@ -0,0 +1,35 @@
+"""Add foreign key lookup indexes
+
+Revision ID: 781369946af3
+Revises: 2a277c9a871a
+Create Date: 2026-10-19 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "781369946af3"
+down_revision: Union[str, None] = "2a277c9a871a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_timeline_entries_project_id"), "timeline_entries", ["project_id"], unique=False)
+    op.create_index(op.f("ix_timeline_entries_responsible_id"), "timeline_entries", ["responsible_id"], unique=False)
+    op.create_index(op.f("ix_template_sections_template_id"), "template_sections", ["template_id"], unique=False)
+    op.create_index(op.f("ix_template_subtitles_section_id"), "template_subtitles", ["section_id"], unique=False)
+    # The composite primary key leads with user_id, so it cannot serve lookups by project.
+    op.create_index(op.f("ix_project_collaborators_project_id"), "project_collaborators", ["project_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_project_collaborators_project_id"), table_name="project_collaborators")
+    op.drop_index(op.f("ix_template_subtitles_section_id"), table_name="template_subtitles")
+    op.drop_index(op.f("ix_template_sections_template_id"), table_name="template_sections")
+    op.drop_index(op.f("ix_timeline_entries_responsible_id"), table_name="timeline_entries")
+    op.drop_index(op.f("ix_timeline_entries_project_id"), table_name="timeline_entries")
@@ -0,0 +1,43 @@
+"""Add full-text and trigram search indexes
+
+Revision ID: 9e3b5d21c7f4
+Revises: 4c1f0b7e9d2a
+Create Date: 2026-10-19 14:05:41.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e3b5d21c7f4"
+down_revision: Union[str, None] = "4c1f0b7e9d2a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, tsvector document, trigram column); documents must match app.models.search.
+SEARCH_INDEXES = (
+    ("templates", "(coalesce(name, '') || ' ') || coalesce(description, '')", "name"),
+    ("template_sections", "coalesce(title, '')", "title"),
+    ("template_subtitles", "coalesce(subtitle, '')", "subtitle"),
+    ("projects", "(coalesce(title, '') || ' ') || coalesce(description, '')", "title"),
+    (
+        "timeline_entries",
+        "(((coalesce(section, '') || ' ') || coalesce(subtitle, '')) || ' ') || coalesce(description, '')",
+        "section",
+    ),
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, document, title in SEARCH_INDEXES:
+        op.execute(f"CREATE INDEX ix_{table}_search ON {table} USING gin (to_tsvector('english'::regconfig, {document}))")
+        op.execute(f"CREATE INDEX ix_{table}_search_trgm ON {table} USING gin ({title} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    for table, _, _ in SEARCH_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_trgm")
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search")
@@ -0,0 +1,56 @@
+"""Add daily project and portfolio metric snapshots, index timeline entry dates
+
+Revision ID: a4d8e2f6c1b3
+Revises: f2b6d0c8a4e1
+Create Date: 2026-10-19 19:02:47.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d8e2f6c1b3"
+down_revision: Union[str, None] = "f2b6d0c8a4e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "project_metric_snapshots",
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("total_phases", sa.SmallInteger(), nullable=False),
+        sa.Column("completed_phases", sa.SmallInteger(), nullable=False),
+        sa.Column("in_progress_phases", sa.SmallInteger(), nullable=False),
+        sa.Column("upcoming_phases", sa.SmallInteger(), nullable=False),
+        sa.Column("completion_percentage", sa.SmallInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("project_id", "day"),
+    )
+    op.create_index(op.f("ix_project_metric_snapshots_day"), "project_metric_snapshots", ["day"], unique=False)
+    op.create_table(
+        "portfolio_metric_snapshots",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("projects", sa.Integer(), nullable=False),
+        sa.Column("total_phases", sa.Integer(), nullable=False),
+        sa.Column("completed_phases", sa.Integer(), nullable=False),
+        sa.Column("in_progress_phases", sa.Integer(), nullable=False),
+        sa.Column("upcoming_phases", sa.Integer(), nullable=False),
+        sa.Column("completion_percentage", sa.SmallInteger(), nullable=False),
+        sa.Column("change_cursor", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    # The incremental snapshot looks up entries starting / ending on one day.
+    op.create_index(op.f("ix_timeline_entries_start"), "timeline_entries", ["start"], unique=False)
+    op.create_index(op.f("ix_timeline_entries_end"), "timeline_entries", ["end"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_timeline_entries_end"), table_name="timeline_entries")
+    op.drop_index(op.f("ix_timeline_entries_start"), table_name="timeline_entries")
+    op.drop_table("portfolio_metric_snapshots")
+    op.drop_index(op.f("ix_project_metric_snapshots_day"), table_name="project_metric_snapshots")
+    op.drop_table("project_metric_snapshots")
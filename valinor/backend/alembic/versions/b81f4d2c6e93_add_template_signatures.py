@@ -0,0 +1,47 @@
+"""Add template_signatures and template_lsh_buckets for near-duplicate detection
+
+Revision ID: b81f4d2c6e93
+Revises: 9e3b5d21c7f4
+Create Date: 2026-10-19 15:02:47.530116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b81f4d2c6e93"
+down_revision: Union[str, None] = "9e3b5d21c7f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing templates are signed lazily by the duplicate report (GET /templates/duplicates).
+    op.create_table(
+        "template_signatures",
+        sa.Column("template_id", sa.Integer(), nullable=False),
+        sa.Column("signature", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(["template_id"], ["templates.id"]),
+        sa.PrimaryKeyConstraint("template_id"),
+    )
+    op.create_table(
+        "template_lsh_buckets",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("template_id", sa.Integer(), nullable=False),
+        sa.Column("band", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["template_id"], ["templates.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_template_lsh_buckets_band_bucket", "template_lsh_buckets", ["band", "bucket"], unique=False)
+    op.create_index(op.f("ix_template_lsh_buckets_template_id"), "template_lsh_buckets", ["template_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_template_lsh_buckets_template_id"), table_name="template_lsh_buckets")
+    op.drop_index("ix_template_lsh_buckets_band_bucket", table_name="template_lsh_buckets")
+    op.drop_table("template_lsh_buckets")
+    op.drop_table("template_signatures")
@@ -0,0 +1,28 @@
+"""Add a lease and an owner token to idempotency key claims
+
+Revision ID: c7e1a9d3f5b2
+Revises: a4d8e2f6c1b3
+Create Date: 2026-10-19 21:14:05.602117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e1a9d3f5b2"
+down_revision: Union[str, None] = "a4d8e2f6c1b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("idempotency_keys", sa.Column("claim_token", sa.String(length=32), nullable=True))
+    op.add_column("idempotency_keys", sa.Column("locked_until", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("idempotency_keys", "locked_until")
+    op.drop_column("idempotency_keys", "claim_token")
@@ -0,0 +1,28 @@
+"""Add projects.deleted_at for soft and bulk deletes
+
+Revision ID: d5a2c8e4f1b7
+Revises: b81f4d2c6e93
+Create Date: 2026-10-19 16:21:09.774205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a2c8e4f1b7"
+down_revision: Union[str, None] = "b81f4d2c6e93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("projects", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    op.create_index(op.f("ix_projects_deleted_at"), "projects", ["deleted_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_projects_deleted_at"), table_name="projects")
+    op.drop_column("projects", "deleted_at")
@@ -0,0 +1,40 @@
+"""Add archived_projects cold storage and index projects.deadline
+
+Revision ID: e7c3f9a1b2d6
+Revises: d5a2c8e4f1b7
+Create Date: 2026-10-19 17:05:33.201948
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7c3f9a1b2d6"
+down_revision: Union[str, None] = "d5a2c8e4f1b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_projects",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("template_id", sa.Integer(), nullable=False),
+        sa.Column("deadline", sa.Date(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_archived_projects_deadline"), "archived_projects", ["deadline"], unique=False)
+    # The archival job selects projects by deadline.
+    op.create_index(op.f("ix_projects_deadline"), "projects", ["deadline"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_projects_deadline"), table_name="projects")
+    op.drop_index(op.f("ix_archived_projects_deadline"), table_name="archived_projects")
+    op.drop_table("archived_projects")
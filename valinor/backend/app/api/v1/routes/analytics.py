@@ -0,0 +1,93 @@
+from datetime import date
+from typing import List, Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.schemas.analytics_schema import BurndownResponse, MetricTrendResponse, OnTimeResponse, WeeklyLoadResponse
+from app.services.analytics_service import get_burndown, get_on_time, get_weekly_load
+from app.services.metrics_snapshot_service import get_metric_trend, take_daily_snapshots
+
+router = APIRouter()
+
+PROJECT_IDS_DESCRIPTION = "Comma-separated project ids to restrict the analytics to (default: every project)."
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _parse_project_ids(project_ids: Optional[str]) -> Optional[List[int]]:
+    if project_ids is None:
+        return None
+    try:
+        return [int(value) for value in project_ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="project_ids must be comma-separated integers")
+
+
+def _numpy_json(content: dict) -> Response:
+    # Series are NumPy arrays; orjson encodes them natively.
+    return Response(orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY), media_type="application/json")
+
+
+@router.get("/burndown", response_model=BurndownResponse)
+def burndown_endpoint(
+    project_ids: Optional[str] = Query(None, description=PROJECT_IDS_DESCRIPTION),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    interval: str = Query("day", pattern="^(day|week)$"),
+    db: Session = Depends(get_db),
+):
+    """
+    Burn-up (entries started / completed) and burndown (entries remaining) per day or week.
+    Without `start` / `end` the series span the selected timelines.
+    """
+    step_days = 7 if interval == "week" else 1
+    return _numpy_json(get_burndown(db, _parse_project_ids(project_ids), start, end, step_days))
+
+
+@router.get("/weekly-load", response_model=WeeklyLoadResponse)
+def weekly_load_endpoint(
+    project_ids: Optional[str] = Query(None, description=PROJECT_IDS_DESCRIPTION),
+    start: Optional[date] = Query(None, description="A day in the first week (default: today)."),
+    weeks: int = Query(12, ge=1),
+    db: Session = Depends(get_db),
+):
+    """Timeline entries in progress per collaborator and week."""
+    return _numpy_json(get_weekly_load(db, _parse_project_ids(project_ids), start, weeks))
+
+
+@router.get("/on-time", response_model=OnTimeResponse)
+def on_time_endpoint(
+    project_ids: Optional[str] = Query(None, description=PROJECT_IDS_DESCRIPTION),
+    limit: int = Query(20, ge=0, le=1000, description="Number of late projects to list, latest first."),
+    db: Session = Depends(get_db),
+):
+    """Share of timeline entries and of projects finishing by the project deadline."""
+    return _numpy_json(get_on_time(db, _parse_project_ids(project_ids), limit))
+
+
+@router.post("/snapshots")
+def take_snapshots_endpoint(day: Optional[date] = None, db: Session = Depends(get_db)):
+    """
+    Appends the daily metrics snapshots up to `day` (default today; future days are
+    rejected). Meant to be called once a day by a scheduler; repeated calls for the same
+    day write nothing, and a long gap is filled a bounded number of days per call.
+    """
+    return {"days_written": take_daily_snapshots(db, day)}
+
+
+@router.get("/trend", response_model=MetricTrendResponse)
+def metric_trend_endpoint(
+    project_id: Optional[int] = Query(None, description="Project to chart (default: the whole portfolio)."),
+    start: Optional[date] = Query(None, description="First day (default: 89 days before end)."),
+    end: Optional[date] = Query(None, description="Last day (default: today)."),
+    db: Session = Depends(get_db),
+):
+    """Daily phase counts and completion percentage from the metrics snapshots."""
+    return get_metric_trend(db, project_id, start, end)
@@ -1,7 +1,57 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.schemas.document_schema import (
+    DocumentOperationRequest,
+    DocumentOperationResponse,
+    DocumentOperationsResponse,
+    DocumentResponse,
+)
+from app.services.archive_service import get_archived_document
+from app.services.document_service import apply_document_operation, get_document, get_document_operations
 
 router = APIRouter()
 
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 @router.get("/")
 async def get_document_status():
     return {"message": "Document editing service is running"}
+
+
+@router.get("/{project_id}", response_model=DocumentResponse)
+def get_document_endpoint(project_id: int, db: Session = Depends(get_db)):
+    """Returns the project's document text and the version it corresponds to (read-only for archived projects)."""
+    try:
+        return get_document(project_id, db)
+    except HTTPException as e:
+        archived = get_archived_document(project_id, db) if e.status_code == 404 else None
+        if archived is None:
+            raise
+        return archived
+
+
+@router.get("/{project_id}/operations", response_model=DocumentOperationsResponse)
+def get_document_operations_endpoint(
+    project_id: int,
+    since: int = Query(..., ge=0, description="Last version the client has applied."),
+    db: Session = Depends(get_db),
+):
+    """Operations applied after `since`, for clients catching up without reloading the document."""
+    return get_document_operations(project_id, since, db)
+
+
+@router.post("/{project_id}/operations", response_model=DocumentOperationResponse)
+def apply_document_operation_endpoint(project_id: int, request: DocumentOperationRequest, db: Session = Depends(get_db)):
+    """
+    Applies an edit made against `base_version`. Edits made concurrently by others are merged
+    in; the response carries the operation as applied and the new version.
+    """
+    return apply_document_operation(project_id, request, db)
@@ -1,11 +1,29 @@
 from fastapi import APIRouter
-from pydantic import BaseModel
-from app.services.latex_service import generate_latex_from_text
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from app.services.latex_service import generate_latex_batch, generate_latex_from_text, generate_latex_incremental
 
 router = APIRouter()
 
 class TextRequest(BaseModel):
     content: str
+    # Convert paragraph by paragraph, reusing cached LaTeX for paragraphs converted before.
+    incremental: bool = False
+
+
+class BatchTextRequest(BaseModel):
+    contents: List[str] = Field(..., min_length=1, max_length=100)
+
+
+class BatchItemResponse(BaseModel):
+    index: int
+    latex: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchTextResponse(BaseModel):
+    results: List[BatchItemResponse]
 
 @router.get("/")
 async def get_latex_status():
@@ -13,6 +31,24 @@ async def get_latex_status():
 
 @router.post("/generate")
 async def generate_latex(request: TextRequest):
-    """API route to convert text to LaTeX."""
-    latex_code = generate_latex_from_text(request.content)
+    """
+    API route to convert text to LaTeX.
+
+    With `incremental`, only paragraphs that changed since an earlier conversion are sent
+    to the model; the response also reports how many fragments were converted and reused.
+    """
+    # The conversion blocks on the OpenAI client, so keep it off the event loop.
+    if request.incremental:
+        return await run_in_threadpool(generate_latex_incremental, request.content)
+    latex_code = await run_in_threadpool(generate_latex_from_text, request.content)
     return {"latex": latex_code}
+
+
+@router.post("/generate-batch", response_model=BatchTextResponse)
+async def generate_latex_batch_endpoint(request: BatchTextRequest):
+    """
+    Converts many text blocks in one request, in parallel, so the latency approaches that of
+    the slowest block. Results keep the input order; failed blocks report an error.
+    """
+    results = await run_in_threadpool(generate_latex_batch, request.contents)
+    return {"results": results}
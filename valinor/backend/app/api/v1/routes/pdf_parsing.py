@@ -1,4 +1,5 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.services.pdf_service import parse_pdf, generate_template
 
 router = APIRouter()
@@ -8,23 +9,34 @@ async def get_parsing_status():
     return {"message": "Welcome to the parsing endpoints"}
 
 @router.post("/parse")
-async def parse_pdf_endpoint(file: UploadFile = File(...)):
+async def parse_pdf_endpoint(file: UploadFile = File(...), reuse_duplicates: bool = False):
     """
     API endpoint to parse an uploaded PDF.
     Args:
         file (UploadFile): The uploaded PDF file.
+        reuse_duplicates (bool): Return an existing near-identical template instead of creating one.
     Returns:
-        dict: Parsed PDF information (filename, page count, extracted text).
+        dict: The template under "data", whether it was reused, and near-duplicate templates
+        already in the catalog (offered for reuse).
     """
     try:
         print("Starting PDF parsing")
         contents = await file.read()
-        parsed_data = parse_pdf(contents, file.filename)  # Calls service function
+        # Parsing and template generation block (PyPDF2, OpenAI), so keep them off the event loop.
+        parsed_data = await run_in_threadpool(parse_pdf, contents, file.filename)  # Calls service function
 
-        template_object = generate_template(parsed_data["content"], file.filename)
+        result = await run_in_threadpool(
+            generate_template,
+            parsed_data["content"],
+            file.filename,
+            parsed_data["structure"],
+            reuse_duplicates=reuse_duplicates,
+        )
 
         return {
-            "data": template_object
+            "data": result["template"],
+            "reused": result["reused"],
+            "duplicates": result["duplicates"],
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,20 +1,37 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.services.project_service import (
+    bulk_delete_projects,
     create_project,
     delete_project_by_id,
     get_projects_overview,
-    get_project_full,
+    get_project_json,
     get_project_metrics,
+    get_project_changes,
+    purge_deleted_projects_in_background,
 )
 
+from app.core.broker import get_broker
+from app.services.archive_service import (
+    archive_completed_projects,
+    get_archived_project,
+    get_archived_project_metrics,
+    get_archived_projects,
+)
+from app.services.change_log_service import current_cursor
+from app.services.push_service import sse_events, subscription_project_ids, websocket_events
 from app.services.timeline_service import (
     generate_project_timeline,
 )
 
 from app.schemas.project_schema import (
+    BulkDeleteProjectsRequest,
+    BulkDeleteProjectsResponse,
+    ChangesResponse,
     CreateProjectRequest,
     GenerateTimelineRequest,
     GeneratedTimelineEntryResponse,
@@ -46,21 +63,129 @@ def create_project_endpoint(request: CreateProjectRequest, db: Session = Depends
     return create_project(request, db)
 
 
+@router.post("/bulk-delete", response_model=BulkDeleteProjectsResponse)
+def bulk_delete_projects_endpoint(
+    request: BulkDeleteProjectsRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
+    """
+    Deletes many projects at once. They are hidden from every read immediately; their rows
+    are purged in small batches after the response is sent.
+    """
+    result = bulk_delete_projects(request.project_ids, db)
+    if result["deleted"]:
+        background_tasks.add_task(purge_deleted_projects_in_background)
+    return ORJSONResponse(result)
+
+
+@router.post("/archive")
+def archive_projects_endpoint(
+    retention_days: Optional[int] = Query(None, ge=0, description="Archive projects whose deadline passed more than this many days ago."),
+    db: Session = Depends(get_db),
+):
+    """Moves completed projects out of the hot tables; they stay readable through the project endpoints."""
+    return {"archived": archive_completed_projects(db, retention_days)}
+
+
+FIELDS_DESCRIPTION = "Comma-separated response fields, e.g. id,title,start_date,deadline (id is always returned)."
+INCLUDE_DESCRIPTION = "Comma-separated relations to load: timeline, collaborators."
+
+
 @router.get("/get-projects-overview", response_model=list[ProjectResponse])
-def get_projects(db: Session = Depends(get_db)):
-    """Retrieve all projects."""
-    return get_projects_overview(db)
+def get_projects(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    include_archived: bool = Query(False, description="Append archived projects (read from cold storage)."),
+    db: Session = Depends(get_db),
+):
+    """
+    Retrieve all projects. Without `fields` / `include` every field and relation is returned.
+
+    The X-Change-Cursor header is the `since` value for /project/changes to keep this snapshot in sync.
+    """
+    cursor = current_cursor(db)
+    # Built from row tuples in the service; returning the response directly skips response_model re-validation.
+    projects = get_projects_overview(db, fields, include)
+    if include_archived:
+        projects += get_archived_projects(db, fields, include)
+    return ORJSONResponse(projects, headers={"X-Change-Cursor": str(cursor)})
+
+
+@router.get("/changes", response_model=ChangesResponse)
+def get_changes(
+    since: int = Query(0, ge=0, description="Cursor returned by the previous call (0 for a full sync)."),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Project and timeline rows created, updated or deleted after `since`, including tombstones."""
+    return ORJSONResponse(get_project_changes(since, db, limit))
+
+
+PROJECTS_DESCRIPTION = "Comma-separated project ids to follow."
+USER_DESCRIPTION = "Collaborator email: follow all of this user's projects, including ones they are added to later."
+
+
+@router.get("/events")
+async def stream_project_events(
+    projects: Optional[str] = Query(None, description=PROJECTS_DESCRIPTION),
+    user: Optional[str] = Query(None, description=USER_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
+    """
+    Server-Sent Events stream of project and timeline changes.
+
+    Each `change` event names the changed rows; fetch them (or call /project/changes) to update.
+    An event marked `truncated` was too large to relay in full and lists only project-level
+    changes; read the rest from /project/changes starting at its `since` cursor.
+    A `dropped` event means the client fell behind and must resync before reconnecting.
+    """
+    project_ids = await run_in_threadpool(subscription_project_ids, db, projects, user)
+    # Release the connection now; the stream can stay open for hours.
+    db.close()
+    subscription = get_broker().subscribe(project_ids, user)
+    return StreamingResponse(
+        sse_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def project_events_websocket(
+    websocket: WebSocket,
+    projects: Optional[str] = Query(None, description=PROJECTS_DESCRIPTION),
+    user: Optional[str] = Query(None, description=USER_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
+    """WebSocket variant of /project/events; clients may send {"subscribe": [ids]} / {"unsubscribe": [ids]}."""
+    try:
+        project_ids = await run_in_threadpool(subscription_project_ids, db, projects, user)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    finally:
+        db.close()
+    await websocket.accept()
+    await websocket_events(websocket, get_broker().subscribe(project_ids, user))
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
-def get_project(project_id: int, db: Session = Depends(get_db)):
+def get_project(
+    project_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
     """
-    Retrieve full details for a single project.
+    Retrieve full details for a single project, or only the parts selected with `fields` / `include`.
     """
-    project = get_project_full(project_id, db)
-    if not project:
+    # Serialized by the database in one statement; the bytes are sent as they are.
+    project = get_project_json(project_id, db, fields, include)
+    if project is not None:
+        return Response(project, media_type="application/json")
+    archived = get_archived_project(project_id, db, fields, include)
+    if archived is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    return ORJSONResponse(archived)
 
 
 @router.post("/generate-timeline", response_model=List[GeneratedTimelineEntryResponse])
@@ -72,6 +197,8 @@ def generate_timeline_endpoint(request: GenerateTimelineRequest, db: Session = D
 @router.get("/{project_id}/metrics", response_model=ProjectMetricsResponse)
 def get_project_metrics_endpoint(project_id: int, db: Session = Depends(get_db)):
     metrics = get_project_metrics(project_id, db)
+    if metrics is None:
+        metrics = get_archived_project_metrics(project_id, db)
     if metrics is None:
         raise HTTPException(status_code=404, detail="Project not found")
     return metrics
@@ -0,0 +1,29 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.schemas.search_schema import SearchResponse
+from app.services.search_service import SEARCH_TYPES, search
+
+router = APIRouter()
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@router.get("/", response_model=SearchResponse)
+def search_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms."),
+    types: Optional[str] = Query(None, description=f"Comma-separated result types: {', '.join(SEARCH_TYPES)}."),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_db),
+):
+    """Ranked search across templates, sections, subtitles, projects and timeline entries."""
+    return ORJSONResponse(search(db, q, types, limit, offset))
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
-from app.services.template_service import get_all_templates, get_template_by_id
+from app.core.compression import payload_response
+from app.services.template_dedup_service import backfill_template_signatures, duplicate_report
+from app.services.template_service import get_template_catalog, get_template_json
 from app.schemas.project_schema import ProjectResponse, TemplateResponse
 
 router = APIRouter()
@@ -16,15 +19,29 @@ def get_db():
 
 
 @router.get("/get-all-templates", response_model=list[TemplateResponse])
-def get_templates(db: Session = Depends(get_db)):
-    """Fetch all available templates."""
-    return get_all_templates(db)
+def get_templates(request: Request, db: Session = Depends(get_db)):
+    """Fetch all available templates (cached, precompressed JSON)."""
+    return payload_response(request, get_template_catalog(db))
+
+
+@router.get("/duplicates")
+def get_duplicate_templates(
+    threshold: Optional[float] = Query(None, ge=0.0, le=1.0), db: Session = Depends(get_db)
+):
+    """Report groups of near-duplicate templates in the catalog (signed templates only)."""
+    return duplicate_report(db, threshold)
+
+
+@router.post("/signatures/backfill")
+def backfill_signatures(db: Session = Depends(get_db)):
+    """Sign templates created before signatures were stored, so duplicate reports include them."""
+    return {"signed": backfill_template_signatures(db)}
 
 
 @router.get("/{template_id}", response_model=TemplateResponse)
 def get_template(template_id: int, db: Session = Depends(get_db)):
-    """Fetch a template by ID."""
-    template = get_template_by_id(template_id, db)
-    if not template:
+    """Fetch a template by ID (serialized by the database in one statement)."""
+    template = get_template_json(template_id, db)
+    if template is None:
         raise HTTPException(status_code=404, detail="Template not found")
-    return template
+    return Response(template, media_type="application/json")
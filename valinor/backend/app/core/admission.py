@@ -0,0 +1,161 @@
+"""
+Admission control for HTTP requests.
+
+Routes are grouped into classes (LLM calls, PDF parsing, database reads), and each class
+gets its own `AdmissionPool`: at most `limit` requests run at once and at most
+`queue_size` wait behind them. When both are full the request is refused straight away
+with 503 and a Retry-After estimated from the pool's recent service times; a queued
+request that waits longer than `queue_timeout` is refused the same way. A burst of slow
+generation requests therefore fills the LLM pool only, and reads keep their own slots.
+
+Admitted requests must also get a worker thread (sync routes and dependencies run on
+Starlette's threadpool), so the middleware sizes the shared thread limiter to cover every
+pool; threads are then never the point where one class queues behind another.
+"""
+
+import asyncio
+import math
+import time
+from typing import Dict, Iterable, Optional
+import anyio.to_thread
+from app.core.metrics import ADMISSION_QUEUE_WAIT, ADMISSION_REJECTED
+
+# Weight of the newest sample in the pool's moving average of service time.
+SERVICE_TIME_SMOOTHING = 0.2
+MAX_RETRY_AFTER = 60
+
+
+class PoolSaturated(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+
+
+class AdmissionPool:
+    """A concurrency limit with a bounded, time-limited wait queue."""
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.service_time = 1.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: the queue ahead drains `limit` requests per service time."""
+        estimate = self.service_time * (self.waiting + 1) / self.limit
+        return min(MAX_RETRY_AFTER, max(1, math.ceil(estimate)))
+
+    async def acquire(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        if self.active >= self.limit and self.waiting >= self.queue_size:
+            ADMISSION_REJECTED.inc(self.name, "queue_full")
+            raise PoolSaturated(self.retry_after())
+
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            ADMISSION_REJECTED.inc(self.name, "timeout")
+            raise PoolSaturated(self.retry_after())
+        finally:
+            self.waiting -= 1
+        ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - start, self.name)
+        self.active += 1
+
+    def release(self, elapsed: float):
+        self.active -= 1
+        self.service_time += SERVICE_TIME_SMOOTHING * (elapsed - self.service_time)
+        self._semaphore.release()
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware admitting HTTP requests through the pool of their route class.
+
+    Args:
+        pools: The pools, by name.
+        routes: Exact request paths mapped to a pool name.
+        default_pool: Pool for every other path (None lets them through unlimited).
+        exempt: Paths never limited, such as long-lived event streams.
+    """
+
+    def __init__(
+        self,
+        app,
+        pools: Iterable[AdmissionPool],
+        routes: Dict[str, str],
+        default_pool: Optional[str] = None,
+        exempt: Iterable[str] = (),
+    ):
+        self.app = app
+        self.pools = {pool.name: pool for pool in pools}
+        self.routes = {path: self.pools[name] for path, name in routes.items()}
+        self.default_pool = self.pools[default_pool] if default_pool else None
+        self.exempt = set(exempt)
+        self._threads_sized = False
+
+    def _size_thread_limiter(self):
+        # An admitted request can hold two threads at once (a sync dependency and the endpoint).
+        needed = 2 * sum(pool.limit for pool in self.pools.values())
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = max(limiter.total_tokens, needed)
+        self._threads_sized = True
+
+    def _pool_for(self, scope) -> Optional[AdmissionPool]:
+        path = scope["path"]
+        if scope["method"] == "OPTIONS" or path in self.exempt:
+            return None
+        return self.routes.get(path, self.default_pool)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if not self._threads_sized:
+            self._size_thread_limiter()
+        pool = self._pool_for(scope)
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await pool.acquire()
+        except PoolSaturated as e:
+            body = b'{"detail":"Server is busy, retry later"}'
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(e.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        start = time.perf_counter()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                pool.release(time.perf_counter() - start)
+
+        async def send_then_release(message):
+            await send(message)
+            # The slot is held until the response is sent, not until background tasks
+            # (which run after it, inside the app call) have finished.
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                release()
+
+        try:
+            await self.app(scope, receive, send_then_release)
+        finally:
+            release()
@@ -0,0 +1,237 @@
+"""
+Fan-out of change events to push subscribers (SSE / WebSocket clients).
+
+`InProcessBroker` delivers events published by any thread to subscribers in this
+process. `PostgresNotifyBroker` relays events through PostgreSQL LISTEN/NOTIFY so
+every worker sharing the database fans them out to its own subscribers. Pick one
+with the EVENT_BROKER setting ("memory" or "postgres").
+
+NOTIFY payloads are limited to 8000 bytes, so an event too large for one (a project
+created with hundreds of timeline entries, say) is relayed in a compact form: the
+project, its project-level changes and `truncated: true`, with `since` telling the
+client where to read the full set of changes from /project/changes.
+
+Each subscriber owns a bounded queue. A subscriber that falls behind is dropped
+(it receives a final None) rather than slowing down publishers or other clients;
+it is expected to resync through /project/changes and reconnect.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Iterable, Optional, Set
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+NOTIFY_PAYLOAD_LIMIT = 8000
+
+
+def notify_payload(event: dict) -> str:
+    """
+    JSON payload relaying `event` through NOTIFY, compacted when the full event is too large.
+
+    The compact event keeps the project id, the project-level changes and the change-log
+    cursor `since`; timeline changes are left for the client to read from /project/changes.
+    Collaborator emails are kept when they still fit, so "all my projects" subscribers
+    keep following projects they were added to.
+    """
+    payload = json.dumps(event, default=str)
+    if len(payload.encode()) < NOTIFY_PAYLOAD_LIMIT:
+        return payload
+    compact = {
+        "project_id": event["project_id"],
+        "since": event.get("since"),
+        "truncated": True,
+        "changes": [change for change in event.get("changes", ()) if change["entity"] == "project"],
+    }
+    if "collaborators" in event:
+        with_collaborators = json.dumps({**compact, "collaborators": event["collaborators"]}, default=str)
+        if len(with_collaborators.encode()) < NOTIFY_PAYLOAD_LIMIT:
+            return with_collaborators
+        logger.warning("Change event for project %s relayed without its collaborators", event["project_id"])
+    return json.dumps(compact, default=str)
+
+
+class Subscription:
+    """
+    A client's interest in a set of projects, plus its bounded event queue.
+
+    Attributes:
+        project_ids (set): Projects whose events are delivered.
+        user_email (str, optional): When set, projects this user is added to are followed automatically.
+        dropped (bool): True once the queue overflowed; no further events are delivered.
+    """
+
+    def __init__(self, project_ids: Iterable[int], user_email: Optional[str], maxsize: int):
+        self.project_ids: Set[int] = set(project_ids)
+        self.user_email = user_email
+        self.dropped = False
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = asyncio.get_running_loop()
+
+    def _matches(self, event: dict) -> bool:
+        project_id = event["project_id"]
+        if project_id in self.project_ids:
+            return True
+        if self.user_email is not None and self.user_email in event.get("collaborators", ()):
+            self.project_ids.add(project_id)
+            return True
+        return False
+
+    def offer(self, event: dict):
+        """Queues `event` if it concerns this subscription. Runs on the subscriber's event loop."""
+        if self.dropped or not self._matches(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self) -> Optional[dict]:
+        """Next event, or None once the subscription has been dropped."""
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    """Delivers published events to the subscriptions of this process."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, project_ids: Iterable[int], user_email: Optional[str] = None) -> Subscription:
+        """Registers a subscription; must be called from the event loop that will consume it."""
+        subscription = Subscription(project_ids, user_email, self.queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event: dict):
+        """Thread-safe: hands `event` to each subscriber's loop without waiting for delivery."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if not subscription.dropped:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.offer, event)
+                except RuntimeError:
+                    # The subscriber's loop has shut down.
+                    self.unsubscribe(subscription)
+
+
+class PostgresNotifyBroker(InProcessBroker):
+    """
+    Relays events between workers with PostgreSQL LISTEN/NOTIFY.
+
+    `publish` sends a NOTIFY; a background thread in every worker (this one included)
+    LISTENs and fans the payload out locally, so each event is delivered exactly once
+    per subscriber regardless of which worker produced it.
+    """
+
+    CHANNEL = "valinor_changes"
+
+    def __init__(self, engine, queue_size: int = 100):
+        super().__init__(queue_size)
+        self.engine = engine
+        self._publish_lock = threading.Lock()
+        self._publish_conn = None
+        self._listen_conn = None
+        self._closed = threading.Event()
+        threading.Thread(target=self._listen, name="change-event-listener", daemon=True).start()
+
+    def _connect(self):
+        # Detached from the pool: an autocommit connection must never be handed to a request Session.
+        fairy = self.engine.raw_connection()
+        fairy.detach()
+        conn = fairy.dbapi_connection
+        conn.autocommit = True
+        return conn
+
+    @staticmethod
+    def _close_quietly(conn):
+        if conn is not None and not conn.closed:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """Stops the listener and closes both dedicated connections."""
+        self._closed.set()
+        with self._publish_lock:
+            self._close_quietly(self._publish_conn)
+            self._publish_conn = None
+        self._close_quietly(self._listen_conn)
+
+    def publish(self, event: dict):
+        payload = notify_payload(event)
+        with self._publish_lock:
+            try:
+                if self._publish_conn is None or self._publish_conn.closed:
+                    self._publish_conn = self._connect()
+                with self._publish_conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (self.CHANNEL, payload))
+            except Exception:
+                logger.exception("Failed to publish change event")
+                self._close_quietly(self._publish_conn)
+                self._publish_conn = None
+
+    def _listen(self):
+        while not self._closed.is_set():
+            try:
+                conn = self._listen_conn = self._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.CHANNEL}")
+                while not self._closed.is_set():
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        super().publish(json.loads(notify.payload))
+            except Exception:
+                if self._closed.is_set():
+                    return
+                logger.exception("Change event listener failed; reconnecting")
+                self._close_quietly(self._listen_conn)
+                self._closed.wait(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> InProcessBroker:
+    """Returns the process-wide broker selected by settings.EVENT_BROKER, creating it on first use."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                if settings.EVENT_BROKER == "postgres":
+                    from app.db.session import engine
+
+                    _broker = PostgresNotifyBroker(engine, settings.PUSH_QUEUE_SIZE)
+                else:
+                    _broker = InProcessBroker(settings.PUSH_QUEUE_SIZE)
+    return _broker
+
+
+def close_broker():
+    """Releases the broker's database connections, if it holds any (call on shutdown)."""
+    global _broker
+    with _broker_lock:
+        if isinstance(_broker, PostgresNotifyBroker):
+            _broker.close()
+        _broker = None
@@ -0,0 +1,173 @@
+"""
+Response compression helpers.
+
+- `CompressedPayload` holds a serialized body together with precomputed gzip and
+  brotli variants, so cached responses are compressed once instead of per request.
+- `payload_response` picks the variant a client accepts (and answers If-None-Match).
+- `CompressionMiddleware` compresses other JSON responses on the fly above a size threshold.
+
+Brotli is optional: without the `brotli` package only gzip is offered.
+"""
+
+import gzip
+import hashlib
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Returns the preferred supported encoding allowed by an Accept-Encoding header, or None."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    for encoding in SUPPORTED_ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class CompressedPayload:
+    """
+    A serialized response body with its compressed variants.
+
+    Attributes:
+        body (bytes): The uncompressed body.
+        media_type (str): Content type of the body.
+        etag (str): Strong validator derived from the body.
+        variants (dict): Encoded body per content encoding ("gzip", "br").
+    """
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.body = body
+        self.media_type = media_type
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        # Built once per payload, so spend the CPU on the best ratio.
+        self.variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body, quality=11)
+
+
+def payload_response(request: Request, payload: CompressedPayload) -> Response:
+    """Serves `payload` in the best encoding the client accepts, or 304 when its ETag matches."""
+    headers = {"ETag": payload.etag, "Vary": "Accept-Encoding"}
+    if payload.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding in payload.variants:
+        headers["Content-Encoding"] = encoding
+        return Response(payload.variants[encoding], media_type=payload.media_type, headers=headers)
+    return Response(payload.body, media_type=payload.media_type, headers=headers)
+
+
+def _compressor(encoding: str):
+    if encoding == "br":
+        return brotli.Compressor(quality=4)
+    return zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+
+
+class _StreamCompressor:
+    """Uniform compress/flush interface over brotli and zlib streaming compressors."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self._compressor = _compressor(encoding)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish() if self.encoding == "br" else self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing JSON responses of at least `minimum_size` bytes.
+
+    Responses that already carry a Content-Encoding (such as precompressed payloads)
+    and non-JSON responses pass through untouched. Streamed bodies are compressed
+    incrementally.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_StreamCompressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                passthrough = "content-encoding" in headers or "json" not in headers.get("content-type", "")
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                headers = MutableHeaders(raw=list(start_message.get("headers", [])))
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = _StreamCompressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    body = compressor.compress(body)
+                else:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                await send({**start_message, "headers": headers.raw})
+                start_message = None
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
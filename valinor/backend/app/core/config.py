@@ -7,6 +7,74 @@ load_dotenv()
 class Config:
     DATABASE_URL = os.getenv("DATABASE_URL")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+    # Statement shapes executed more often than this in one request are logged as likely N+1 loops.
+    SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "10"))
+    # JSON responses smaller than this (bytes) are sent uncompressed.
+    COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+
+    # LLM scheduler budgets and retry policy
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+
+    # Push channel: "memory" fans out within one process, "postgres" relays across workers via LISTEN/NOTIFY.
+    EVENT_BROKER = os.getenv("EVENT_BROKER", "memory")
+    # Events buffered per subscriber before it is considered too slow and dropped.
+    PUSH_QUEUE_SIZE = int(os.getenv("PUSH_QUEUE_SIZE", "100"))
+    PUSH_HEARTBEAT_SECONDS = float(os.getenv("PUSH_HEARTBEAT_SECONDS", "15"))
+
+    # A document's full text is re-snapshotted after this many operations; loads replay at most this many.
+    DOCUMENT_SNAPSHOT_INTERVAL = int(os.getenv("DOCUMENT_SNAPSHOT_INTERVAL", "100"))
+
+    # Parallel LLM calls per LaTeX conversion, and paragraphs whose conversion is kept in memory.
+    LATEX_MAX_CONCURRENCY = int(os.getenv("LATEX_MAX_CONCURRENCY", "8"))
+    LATEX_FRAGMENT_CACHE_SIZE = int(os.getenv("LATEX_FRAGMENT_CACHE_SIZE", "4096"))
+    # Rule-based conversions at or above this confidence skip the LLM (set above 1 to always use the LLM).
+    LATEX_FAST_PATH_MIN_CONFIDENCE = float(os.getenv("LATEX_FAST_PATH_MIN_CONFIDENCE", "0.9"))
+
+    # Estimated Jaccard similarity of section/subtitle titles above which templates count as duplicates.
+    TEMPLATE_DUPLICATE_THRESHOLD = float(os.getenv("TEMPLATE_DUPLICATE_THRESHOLD", "0.8"))
+
+    # Soft-deleted projects purged per transaction, and the pause between transactions (seconds).
+    PROJECT_PURGE_BATCH_SIZE = int(os.getenv("PROJECT_PURGE_BATCH_SIZE", "50"))
+    PROJECT_PURGE_PAUSE_SECONDS = float(os.getenv("PROJECT_PURGE_PAUSE_SECONDS", "0.05"))
+
+    # Projects whose deadline passed more than this many days ago are moved to archived_projects.
+    PROJECT_ARCHIVE_RETENTION_DAYS = int(os.getenv("PROJECT_ARCHIVE_RETENTION_DAYS", "365"))
+    PROJECT_ARCHIVE_BATCH_SIZE = int(os.getenv("PROJECT_ARCHIVE_BATCH_SIZE", "100"))
+
+    # Prompt token budgets per LLM call site; longer free text (document text, project
+    # descriptions) is summarized to its outline, then truncated, to fit.
+    LLM_PROMPT_BUDGET_TIMELINE = int(os.getenv("LLM_PROMPT_BUDGET_TIMELINE", "3000"))
+    LLM_PROMPT_BUDGET_PDF_TEMPLATE = int(os.getenv("LLM_PROMPT_BUDGET_PDF_TEMPLATE", "6000"))
+
+    # Longest series (days or weeks) the analytics endpoints return.
+    ANALYTICS_MAX_POINTS = int(os.getenv("ANALYTICS_MAX_POINTS", "3660"))
+
+    # Days one metrics snapshot run may catch up on after the job was not run for a while.
+    METRIC_SNAPSHOT_MAX_BACKFILL_DAYS = int(os.getenv("METRIC_SNAPSHOT_MAX_BACKFILL_DAYS", "31"))
+
+    # Admission control: concurrent requests and queued requests per route class (LLM calls, PDF
+    # parsing, everything else reading or writing the database); queued requests give up after
+    # ADMISSION_QUEUE_TIMEOUT_SECONDS. Saturated pools answer 503 with Retry-After.
+    ADMISSION_LLM_CONCURRENCY = int(os.getenv("ADMISSION_LLM_CONCURRENCY", "8"))
+    ADMISSION_LLM_QUEUE_SIZE = int(os.getenv("ADMISSION_LLM_QUEUE_SIZE", "16"))
+    ADMISSION_PDF_CONCURRENCY = int(os.getenv("ADMISSION_PDF_CONCURRENCY", "4"))
+    ADMISSION_PDF_QUEUE_SIZE = int(os.getenv("ADMISSION_PDF_QUEUE_SIZE", "8"))
+    ADMISSION_DB_CONCURRENCY = int(os.getenv("ADMISSION_DB_CONCURRENCY", "16"))
+    ADMISSION_DB_QUEUE_SIZE = int(os.getenv("ADMISSION_DB_QUEUE_SIZE", "64"))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10"))
+
+    # Stored responses for Idempotency-Key retries are kept this long (seconds), and a duplicate
+    # of a request still in progress waits up to IDEMPOTENCY_WAIT_SECONDS for its response.
+    # A running request renews its claim's lease; a claim whose lease ran out (its worker
+    # died) is taken over after IDEMPOTENCY_LEASE_SECONDS.
+    IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "120"))
+    IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "30"))
 
 
 settings = Config()
\ No newline at end of file
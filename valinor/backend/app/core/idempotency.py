@@ -0,0 +1,314 @@
+"""
+Idempotency-Key support for non-idempotent POST endpoints.
+
+The first request with a given key claims it (a row in idempotency_keys), runs, and
+stores its response. A retry with the same key and the same request gets the stored
+response back (marked with `Idempotent-Replayed: true`) without running the endpoint
+again; a duplicate arriving while the first request is still running waits for it.
+Reusing a key for a different request is rejected with 422. Failed attempts (exceptions
+and 5xx responses) release the key so the client can retry. Keys expire after a TTL.
+
+A claim is also a lease, renewed by a heartbeat for as long as its request runs. When
+the heartbeat stops without a response (the worker died mid-request, say), the lease
+runs out and the next request with the same key takes the claim over instead of waiting
+for the TTL. Every claim carries a random token, and only its holder can complete or
+release it, so a request whose claim was taken over cannot touch the new holder's row.
+
+Claims live in the database, so duplicates are caught across workers as well.
+"""
+
+import asyncio
+import hashlib
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+import orjson
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from app.models.idempotency import IdempotencyKey
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+MAX_KEY_LENGTH = 255
+# Expired keys are deleted at most this often (seconds) per process.
+PURGE_INTERVAL = 300
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def request_hash(method: str, path: str, content_type: Optional[str], body: bytes) -> str:
+    """
+    Fingerprint of a request. Multipart boundaries are random per attempt, so the
+    boundary is removed from the body before hashing.
+    """
+    if content_type and "boundary=" in content_type:
+        boundary = content_type.split("boundary=", 1)[1].split(";", 1)[0].strip().strip('"')
+        body = body.replace(boundary.encode("latin-1"), b"")
+    digest = hashlib.sha256()
+    digest.update(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """Database-backed key claims and stored responses (blocking; call from a worker thread)."""
+
+    def __init__(self, session_factory: Callable, ttl_seconds: float, lease_seconds: float):
+        self.session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self._last_purge = 0.0
+
+    def claim(self, key: str, scope: str, fingerprint: str, token: str) -> Optional[dict]:
+        """Claims `key` for a new request as `token`; returns None on success, else the existing entry."""
+        self._purge_expired()
+        db = self.session_factory()
+        try:
+            while True:
+                now = _now()
+                existing = db.query(IdempotencyKey).filter_by(key=key, scope=scope).first()
+                if (
+                    existing is not None
+                    and existing.status == IN_PROGRESS
+                    and existing.request_hash == fingerprint
+                    and (existing.locked_until is None or existing.locked_until < now)
+                ):
+                    # The holder's heartbeat stopped and its lease ran out: take the claim over.
+                    # The update is conditional, so only one of several racing retries wins it.
+                    taken = (
+                        db.query(IdempotencyKey)
+                        .filter(
+                            IdempotencyKey.id == existing.id,
+                            IdempotencyKey.status == IN_PROGRESS,
+                            or_(IdempotencyKey.locked_until.is_(None), IdempotencyKey.locked_until < now),
+                        )
+                        .update(
+                            {"claim_token": token, "locked_until": now + self.lease, "expires_at": now + self.ttl},
+                            synchronize_session=False,
+                        )
+                    )
+                    db.commit()
+                    if taken:
+                        print(f"Idempotency-Key {key!r} on {scope}: lease expired, claim taken over")
+                        return None
+                    db.expire_all()
+                    continue
+                if existing is not None and existing.expires_at > now:
+                    return {
+                        "request_hash": existing.request_hash,
+                        "status": existing.status,
+                        "status_code": existing.status_code,
+                        "content_type": existing.content_type,
+                        "body": existing.body,
+                    }
+                if existing is not None:
+                    db.delete(existing)
+                    db.flush()
+                db.add(IdempotencyKey(
+                    key=key,
+                    scope=scope,
+                    request_hash=fingerprint,
+                    status=IN_PROGRESS,
+                    claim_token=token,
+                    locked_until=now + self.lease,
+                    expires_at=now + self.ttl,
+                ))
+                try:
+                    db.commit()
+                    return None
+                except IntegrityError:
+                    # Another request claimed the key first; read its entry instead.
+                    db.rollback()
+        finally:
+            db.close()
+
+    def renew(self, key: str, scope: str, token: str) -> bool:
+        """Extends the lease of the claim held as `token`; False if it is no longer held."""
+        db = self.session_factory()
+        try:
+            renewed = (
+                db.query(IdempotencyKey)
+                .filter_by(key=key, scope=scope, status=IN_PROGRESS, claim_token=token)
+                .update({"locked_until": _now() + self.lease}, synchronize_session=False)
+            )
+            db.commit()
+            return bool(renewed)
+        finally:
+            db.close()
+
+    def complete(self, key: str, scope: str, token: str, status_code: int, content_type: Optional[str], body: bytes):
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKey).filter_by(key=key, scope=scope, status=IN_PROGRESS, claim_token=token).update(
+                {"status": COMPLETED, "status_code": status_code, "content_type": content_type, "body": body},
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, key: str, scope: str, token: str):
+        """Drops an unfinished claim held as `token`, so the request can be retried."""
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKey).filter_by(key=key, scope=scope, status=IN_PROGRESS, claim_token=token).delete(
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _purge_expired(self):
+        if time.monotonic() - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        db = self.session_factory()
+        try:
+            db.query(IdempotencyKey).filter(IdempotencyKey.expires_at <= _now()).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+async def _send_json(send, status: int, content: dict, headers: Iterable = ()):
+    body = orjson.dumps(content)
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware applying Idempotency-Key semantics to POST requests on `paths`.
+
+    Requests without the header are not affected. A duplicate waits up to `wait_seconds`
+    for the first request. A running request renews its claim every third of
+    `lease_seconds`, so the claim can only be taken over once that heartbeat has stopped.
+    """
+
+    def __init__(
+        self,
+        app,
+        paths: Iterable[str],
+        session_factory: Callable,
+        ttl_seconds: float,
+        wait_seconds: float,
+        lease_seconds: float,
+    ):
+        self.app = app
+        self.paths = set(paths)
+        self.store = IdempotencyStore(session_factory, ttl_seconds, lease_seconds)
+        self.wait_seconds = wait_seconds
+        self.heartbeat_interval = lease_seconds / 3
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, {"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"})
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        path = scope["path"]
+        fingerprint = request_hash(scope["method"], path, headers.get("content-type"), body)
+
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.05
+        while True:
+            existing = await run_in_threadpool(self.store.claim, key, path, fingerprint, token)
+            if existing is None:
+                break
+            if existing["request_hash"] != fingerprint:
+                await _send_json(send, 422, {"detail": "Idempotency-Key was already used for a different request"})
+                return
+            if existing["status"] == COMPLETED:
+                replay_headers = [(b"idempotent-replayed", b"true")]
+                if existing["content_type"]:
+                    replay_headers.append((b"content-type", existing["content_type"].encode("latin-1")))
+                await send({"type": "http.response.start", "status": existing["status_code"], "headers": replay_headers})
+                await send({"type": "http.response.body", "body": existing["body"] or b""})
+                return
+            # The first request is still running: wait for its response instead of redoing the work.
+            if time.monotonic() >= deadline:
+                await _send_json(
+                    send, 409, {"detail": "A request with this Idempotency-Key is still in progress"}, [(b"retry-after", b"1")]
+                )
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+        await self._run(scope, receive, send, key, path, token, body)
+
+    async def _heartbeat(self, key: str, path: str, token: str):
+        """Keeps the claim's lease from running out while its request is executing."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                held = await run_in_threadpool(self.store.renew, key, path, token)
+            except Exception as e:
+                # The next beat retries; the lease outlasts a couple of missed ones.
+                print(f"Idempotency-Key {key!r} on {path}: lease renewal failed: {e}")
+                continue
+            if not held:
+                print(f"Idempotency-Key {key!r} on {path}: claim lost while the request was running")
+                return
+
+    async def _run(self, scope, receive, send, key: str, path: str, token: str, body: bytes):
+        body_sent = False
+
+        async def replay_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # The body was consumed above; later reads only report a disconnect.
+            return await receive()
+
+        status_code, content_type, response_chunks = 500, None, []
+
+        async def capture(message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body":
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        heartbeat = asyncio.create_task(self._heartbeat(key, path, token))
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            heartbeat.cancel()
+            await run_in_threadpool(self.store.release, key, path, token)
+            raise
+        heartbeat.cancel()
+        if status_code >= 500:
+            await run_in_threadpool(self.store.release, key, path, token)
+        else:
+            await run_in_threadpool(
+                self.store.complete, key, path, token, status_code, content_type, b"".join(response_chunks)
+            )
@@ -0,0 +1,132 @@
+"""
+Scheduling primitives for outbound LLM calls.
+
+- `SingleFlight` coalesces identical in-flight calls so only one reaches the API.
+- `PriorityRateLimiter` enforces requests-per-minute and tokens-per-minute budgets
+  with token buckets, admitting waiters strictly by (priority, arrival order).
+- `backoff_delay` computes full-jitter exponential backoff for retries.
+
+Call sites are synchronous (they run on the request threadpool), so everything here
+blocks the calling thread rather than the event loop.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional, Tuple
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute / 60` units per second up to `per_minute`."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (requests larger than the bucket wait for a full bucket)."""
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        # May go negative when usage is corrected upwards after the call; later callers then wait longer.
+        self.tokens -= amount
+
+
+class PriorityRateLimiter:
+    """Admits callers through request and token buckets, highest priority (lowest number) first."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+
+    def acquire(self, tokens: float, priority: int = PRIORITY_INTERACTIVE) -> float:
+        """
+        Blocks until one request and `tokens` tokens can be spent.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        started = time.monotonic()
+        ticket = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            self._cond.notify_all()
+            try:
+                while True:
+                    if self._waiting[0] != ticket:
+                        self._cond.wait()
+                        continue
+                    now = time.monotonic()
+                    self.requests.refill(now)
+                    self.tokens.refill(now)
+                    wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                    if wait <= 0:
+                        self.requests.take(1)
+                        self.tokens.take(tokens)
+                        return time.monotonic() - started
+                    self._cond.wait(wait)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def record_usage(self, estimated: float, actual: float):
+        """Corrects the token bucket once the real token usage of a call is known."""
+        with self._cond:
+            self.tokens.take(actual - estimated)
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: str, fn: Callable[[], object]) -> Tuple[object, bool]:
+        """
+        Returns:
+            tuple: (result, shared) where `shared` is True when the result came from another caller's call.
+        """
+        with self._lock:
+            future: Optional[Future] = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a server-provided Retry-After."""
+    delay = random.uniform(0, min(cap, base * (2**attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
@@ -0,0 +1,206 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Counters and histograms are kept in plain dicts keyed by label values and
+guarded by a lock, so recording a sample costs a dict lookup and an integer
+increment. `render_metrics()` produces the text format served at /metrics.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """A monotonically increasing value per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    """Bucketed observations (plus sum and count) per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), then sum and count.
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                le_label = f'le="{le}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le_label)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-2]}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}"
+
+
+_registry = []
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    """Renders every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# --- HTTP ---
+HTTP_REQUESTS = _register(Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")))
+HTTP_REQUEST_DURATION = _register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+)
+
+# --- Admission control ---
+ADMISSION_REJECTED = _register(
+    Counter("admission_rejected_total", "Requests refused with 503 by pool and reason (queue_full, timeout).", ("pool", "reason"))
+)
+ADMISSION_QUEUE_WAIT = _register(
+    Histogram("admission_queue_wait_seconds", "Time admitted requests waited for a slot in their pool.", ("pool",))
+)
+
+# --- LLM ---
+LLM_REQUESTS = _register(Counter("llm_requests_total", "LLM completions by call site and outcome (success, error, retry, coalesced).", ("call_site", "model", "outcome")))
+LLM_REQUEST_DURATION = _register(
+    Histogram("llm_request_duration_seconds", "LLM completion latency by call site.", ("call_site", "model"), buckets=LLM_BUCKETS)
+)
+LLM_QUEUE_WAIT = _register(
+    Histogram("llm_queue_wait_seconds", "Time LLM calls wait for rate-limit admission.", ("call_site",), buckets=LLM_BUCKETS)
+)
+LLM_TOKENS = _register(Counter("llm_tokens_total", "LLM tokens used by call site and kind.", ("call_site", "model", "kind")))
+LLM_PROMPT_TOKENS = _register(
+    Histogram(
+        "llm_prompt_tokens",
+        "Prompt size per LLM call by call site, estimated locally and reported by the API.",
+        ("call_site", "source"),
+        buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768),
+    )
+)
+LLM_PROMPT_COMPACTIONS = _register(
+    Counter(
+        "llm_prompt_compactions_total",
+        "Budgeted prompts by call site and what was done to fit them (none, summarized, truncated, over_budget).",
+        ("call_site", "action"),
+    )
+)
+
+# --- LaTeX conversion ---
+LATEX_CONVERSIONS = _register(
+    Counter(
+        "latex_conversions_total",
+        "Text-to-LaTeX conversions by mode (document, fragment) and path (rules, llm); rules / all is the fast-path hit rate.",
+        ("mode", "path"),
+    )
+)
+
+# --- PDF parsing ---
+PDF_PARSE_DURATION = _register(Histogram("pdf_parse_duration_seconds", "Time to extract text from an uploaded PDF."))
+PDF_PAGE_PARSE_DURATION = _register(
+    Histogram("pdf_page_parse_duration_seconds", "Time to extract text from a single PDF page.", buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+)
+PDF_PAGES = _register(Counter("pdf_pages_total", "PDF pages parsed."))
+TEMPLATE_EXTRACTIONS = _register(
+    Counter("template_extractions_total", "Templates built from PDFs by extraction method (outline, headings, llm).", ("method",))
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and latency, labelled by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; label by its template to bound cardinality.
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope.get("method", "")
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method, route_path)
+            HTTP_REQUESTS.inc(method, route_path, str(status))
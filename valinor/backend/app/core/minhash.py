@@ -0,0 +1,50 @@
+"""
+MinHash signatures and LSH banding for set similarity.
+
+A signature is NUM_PERM minimum hash values over a set's features; the share of equal
+positions between two signatures estimates their Jaccard similarity. Splitting the
+signature into BANDS bands of ROWS values and hashing each band gives bucket keys:
+two sets share at least one bucket with probability 1 - (1 - s^ROWS)^BANDS, which is
+about 0.5 at s = 0.5 and above 0.99 at s = 0.8, so candidate lookup is a handful of
+equality matches instead of a scan over every stored set.
+"""
+
+import hashlib
+import random
+from typing import Iterable, List, Tuple
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240611)
+# Fixed permutations: signatures are persisted, so they must not change between processes.
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+
+
+def signature(features: Iterable[str]) -> List[int]:
+    """MinHash signature of a non-empty feature set."""
+    hashes = [_feature_hash(f) for f in set(features)]
+    if not hashes:
+        raise ValueError("Cannot sign an empty feature set")
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_buckets(sig: List[int]) -> List[Tuple[int, int]]:
+    """(band, bucket) keys for a signature; buckets are signed 64-bit so they fit a BIGINT column."""
+    buckets = []
+    for band in range(BANDS):
+        rows = ",".join(str(v) for v in sig[band * ROWS : (band + 1) * ROWS])
+        digest = hashlib.blake2b(f"{band}:{rows}".encode(), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "big", signed=True)))
+    return buckets
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of the sets behind two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
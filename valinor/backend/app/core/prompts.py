@@ -0,0 +1,150 @@
+"""
+Prompt compaction and token budgets for LLM call sites.
+
+- `estimate_tokens` approximates the model tokenizer locally (no API call, no tokenizer
+  dependency). English text lands close to the real count; other scripts are charged a
+  token per letter, which is about right for CJK and on the high side for accented Latin.
+- `compact_outline` encodes a template structure as one line per section instead of JSON.
+- `fit_text` shrinks free text to a token budget: whitespace is collapsed first, then
+  long text is summarized to its outline (heading-like lines plus the opening of each
+  block of body text), and only when the headings alone do not fit is it truncated.
+- `PromptBudget` fits a call site's flexible prompt part (document text, a description)
+  into whatever its budget leaves after the required parts, and counts the outcome.
+
+llm_service records the estimated and the reported prompt size of every call, so the
+estimate and the budgets can be tuned against real usage.
+"""
+
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.metrics import LLM_PROMPT_COMPACTIONS
+
+# ASCII words and numbers as runs; any other letter (CJK, accented, Cyrillic...) on its own.
+_TOKEN_PIECES = re.compile(r"\d+|[A-Za-z]+|[^\W\d_]|[^\w\s]|_")
+_SPACES = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+# Tokens charged per chat message for role and separators.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Approximate BPE token count: an ASCII word is one token per started 6 letters, numbers
+    one per 3 digits, every other letter and every punctuation mark one token.
+    """
+    if not text:
+        return 0
+    count = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        if piece[0].isdigit():
+            count += math.ceil(len(piece) / 3)
+        elif piece[0].isalpha():
+            count += math.ceil(len(piece) / 6)
+        else:
+            count += 1
+    return count
+
+
+def estimate_message_tokens(messages: list) -> int:
+    return sum(estimate_tokens(m.get("content")) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def compact_outline(sections: Iterable[Tuple[str, List[str]]], owners: Optional[Dict[str, str]] = None) -> str:
+    """
+    One line per section, "1. Title [owner]: Subtitle; Subtitle". A JSON dump of the same
+    structure spends most of its tokens on keys, quotes and brackets.
+    """
+    owners = owners or {}
+    lines = []
+    for number, (title, subtitles) in enumerate(sections, 1):
+        line = f"{number}. {title}"
+        if title in owners:
+            line += f" [{owners[title]}]"
+        if subtitles:
+            line += ": " + "; ".join(subtitles)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _is_heading(line: str) -> bool:
+    return len(line) <= 80 and not line.endswith((".", ",", ";", ":")) and (
+        line[0].isdigit() or line.isupper() or line.istitle()
+    )
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cuts `text` at the last line (or word) that keeps it within `max_tokens`."""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    cut = text[:low]
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    return cut[:boundary] if boundary > 0 and low < len(text) else cut
+
+
+def fit_text(text: Optional[str], max_tokens: int) -> Tuple[str, str]:
+    """
+    Shrinks `text` to at most `max_tokens`.
+
+    Returns:
+        tuple: The text and what was done to it ("none", "summarized" or "truncated").
+    """
+    text = _BLANK_LINES.sub("\n\n", _SPACES.sub(" ", text or "")).strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text, "none"
+    if max_tokens <= 0:
+        return "", "truncated"
+
+    # Keep the document's shape: every heading, and the opening of each block of body text
+    # between headings, with the remaining budget shared equally between the blocks.
+    parts, body = [], []
+    for line in text.split("\n"):
+        line = line.strip()
+        if line and not _is_heading(line):
+            body.append(line)
+            continue
+        if body:
+            parts.append((False, " ".join(body)))
+            body = []
+        if line:
+            parts.append((True, line))
+    if body:
+        parts.append((False, " ".join(body)))
+
+    heading_tokens = sum(estimate_tokens(part) for is_heading, part in parts if is_heading)
+    blocks = sum(1 for is_heading, _ in parts if not is_heading)
+    share = (max_tokens - heading_tokens) // max(blocks, 1)
+    if share <= 0:
+        return _truncate(text, max_tokens), "truncated"
+    summary = "\n".join(part if is_heading else _truncate(part, share) for is_heading, part in parts)
+    return _truncate(summary, max_tokens), "summarized"
+
+
+class PromptBudget:
+    """
+    Keeps a call site's prompt within `max_tokens`.
+
+    Required parts (instructions, structure) are always sent; the flexible part (document
+    text, a description) gets whatever the budget leaves after them.
+    """
+
+    def __init__(self, call_site: str, max_tokens: int):
+        self.call_site = call_site
+        self.max_tokens = max_tokens
+
+    def fit(self, required: Iterable[str], flexible: Optional[str]) -> str:
+        """Returns `flexible` shrunk so that it and `required` together fit the budget."""
+        used = sum(estimate_tokens(part) for part in required)
+        fitted, action = fit_text(flexible, self.max_tokens - used)
+        if used > self.max_tokens:
+            action = "over_budget"
+            print(f"Prompt for {self.call_site} needs ~{used} tokens for required parts alone (budget {self.max_tokens})")
+        elif action != "none":
+            print(f"Prompt for {self.call_site} {action} to fit {self.max_tokens} tokens")
+        LLM_PROMPT_COMPACTIONS.inc(self.call_site, action)
+        return fitted
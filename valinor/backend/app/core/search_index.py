@@ -0,0 +1,147 @@
+"""
+In-memory inverted index with BM25 ranking and fuzzy term matching.
+
+Used for search when the database has no full-text support (SQLite in development and
+benchmarks). Documents are added and removed individually so the index can be kept
+current incrementally. Query terms match indexed terms exactly, by prefix (so "plan"
+finds "planning") and, failing those, by trigram similarity (so "shedule" finds "schedule").
+"""
+
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_WEIGHT = 0.7
+MIN_PREFIX_LENGTH = 3
+# Same default as pg_trgm.similarity_threshold.
+FUZZY_MIN_SIMILARITY = 0.3
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class InvertedIndex:
+    """
+    Term -> postings index over documents identified by hashable keys.
+
+    Each document carries an opaque payload returned with search hits. All methods are
+    thread-safe.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Hashable, int]] = defaultdict(dict)
+        self._doc_terms: Dict[Hashable, Counter] = {}
+        self._doc_lengths: Dict[Hashable, int] = {}
+        self._payloads: Dict[Hashable, dict] = {}
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._total_length = 0
+        # Sorted vocabulary for prefix lookups; rebuilt lazily after the vocabulary changes.
+        self._sorted_terms: Optional[List[str]] = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def add(self, key: Hashable, text: str, payload: dict):
+        """Indexes (or re-indexes) `text` under `key`."""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self.remove(key)
+            self._doc_terms[key] = terms
+            self._payloads[key] = payload
+            self._doc_lengths[key] = sum(terms.values())
+            self._total_length += self._doc_lengths[key]
+            for term, tf in terms.items():
+                if not self._postings[term]:
+                    self._sorted_terms = None
+                    for gram in trigrams(term):
+                        self._trigrams[gram].add(term)
+                self._postings[term][key] = tf
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            terms = self._doc_terms.pop(key, None)
+            if terms is None:
+                return
+            self._payloads.pop(key, None)
+            self._total_length -= self._doc_lengths.pop(key)
+            for term in terms:
+                postings = self._postings[term]
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+                    self._sorted_terms = None
+                    for gram in trigrams(term):
+                        self._trigrams[gram].discard(term)
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Indexed terms matching a query token, with a weight per match kind."""
+        matches = []
+        if token in self._postings:
+            matches.append((token, 1.0))
+        if len(token) >= MIN_PREFIX_LENGTH:
+            if self._sorted_terms is None:
+                self._sorted_terms = sorted(self._postings)
+            i = bisect.bisect_right(self._sorted_terms, token)
+            while i < len(self._sorted_terms) and self._sorted_terms[i].startswith(token):
+                matches.append((self._sorted_terms[i], PREFIX_WEIGHT))
+                i += 1
+        if matches:
+            return matches
+        grams = trigrams(token)
+        candidates = Counter(term for gram in grams for term in self._trigrams.get(gram, ()))
+        for term, shared in candidates.items():
+            similarity = shared / len(grams | trigrams(term))
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches.append((term, similarity * PREFIX_WEIGHT))
+        return matches
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        offset: int = 0,
+        accept: Optional[Callable[[dict], bool]] = None,
+    ) -> Tuple[List[Tuple[float, dict]], bool]:
+        """
+        Ranks documents containing any query term.
+
+        Returns:
+            tuple: ([(score, payload), ...] for the requested page, whether more results follow)
+        """
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            if not doc_count:
+                return [], False
+            avg_length = self._total_length / doc_count
+            scores: Dict[Hashable, float] = defaultdict(float)
+            for token in set(tokenize(query)):
+                for term, weight in self._expand(token):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for key, tf in postings.items():
+                        length = self._doc_lengths[key]
+                        norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+                        scores[key] += weight * idf * norm
+
+            candidates = (
+                (score, key) for key, score in scores.items() if accept is None or accept(self._payloads[key])
+            )
+            # One extra hit tells whether another page follows.
+            top = heapq.nsmallest(offset + limit + 1, candidates, key=lambda item: (-item[0], str(item[1])))
+            hits = [(score, self._payloads[key]) for score, key in top]
+        return hits[offset : offset + limit], len(hits) > offset + limit
@@ -0,0 +1,119 @@
+"""
+Plain-text operations for the document store (operational transformation).
+
+An operation is a list of components walked over the document from start to end:
+a positive int retains that many characters, a negative int deletes that many and
+a string inserts itself. `[5, "abc", -2, 10]` keeps 5 characters, inserts "abc",
+deletes 2 and keeps the last 10, so it applies to a 17-character document.
+
+`transform(a, b)` takes two operations made against the same document version and
+returns `(a', b')` such that applying a then b' equals applying b then a'; this is
+how concurrent edits are merged by version.
+"""
+
+from typing import List, Tuple, Union
+
+Component = Union[int, str]
+
+
+class OperationError(ValueError):
+    """Raised for malformed operations or operations that do not fit a document."""
+
+
+def normalize(op: List[Component]) -> List[Component]:
+    """Validates `op` and merges adjacent components of the same kind."""
+    result: List[Component] = []
+    for c in op:
+        if isinstance(c, bool) or not isinstance(c, (int, str)):
+            raise OperationError(f"Invalid operation component: {c!r}")
+        if c == 0 or c == "":
+            continue
+        if isinstance(c, str) and result and isinstance(result[-1], int) and result[-1] < 0:
+            # Keep inserts before deletes so equivalent operations share one canonical form.
+            if len(result) > 1 and isinstance(result[-2], str):
+                result[-2] += c
+            else:
+                result.insert(len(result) - 1, c)
+        elif result and type(result[-1]) is type(c) and (isinstance(c, str) or (result[-1] > 0) == (c > 0)):
+            result[-1] += c
+        else:
+            result.append(c)
+    return result
+
+
+def base_length(op: List[Component]) -> int:
+    """Length of the document `op` applies to."""
+    return sum(abs(c) for c in op if isinstance(c, int))
+
+
+def target_length(op: List[Component]) -> int:
+    """Length of the document after applying `op`."""
+    return sum(c if isinstance(c, int) and c > 0 else len(c) if isinstance(c, str) else 0 for c in op)
+
+
+def apply(text: str, op: List[Component]) -> str:
+    """Applies `op` to `text`."""
+    if base_length(op) != len(text):
+        raise OperationError(f"Operation spans {base_length(op)} characters but the document has {len(text)}")
+    parts, pos = [], 0
+    for c in op:
+        if isinstance(c, str):
+            parts.append(c)
+        elif c > 0:
+            parts.append(text[pos : pos + c])
+            pos += c
+        else:
+            pos -= c
+    return "".join(parts)
+
+
+def transform(a: List[Component], b: List[Component]) -> Tuple[List[Component], List[Component]]:
+    """
+    Transforms concurrent operations `a` and `b` (same base document) against each other.
+
+    When both insert at the same position, `a`'s text is placed first.
+    """
+    if base_length(a) != base_length(b):
+        raise OperationError("Concurrent operations must apply to the same document length")
+    a_out: List[Component] = []
+    b_out: List[Component] = []
+    i = j = 0
+    ca = a[0] if a else None
+    cb = b[0] if b else None
+
+    while ca is not None or cb is not None:
+        if isinstance(ca, str):
+            a_out.append(ca)
+            b_out.append(len(ca))
+            i += 1
+            ca = a[i] if i < len(a) else None
+            continue
+        if isinstance(cb, str):
+            a_out.append(len(cb))
+            b_out.append(cb)
+            j += 1
+            cb = b[j] if j < len(b) else None
+            continue
+        if ca is None or cb is None:
+            raise OperationError("Concurrent operations must apply to the same document length")
+
+        n = min(abs(ca), abs(cb))
+        if ca > 0 and cb > 0:
+            a_out.append(n)
+            b_out.append(n)
+        elif ca < 0 and cb > 0:
+            a_out.append(-n)
+        elif ca > 0 and cb < 0:
+            b_out.append(-n)
+        # Both delete the same characters: nothing left to do for either side.
+
+        ca = ca - n if ca > 0 else ca + n
+        cb = cb - n if cb > 0 else cb + n
+        if ca == 0:
+            i += 1
+            ca = a[i] if i < len(a) else None
+        if cb == 0:
+            j += 1
+            cb = b[j] if j < len(b) else None
+
+    return normalize(a_out), normalize(b_out)
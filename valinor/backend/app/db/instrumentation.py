@@ -0,0 +1,135 @@
+# instrumentation.py
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s)(?:\s*,\s*(?:\?|%\(\w+\)s|%s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Reduces a SQL statement to its shape: literals become `?`, IN-lists collapse to `(?)`
+    and whitespace is normalized, so the same query issued in a loop maps to one fingerprint.
+    """
+    shape = _LITERALS.sub("?", statement)
+    shape = _PLACEHOLDER_LISTS.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def fingerprint_id(shape: str) -> str:
+    """Short stable identifier for a statement shape, suitable for a header value."""
+    return hashlib.sha1(shape.encode()).hexdigest()[:8]
+
+
+class RequestQueryStats:
+    """
+    Query statistics collected for a single request.
+
+    Attributes:
+        count (int): Number of statements executed.
+        total_time (float): Time spent in the database, in seconds.
+        shapes (Counter): Executions per statement fingerprint.
+    """
+
+    __slots__ = ("count", "total_time", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    def repeated(self, threshold: int = 1):
+        """Returns (shape, count) pairs executed more than `threshold` times, most frequent first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Returns the statistics of the request being handled, or None outside a request."""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    start_times = conn.info.get("query_start_time")
+    if start_times:
+        stats.total_time += time.perf_counter() - start_times.pop()
+    stats.count += 1
+    stats.shapes[fingerprint(statement)] += 1
+
+
+def instrument_engine(engine: Engine):
+    """Registers the cursor event hooks that feed per-request query statistics."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware that collects SQL statistics per HTTP request.
+
+    Logs a warning for every statement shape executed more than `repeat_threshold` times
+    in one request (the usual signature of an N+1 loop). With `expose_headers` enabled the
+    statistics are also returned as X-DB-* response headers.
+    """
+
+    def __init__(self, app, expose_headers: bool = False, repeat_threshold: int = 10):
+        self.app = app
+        self.expose_headers = expose_headers
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                repeated = stats.repeated()[:5]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_time * 1000:.2f}".encode()))
+                if repeated:
+                    value = ",".join(f"{fingerprint_id(shape)}:{n}" for shape, n in repeated)
+                    headers.append((b"x-db-repeated-statements", value.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+            for shape, n in stats.repeated(self.repeat_threshold):
+                logger.warning(
+                    "Possible N+1: statement [%s] ran %d times in %s %s: %s",
+                    fingerprint_id(shape),
+                    n,
+                    scope.get("method"),
+                    scope.get("path"),
+                    shape,
+                )
@@ -0,0 +1,58 @@
+"""
+JSON built inside the database.
+
+Nested responses (an object with arrays of child objects) are assembled by one SQL
+statement and returned as a JSON string, so reads skip per-row ORM/Pydantic object
+construction and the bytes go to the client as they come back.
+
+PostgreSQL uses json_build_object / json_agg; SQLite's JSON1 functions (json_object /
+json_group_array) give the same output for tests and benchmarks. Other dialects are not
+supported; callers check `supports_json_aggregation` and keep their Python path for them.
+"""
+
+from typing import Iterable, Tuple
+from sqlalchemy import Text, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+JSON_AGGREGATION_DIALECTS = ("postgresql", "sqlite")
+
+
+def supports_json_aggregation(db: Session) -> bool:
+    return db.get_bind().dialect.name in JSON_AGGREGATION_DIALECTS
+
+
+def json_object(dialect: str, pairs: Iterable[Tuple[str, object]]):
+    """JSON object with the given (key, SQL expression) pairs, in order."""
+    args = []
+    for key, value in pairs:
+        # Keys are inlined so the statement text (and its cached plan) is the same for every call.
+        args.extend((literal_column(f"'{key}'"), value))
+    if dialect == "postgresql":
+        return func.json_build_object(*args)
+    return func.json_object(*args)
+
+
+def json_array(dialect: str, element, rows: Select, order_by, correlate=()):
+    """
+    Correlated scalar subquery aggregating `element` over `rows` into a JSON array
+    ordered by `order_by` (an empty array when there are no rows).
+
+    Args:
+        rows (Select): A select whose FROM, joins and WHERE define the rows; its columns are ignored.
+        correlate: Outer tables the subquery refers to.
+    """
+    if dialect == "postgresql":
+        aggregate = func.coalesce(func.json_agg(aggregate_order_by(element, order_by)), literal_column("'[]'::json"))
+        return rows.with_only_columns(aggregate).correlate(*correlate).scalar_subquery()
+
+    # SQLite cannot order inside an aggregate before 3.44, so aggregate an ordered derived table.
+    # Values lose their JSON subtype across the subquery; json_quote/json round-trip them as JSON text.
+    ordered = rows.with_only_columns(func.json_quote(element).label("item")).order_by(order_by).correlate(*correlate).subquery()
+    return func.json(select(func.json_group_array(func.json(ordered.c.item))).scalar_subquery())
+
+
+def as_text(dialect: str, document):
+    """The final JSON document as text, so drivers hand back the string instead of decoding it."""
+    return cast(document, Text) if dialect == "postgresql" else document
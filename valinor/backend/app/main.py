@@ -1,14 +1,43 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.routes import pdf_parsing, project_manager, latex_converter, document_edit, templates
-from app.db.session import engine
-from app.models import project, user, template, timeline
+from app.api.v1.routes import pdf_parsing, project_manager, latex_converter, document_edit, templates, search, analytics
+from app.core.config import settings
+from app.core.admission import AdmissionControlMiddleware, AdmissionPool
+from app.core.broker import close_broker
+from app.core.compression import CompressionMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.db.session import SessionLocal, engine
+from app.db.instrumentation import QueryStatsMiddleware, instrument_engine
+from app.models import project, user, template, timeline, change_log, document, template_signature, archive, idempotency, metric_snapshot, search as search_indexes
 from app.db.base import Base
 
 # Initialize database tables
 Base.metadata.create_all(bind=engine)
+instrument_engine(engine)
 
 app = FastAPI()
+# The postgres event broker holds dedicated LISTEN/NOTIFY connections outside the pool.
+app.add_event_handler("shutdown", close_broker)
+
+# Separate concurrency pools per route class, so LLM bursts cannot starve reads.
+# Added first (innermost) so CORS headers are set on its 503 responses as well.
+app.add_middleware(
+    AdmissionControlMiddleware,
+    pools=[
+        AdmissionPool("llm", settings.ADMISSION_LLM_CONCURRENCY, settings.ADMISSION_LLM_QUEUE_SIZE, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS),
+        AdmissionPool("pdf", settings.ADMISSION_PDF_CONCURRENCY, settings.ADMISSION_PDF_QUEUE_SIZE, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS),
+        AdmissionPool("db", settings.ADMISSION_DB_CONCURRENCY, settings.ADMISSION_DB_QUEUE_SIZE, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS),
+    ],
+    routes={
+        "/project/generate-timeline": "llm",
+        "/latex/generate": "llm",
+        "/latex/generate-batch": "llm",
+        "/pdf/parse": "pdf",
+    },
+    default_pool="db",
+    exempt=["/project/events", "/metrics"],
+)
 
 # Middleware settings for CORS
 app.add_middleware(
@@ -19,14 +48,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Idempotency-Key replay for endpoints that create rows or call the LLM
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=["/project/create-project", "/pdf/parse"],
+    session_factory=SessionLocal,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS,
+)
+
+# gzip/brotli for large JSON responses (precompressed payloads pass through)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Per-request SQL statistics (X-DB-* headers in debug mode, N+1 warnings always)
+app.add_middleware(
+    QueryStatsMiddleware,
+    expose_headers=settings.DEBUG,
+    repeat_threshold=settings.SQL_REPEAT_THRESHOLD,
+)
+
+# Route latency and status counters, served at /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(pdf_parsing.router, prefix="/pdf", tags=["PDF Parsing"])
 app.include_router(project_manager.router, prefix="/project", tags=["Project Management"])
 app.include_router(latex_converter.router, prefix="/latex", tags=["LaTeX Conversion"])
 app.include_router(document_edit.router, prefix="/document", tags=["Document Editing"])
 app.include_router(templates.router, prefix="/templates", tags=["Templates"])
+app.include_router(search.router, prefix="/search", tags=["Search"])
+app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
 
 
 @app.get("/")
 def home():
     return {"message": "Welcome to the API"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Date, DateTime, Integer, LargeBinary, String, func
+from app.db.base import Base
+
+
+class ArchivedProject(Base):
+    """
+    A completed project moved out of the hot tables.
+
+    The project, its collaborators, timeline entries and document are stored together as
+    one compressed JSON document, so archiving removes every row the project had in
+    projects, project_collaborators, timeline_entries and documents.
+
+    Attributes:
+        id (int): The original project id (archived projects keep their id).
+        title (str): The project title, kept as a column for listings.
+        template_id (int): The template the project was created from.
+        deadline (date): The project deadline.
+        archived_at (datetime): When the project was archived.
+        payload (bytes): zlib-compressed JSON, see archive_service.
+    """
+
+    __tablename__ = "archived_projects"
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String, nullable=False)
+    template_id = Column(Integer, nullable=False)
+    deadline = Column(Date, nullable=False, index=True)
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
+    payload = Column(LargeBinary, nullable=False)
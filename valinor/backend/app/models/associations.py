@@ -7,5 +7,5 @@ project_collaborators = Table(
     "project_collaborators",
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
-    Column("project_id", Integer, ForeignKey("projects.id"), primary_key=True),
+    Column("project_id", Integer, ForeignKey("projects.id"), primary_key=True, index=True),
 )
\ No newline at end of file
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+from app.db.base import Base
+
+
+class ChangeLogEntry(Base):
+    """
+    Append-only record of row changes, read by the delta-sync changes feed.
+
+    Entries are written in the same transaction as the change they describe, and their
+    increasing id serves as the client's sync cursor.
+
+    Attributes:
+        id (int): Monotonic sequence number (the sync cursor).
+        entity_type (str): The changed entity, "project" or "timeline_entry".
+        entity_id (int): Primary key of the changed row.
+        project_id (int): The project the row belongs to (kept after the project is deleted).
+        operation (str): "upsert" for creates and updates, "delete" for tombstones.
+        changed_at (datetime): When the change was recorded.
+    """
+
+    __tablename__ = "change_log"
+
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False, index=True)
+    operation = Column(String, nullable=False)
+    changed_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -0,0 +1,57 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint, func
+from app.db.base import Base
+
+
+# --- Document Model ---
+class Document(Base):
+    """
+    A project's editable document, stored as a snapshot plus an operation log.
+
+    Saving appends one `DocumentOperation`; the full text is only rewritten into
+    `snapshot` every few versions so loads replay a short tail of operations.
+
+    Attributes:
+        id (int): The unique identifier for the document.
+        project_id (int): The project the document belongs to (one document per project).
+        version (int): Number of operations applied so far.
+        length (int): Length of the text at `version`, used to validate incoming operations.
+        snapshot (str): Full text at `snapshot_version`.
+        snapshot_version (int): Version captured by `snapshot`.
+        updated_at (datetime): When the last operation was applied.
+    """
+
+    __tablename__ = "documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, unique=True)
+    version = Column(Integer, nullable=False, default=0)
+    length = Column(Integer, nullable=False, default=0)
+    snapshot = Column(Text, nullable=False, default="")
+    snapshot_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+
+# --- Document Operation Model ---
+class DocumentOperation(Base):
+    """
+    One applied edit in a document's operation log.
+
+    Attributes:
+        id (int): The unique identifier for the operation.
+        document_id (int): The document the operation belongs to.
+        version (int): Document version produced by this operation (1 for the first edit).
+        ops (str): JSON-encoded operation as applied, i.e. after merging concurrent edits
+            (see app.core.text_operations).
+        client_id (str, optional): Editor session that sent the operation.
+        created_at (datetime): When the operation was applied.
+    """
+
+    __tablename__ = "document_operations"
+    __table_args__ = (UniqueConstraint("document_id", "version", name="uq_document_operations_document_version"),)
+
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    ops = Column(Text, nullable=False)
+    client_id = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
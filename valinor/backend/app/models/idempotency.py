@@ -0,0 +1,41 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, UniqueConstraint, func
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    A client-supplied Idempotency-Key together with the request it was first used for and
+    that request's response, so retries are answered without redoing the work.
+
+    Attributes:
+        id (int): The unique identifier for the row.
+        key (str): The Idempotency-Key header value.
+        scope (str): The request path the key was used on (keys are scoped per endpoint).
+        request_hash (str): SHA-256 of the method, path and body of the first request.
+        status (str): "in_progress" while the first request runs, then "completed".
+        status_code (int): The stored response status.
+        content_type (str): The stored response content type.
+        body (bytes): The stored response body.
+        claim_token (str): Random token of the request holding the claim; only that
+            request may complete or release it.
+        locked_until (datetime): End of the running request's lease, renewed while it runs;
+            an in-progress claim past it is taken over by the next request with the key.
+        created_at (datetime): When the key was first used.
+        expires_at (datetime): When the key may be reused for a new request.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("key", "scope", name="uq_idempotency_keys_key_scope"),)
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String(255), nullable=False)
+    scope = Column(String, nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    claim_token = Column(String(32), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Date, Integer, SmallInteger
+from app.db.base import Base
+
+
+class ProjectMetricSnapshot(Base):
+    """
+    A project's phase counts at the start of one day, as get_project_metrics reports them.
+
+    Attributes:
+        project_id (int): The project (no foreign key, so history outlives the project).
+        day (date): The day the counts describe.
+        total_phases (int): Timeline entries of the project.
+        completed_phases (int): Entries that ended before `day`.
+        in_progress_phases (int): Entries running on `day`.
+        upcoming_phases (int): Entries starting after `day`.
+        completion_percentage (int): completed_phases / total_phases, in whole percent.
+    """
+
+    __tablename__ = "project_metric_snapshots"
+
+    project_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True, index=True)
+    total_phases = Column(SmallInteger, nullable=False)
+    completed_phases = Column(SmallInteger, nullable=False)
+    in_progress_phases = Column(SmallInteger, nullable=False)
+    upcoming_phases = Column(SmallInteger, nullable=False)
+    completion_percentage = Column(SmallInteger, nullable=False)
+
+
+class PortfolioMetricSnapshot(Base):
+    """
+    Phase counts summed over every live project for one day.
+
+    Attributes:
+        day (date): The day the counts describe.
+        projects (int): Live projects on that day.
+        change_cursor (int): The change-log cursor the snapshot is current to; the next
+            day's snapshot recomputes only projects changed after it.
+    """
+
+    __tablename__ = "portfolio_metric_snapshots"
+
+    day = Column(Date, primary_key=True)
+    projects = Column(Integer, nullable=False)
+    total_phases = Column(Integer, nullable=False)
+    completed_phases = Column(Integer, nullable=False)
+    in_progress_phases = Column(Integer, nullable=False)
+    upcoming_phases = Column(Integer, nullable=False)
+    completion_percentage = Column(SmallInteger, nullable=False)
+    change_cursor = Column(Integer, nullable=False)
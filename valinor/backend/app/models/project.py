@@ -1,5 +1,5 @@
 from app.db.base import Base
-from sqlalchemy import Column, Integer, String, Date, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, JSON, ForeignKey
 from sqlalchemy.orm import relationship
 from app.models.associations import project_collaborators
 
@@ -15,6 +15,8 @@ class Project(Base):
         description (str, optional): A brief description of the project.
         start_date (date): The start date of the project.
         deadline (date): The deadline for the project.
+        deleted_at (datetime, optional): When the project was deleted; deleted projects are hidden
+            from every read until the background purge removes their rows.
 
     Relationships:
         template_id (int): The foreign key referencing the template associated with the project.
@@ -29,7 +31,8 @@ class Project(Base):
     title = Column(String, index=True, nullable=False)
     description = Column(String, nullable=True)
     start_date = Column(Date, nullable=False)
-    deadline = Column(Date, nullable=False)
+    deadline = Column(Date, nullable=False, index=True)
+    deleted_at = Column(DateTime, nullable=True, index=True)
 
     # Relationships
     template_id = Column(Integer, ForeignKey("templates.id"), nullable=False)
@@ -0,0 +1,76 @@
+"""
+Full-text search documents and their PostgreSQL indexes.
+
+Each searchable table gets a GIN index over a `to_tsvector` expression (matched by
+`search_vector` in queries) and a trigram GIN index on its short title column for fuzzy
+matches. The indexes are expression indexes, so PostgreSQL keeps them current on every
+write; they are only created on PostgreSQL.
+"""
+
+from sqlalchemy import DDL, Index, event, func, literal_column, text
+from app.db.base import Base
+from app.models.project import Project
+from app.models.template import Template, TemplateSection, TemplateSubtitle
+from app.models.timeline import TimelineEntry
+
+SEARCH_CONFIG = "english"
+
+
+def _joined(*columns):
+    # Inline literals (not bound parameters) so query expressions match the index definitions verbatim.
+    empty, space = literal_column("''"), literal_column("' '")
+    expression = func.coalesce(columns[0], empty)
+    for column in columns[1:]:
+        expression = expression.op("||")(space).op("||")(func.coalesce(column, empty))
+    return expression
+
+
+# Text indexed per entity; queries must use these exact expressions for the indexes to apply.
+SEARCH_DOCUMENTS = {
+    "template": _joined(Template.__table__.c.name, Template.__table__.c.description),
+    "section": _joined(TemplateSection.__table__.c.title),
+    "subtitle": _joined(TemplateSubtitle.__table__.c.subtitle),
+    "project": _joined(Project.__table__.c.title, Project.__table__.c.description),
+    "timeline_entry": _joined(
+        TimelineEntry.__table__.c.section, TimelineEntry.__table__.c.subtitle, TimelineEntry.__table__.c.description
+    ),
+}
+
+# Short title columns matched by trigram similarity.
+SEARCH_TITLES = {
+    "template": Template.__table__.c.name,
+    "section": TemplateSection.__table__.c.title,
+    "subtitle": TemplateSubtitle.__table__.c.subtitle,
+    "project": Project.__table__.c.title,
+    "timeline_entry": TimelineEntry.__table__.c.section,
+}
+
+
+def search_vector(entity: str):
+    return func.to_tsvector(text(f"'{SEARCH_CONFIG}'::regconfig"), SEARCH_DOCUMENTS[entity])
+
+
+for _entity, _table in (
+    ("template", Template.__table__),
+    ("section", TemplateSection.__table__),
+    ("subtitle", TemplateSubtitle.__table__),
+    ("project", Project.__table__),
+    ("timeline_entry", TimelineEntry.__table__),
+):
+    _table.append_constraint(
+        Index(f"ix_{_table.name}_search", search_vector(_entity), postgresql_using="gin").ddl_if(dialect="postgresql")
+    )
+    _table.append_constraint(
+        Index(
+            f"ix_{_table.name}_search_trgm",
+            SEARCH_TITLES[_entity],
+            postgresql_using="gin",
+            postgresql_ops={SEARCH_TITLES[_entity].key: "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql")
+    )
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
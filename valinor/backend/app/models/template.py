@@ -56,7 +56,7 @@ class TemplateSection(Base):
     __tablename__ = "template_sections"
 
     id = Column(Integer, primary_key=True, index=True)
-    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False, index=True)
     title = Column(String, nullable=False)
 
     subtitles = relationship("TemplateSubtitle", back_populates="section", cascade="all, delete-orphan")
@@ -79,7 +79,7 @@ class TemplateSubtitle(Base):
     __tablename__ = "template_subtitles"
 
     id = Column(Integer, primary_key=True, index=True)
-    section_id = Column(Integer, ForeignKey("template_sections.id"), nullable=False)
+    section_id = Column(Integer, ForeignKey("template_sections.id"), nullable=False, index=True)
     subtitle = Column(String, nullable=False)
 
     section = relationship("TemplateSection", back_populates="subtitles")
@@ -0,0 +1,39 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Integer, Text
+from app.db.base import Base
+
+
+# --- Template Signature Model ---
+class TemplateSignature(Base):
+    """
+    MinHash signature of a template's section and subtitle titles, used for near-duplicate detection.
+
+    Attributes:
+        template_id (int): The template the signature belongs to.
+        signature (str): JSON list of minimum hash values (see app.core.minhash).
+    """
+
+    __tablename__ = "template_signatures"
+
+    template_id = Column(Integer, ForeignKey("templates.id"), primary_key=True)
+    signature = Column(Text, nullable=False)
+
+
+# --- Template LSH Bucket Model ---
+class TemplateLshBucket(Base):
+    """
+    One LSH band bucket of a template signature; templates sharing a bucket are duplicate candidates.
+
+    Attributes:
+        id (int): The unique identifier for the bucket row.
+        template_id (int): The template the bucket belongs to.
+        band (int): Band index within the signature.
+        bucket (int): Hash of the band's values.
+    """
+
+    __tablename__ = "template_lsh_buckets"
+    __table_args__ = (Index("ix_template_lsh_buckets_band_bucket", "band", "bucket"),)
+
+    id = Column(Integer, primary_key=True)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False, index=True)
+    band = Column(Integer, nullable=False)
+    bucket = Column(BigInteger, nullable=False)
@@ -24,14 +24,14 @@ class TimelineEntry(Base):
     __tablename__ = "timeline_entries"
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    responsible_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    responsible_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
 
     description = Column(String, nullable=True)
     section = Column(String, nullable=False)
     subtitle = Column(String, nullable=True)
-    start = Column(Date, nullable=False)
-    end = Column(Date, nullable=False)
+    start = Column(Date, nullable=False, index=True)
+    end = Column(Date, nullable=False, index=True)
 
     project = relationship("Project", back_populates="timeline_entries")
     responsible_user = relationship("User", back_populates="timeline_entries")
@@ -0,0 +1,47 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class BurndownResponse(BaseModel):
+    total: int
+    dates: List[str]
+    started: List[int]
+    completed: List[int]
+    remaining: List[int]
+
+
+class CollaboratorLoad(BaseModel):
+    user_id: Optional[int]
+    email: Optional[str]
+    load: List[int]
+
+
+class WeeklyLoadResponse(BaseModel):
+    weeks: List[str]
+    collaborators: List[CollaboratorLoad]
+
+
+class LateProject(BaseModel):
+    project_id: int
+    days_late: int
+
+
+class OnTimeResponse(BaseModel):
+    entries: int
+    on_time_entries: int
+    entry_ratio: Optional[float]
+    projects: int
+    on_time_projects: int
+    project_ratio: Optional[float]
+    late_projects: List[LateProject]
+
+
+class MetricTrendResponse(BaseModel):
+    project_id: Optional[int]
+    days: List[str]
+    projects: Optional[List[int]] = None
+    total_phases: List[int]
+    completed_phases: List[int]
+    in_progress_phases: List[int]
+    upcoming_phases: List[int]
+    completion_percentage: List[int]
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+
+
+class DocumentResponse(BaseModel):
+    project_id: int
+    version: int
+    content: str
+
+
+class DocumentOperationRequest(BaseModel):
+    # Version of the document the client edited; concurrent operations since then are merged in.
+    base_version: int = Field(..., ge=0)
+    # Retain (positive int), delete (negative int) and insert (string) components.
+    ops: List[Union[int, str]]
+    client_id: Optional[str] = None
+
+
+class DocumentOperationResponse(BaseModel):
+    version: int
+    client_id: Optional[str] = None
+    ops: List[Union[int, str]]
+
+
+class DocumentOperationsResponse(BaseModel):
+    project_id: int
+    version: int
+    operations: List[DocumentOperationResponse]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import date
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 
 # =======================================
@@ -101,3 +101,32 @@ class TemplateResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# =======================================
+# === Delta-sync Pydantic Models ===
+# =======================================
+class ChangeResponse(BaseModel):
+    entity: str  # "project" or "timeline_entry"
+    id: int
+    project_id: int
+    op: str  # "upsert" or "delete"
+    data: Optional[Dict[str, Any]] = None
+
+
+class ChangesResponse(BaseModel):
+    cursor: int
+    has_more: bool
+    changes: List[ChangeResponse]
+
+
+# =======================================
+# === Bulk Delete Pydantic Models ===
+# =======================================
+class BulkDeleteProjectsRequest(BaseModel):
+    project_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class BulkDeleteProjectsResponse(BaseModel):
+    deleted: List[int]
+    not_found: List[int]  # unknown or already deleted
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class SearchResultResponse(BaseModel):
+    # One of: template, section, subtitle, project, timeline_entry
+    type: str
+    id: int
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    template_id: Optional[int] = None
+    project_id: Optional[int] = None
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    limit: int
+    offset: int
+    has_more: bool
+    results: List[SearchResultResponse]
@@ -0,0 +1,208 @@
+"""
+Portfolio analytics over timeline entries, computed with NumPy.
+
+The entries' project, responsible, start, end and project deadline columns are loaded
+once into parallel int32 arrays (dates as days since 1970-01-01, converted by the
+database), and every series is then computed with sorts, searchsorted and bincount
+instead of a Python loop over ORM objects.
+
+Phase status follows build_project_metrics: on a given day an entry is completed when
+it ended before that day. Archived and soft-deleted projects are not included.
+"""
+
+from datetime import date, timedelta
+from itertools import chain
+from typing import List, Optional
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import Integer, cast, func, literal_column, select, type_coerce
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.project import Project
+from app.models.timeline import TimelineEntry
+from app.models.user import User
+
+EPOCH = date(1970, 1, 1)
+# responsible_id of entries without a responsible collaborator.
+UNASSIGNED = -1
+
+
+class TimelineArrays:
+    """Timeline entries as parallel int32 arrays, one element per entry."""
+
+    def __init__(self, project_id: np.ndarray, responsible_id: np.ndarray, start: np.ndarray, end: np.ndarray, deadline: np.ndarray):
+        self.project_id = project_id
+        self.responsible_id = responsible_id
+        self.start = start
+        self.end = end
+        self.deadline = deadline
+
+    def __len__(self):
+        return len(self.project_id)
+
+
+def _epoch_days(dialect: str, column):
+    if dialect == "postgresql":
+        # date - date is an integer number of days in PostgreSQL.
+        return type_coerce(column - literal_column("DATE '1970-01-01'"), Integer)
+    if dialect == "sqlite":
+        return cast(func.julianday(column) - 2440587.5, Integer)
+    return column
+
+
+def _to_day(value: date) -> int:
+    return (value - EPOCH).days
+
+
+def _to_date(day) -> date:
+    return EPOCH + timedelta(days=int(day))
+
+
+def load_timeline_arrays(db: Session, project_ids: Optional[List[int]] = None) -> TimelineArrays:
+    """Loads the timeline entries of live projects (or of `project_ids`) into arrays."""
+    dialect = db.get_bind().dialect.name
+    columns = [
+        TimelineEntry.project_id,
+        func.coalesce(TimelineEntry.responsible_id, UNASSIGNED),
+        _epoch_days(dialect, TimelineEntry.start),
+        _epoch_days(dialect, TimelineEntry.end),
+        _epoch_days(dialect, Project.deadline),
+    ]
+    query = (
+        select(*columns)
+        .join(Project, Project.id == TimelineEntry.project_id)
+        .where(Project.deleted_at.is_(None))
+    )
+    if project_ids is not None:
+        query = query.where(TimelineEntry.project_id.in_(project_ids))
+
+    # Executed as driver SQL so rows skip SQLAlchemy's per-column result processing, which
+    # doubles the load time at a million rows. Every parameter is an int, so they are inlined.
+    connection = db.connection()
+    statement = str(query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    rows = connection.exec_driver_sql(statement)
+    if dialect in ("postgresql", "sqlite"):
+        # The values are plain ints, so the rows stream straight into one array.
+        flat = np.fromiter(chain.from_iterable(rows), dtype=np.int32)
+    else:
+        flat = np.array([_to_day(v) if isinstance(v, date) else v for v in chain.from_iterable(rows)], dtype=np.int32)
+    table = flat.reshape(-1, len(columns))
+    return TimelineArrays(*(np.ascontiguousarray(table[:, i]) for i in range(len(columns))))
+
+
+def compute_burndown(arrays: TimelineArrays, start: Optional[date] = None, end: Optional[date] = None, step_days: int = 1) -> dict:
+    """
+    Burn-up and burndown of timeline entries, one point per `step_days` from start to end.
+
+    Returns:
+        dict: "dates", and per date the entries "started" (start on or before it),
+        "completed" (ended before it) and "remaining" (total - completed).
+    """
+    if not len(arrays) and (start is None or end is None):
+        return {"total": 0, "dates": [], "started": [], "completed": [], "remaining": []}
+    # The window defaults to the span of the entries.
+    first = _to_day(start) if start else int(arrays.start.min())
+    last = _to_day(end) if end else int(arrays.end.max())
+    if last < first:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    days = np.arange(first, last + 1, step_days, dtype=np.int32)
+    if len(days) > settings.ANALYTICS_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.ANALYTICS_MAX_POINTS} points per series")
+
+    completed = np.searchsorted(np.sort(arrays.end), days, side="left")
+    started = np.searchsorted(np.sort(arrays.start), days, side="right")
+    return {
+        "total": len(arrays),
+        "dates": [_to_date(day).isoformat() for day in days],
+        "started": started,
+        "completed": completed,
+        "remaining": len(arrays) - completed,
+    }
+
+
+def compute_weekly_load(arrays: TimelineArrays, start: Optional[date] = None, weeks: int = 12) -> dict:
+    """
+    Entries in progress per collaborator and week, for `weeks` weeks from the week of `start`.
+
+    An entry counts towards every week (Monday to Sunday) it overlaps.
+
+    Returns:
+        dict: "weeks" (their Mondays) and "collaborators": per responsible user id (None for
+        unassigned entries) the "load" per week. Collaborators without load are left out.
+    """
+    if weeks > settings.ANALYTICS_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.ANALYTICS_MAX_POINTS} points per series")
+    start = start or date.today()
+    origin = _to_day(start - timedelta(days=start.weekday()))
+    first_week = (arrays.start - origin) // 7
+    last_week = (arrays.end - origin) // 7
+    visible = (last_week >= 0) & (first_week < weeks)
+    first_week = np.clip(first_week[visible], 0, weeks - 1)
+    last_week = np.clip(last_week[visible], 0, weeks - 1)
+
+    users, user_index = np.unique(arrays.responsible_id[visible], return_inverse=True)
+    # Difference array per collaborator: +1 in an entry's first week, -1 after its last one.
+    width = weeks + 1
+    size = len(users) * width
+    diff = np.bincount(user_index * width + first_week, minlength=size) - np.bincount(
+        user_index * width + last_week + 1, minlength=size
+    )
+    load = np.cumsum(diff.reshape(len(users), width), axis=1)[:, :weeks]
+
+    return {
+        "weeks": [_to_date(origin + 7 * week).isoformat() for week in range(weeks)],
+        "collaborators": [
+            {"user_id": None if user_id == UNASSIGNED else int(user_id), "load": row}
+            for user_id, row in zip(users, load)
+        ],
+    }
+
+
+def compute_on_time(arrays: TimelineArrays, limit: int = 20) -> dict:
+    """
+    Share of entries ending by their project's deadline, and of projects whose last entry does.
+
+    Returns:
+        dict: Counts and ratios for entries and projects, plus the `limit` latest projects
+        ("late_projects", with how many days their timeline overruns the deadline).
+    """
+    entries = len(arrays)
+    on_time_entries = int(np.count_nonzero(arrays.end <= arrays.deadline))
+
+    projects, project_index = np.unique(arrays.project_id, return_inverse=True)
+    last_end = np.full(len(projects), np.iinfo(np.int32).min, dtype=np.int32)
+    np.maximum.at(last_end, project_index, arrays.end)
+    deadline = np.empty(len(projects), dtype=np.int32)
+    deadline[project_index] = arrays.deadline
+    overrun = last_end - deadline
+
+    late = np.flatnonzero(overrun > 0)
+    on_time_projects = len(projects) - len(late)
+    latest = late[np.argsort(-overrun[late], kind="stable")[:limit]]
+
+    return {
+        "entries": entries,
+        "on_time_entries": on_time_entries,
+        "entry_ratio": on_time_entries / entries if entries else None,
+        "projects": len(projects),
+        "on_time_projects": on_time_projects,
+        "project_ratio": on_time_projects / len(projects) if len(projects) else None,
+        "late_projects": [{"project_id": int(projects[i]), "days_late": int(overrun[i])} for i in latest],
+    }
+
+
+def get_burndown(db: Session, project_ids: Optional[List[int]] = None, start=None, end=None, step_days: int = 1) -> dict:
+    return compute_burndown(load_timeline_arrays(db, project_ids), start, end, step_days)
+
+
+def get_weekly_load(db: Session, project_ids: Optional[List[int]] = None, start=None, weeks: int = 12) -> dict:
+    result = compute_weekly_load(load_timeline_arrays(db, project_ids), start, weeks)
+    user_ids = [c["user_id"] for c in result["collaborators"] if c["user_id"] is not None]
+    emails = dict(db.query(User.id, User.email).filter(User.id.in_(user_ids))) if user_ids else {}
+    for collaborator in result["collaborators"]:
+        collaborator["email"] = emails.get(collaborator["user_id"])
+    return result
+
+
+def get_on_time(db: Session, project_ids: Optional[List[int]] = None, limit: int = 20) -> dict:
+    return compute_on_time(load_timeline_arrays(db, project_ids), limit)
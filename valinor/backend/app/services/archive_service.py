@@ -0,0 +1,144 @@
+import zlib
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import List, Optional
+import orjson
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.archive import ArchivedProject
+from app.models.associations import project_collaborators
+from app.models.project import Project
+from app.models.timeline import TimelineEntry
+from app.models.user import User
+from app.services.change_log_service import DELETE, PROJECT, record_changes, record_project_timeline_deleted
+from app.services.document_service import delete_project_documents, export_project_documents
+from app.services.project_service import build_project_metrics, get_projects_by_ids, resolve_project_fields
+
+
+def _compress(payload: dict) -> bytes:
+    return zlib.compress(orjson.dumps(payload), 6)
+
+
+def _decompress(blob: bytes) -> dict:
+    return orjson.loads(zlib.decompress(blob))
+
+
+def archive_completed_projects(
+    db: Session, retention_days: Optional[int] = None, batch_size: Optional[int] = None
+) -> int:
+    """
+    Moves projects whose deadline passed more than `retention_days` ago out of the hot tables.
+
+    Each project is stored in archived_projects as one compressed JSON document holding the
+    full project response, its team (for metrics) and its document; the project's rows in
+    projects, project_collaborators, timeline_entries and documents are then deleted. Batches
+    commit separately. Archived projects leave the change feed (tombstones are recorded) but
+    stay readable by id through the project endpoints.
+
+    Returns:
+        int: Number of projects archived.
+    """
+    retention_days = settings.PROJECT_ARCHIVE_RETENTION_DAYS if retention_days is None else retention_days
+    batch_size = batch_size or settings.PROJECT_ARCHIVE_BATCH_SIZE
+    cutoff = date.today() - timedelta(days=retention_days)
+    archived = 0
+    while True:
+        project_ids = [
+            project_id
+            for (project_id,) in db.query(Project.id)
+            .filter(Project.deadline < cutoff, Project.deleted_at.is_(None))
+            .order_by(Project.deadline)
+            .limit(batch_size)
+        ]
+        if not project_ids:
+            return archived
+
+        teams = defaultdict(list)
+        team_rows = (
+            db.query(project_collaborators.c.project_id, User.id, User.email, User.name)
+            .join(User, project_collaborators.c.user_id == User.id)
+            .filter(project_collaborators.c.project_id.in_(project_ids))
+        )
+        for project_id, user_id, email, name in team_rows:
+            teams[project_id].append({"id": user_id, "email": email, "name": name})
+        documents = export_project_documents(project_ids, db)
+
+        rows = [
+            {
+                "id": project["id"],
+                "title": project["title"],
+                "template_id": project["template_id"],
+                "deadline": project["deadline"],
+                "payload": _compress({
+                    "project": project,
+                    "team": teams[project["id"]],
+                    "document": documents.get(project["id"]),
+                }),
+            }
+            for project in get_projects_by_ids(project_ids, db)
+        ]
+        db.execute(insert(ArchivedProject), rows)
+
+        # Tombstones first, while the timeline rows still exist to be selected
+        record_project_timeline_deleted(db, project_ids)
+        record_changes(db, [(PROJECT, project_id, project_id, DELETE) for project_id in project_ids])
+        delete_project_documents(project_ids, db)
+        db.query(TimelineEntry).filter(TimelineEntry.project_id.in_(project_ids)).delete(synchronize_session=False)
+        db.execute(project_collaborators.delete().where(project_collaborators.c.project_id.in_(project_ids)))
+        db.query(Project).filter(Project.id.in_(project_ids)).delete(synchronize_session=False)
+        db.commit()
+
+        archived += len(rows)
+        print(f"Archived {archived} completed projects")
+
+
+def _archived_payload(project_id: int, db: Session) -> Optional[dict]:
+    blob = db.query(ArchivedProject.payload).filter(ArchivedProject.id == project_id).scalar()
+    return _decompress(blob) if blob is not None else None
+
+
+def _select_fields(project: dict, scalar_fields: List[str], relations) -> dict:
+    selected = {field: project[field] for field in scalar_fields}
+    for relation in ("collaborators", "timeline"):
+        if relation in relations:
+            selected[relation] = project[relation]
+    return selected
+
+
+def get_archived_project(
+    project_id: int, db: Session, fields: Optional[str] = None, include: Optional[str] = None
+) -> Optional[dict]:
+    """An archived project in the get_project_full format (narrowed by `fields` / `include`), or None."""
+    scalar_fields, relations = resolve_project_fields(fields, include)
+    payload = _archived_payload(project_id, db)
+    return _select_fields(payload["project"], scalar_fields, relations) if payload else None
+
+
+def get_archived_projects(db: Session, fields: Optional[str] = None, include: Optional[str] = None) -> List[dict]:
+    """Every archived project in the get_projects_overview format, oldest deadline first."""
+    scalar_fields, relations = resolve_project_fields(fields, include)
+    return [
+        _select_fields(_decompress(blob)["project"], scalar_fields, relations)
+        for (blob,) in db.query(ArchivedProject.payload).order_by(ArchivedProject.deadline, ArchivedProject.id)
+    ]
+
+
+def get_archived_project_metrics(project_id: int, db: Session) -> Optional[dict]:
+    """Metrics of an archived project, computed from its stored timeline and team."""
+    payload = _archived_payload(project_id, db)
+    if payload is None:
+        return None
+    phases = [
+        (date.fromisoformat(entry["start"]), date.fromisoformat(entry["end"])) for entry in payload["project"]["timeline"]
+    ]
+    return build_project_metrics(phases, payload["team"])
+
+
+def get_archived_document(project_id: int, db: Session) -> Optional[dict]:
+    """The document of an archived project in the get_document format, or None if the project is not archived."""
+    payload = _archived_payload(project_id, db)
+    if payload is None:
+        return None
+    document = payload["document"] or {"version": 0, "content": ""}
+    return {"project_id": project_id, "version": document["version"], "content": document["content"]}
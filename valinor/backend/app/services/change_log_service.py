@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import event, func, insert, literal, select
+from sqlalchemy.orm import Session
+from app.core.broker import get_broker
+from app.models.change_log import ChangeLogEntry
+from app.models.timeline import TimelineEntry
+
+PROJECT = "project"
+TIMELINE_ENTRY = "timeline_entry"
+UPSERT = "upsert"
+DELETE = "delete"
+
+# Arbitrary application-wide key for the advisory lock that orders change-log writers.
+_CHANGE_LOG_LOCK_KEY = 834_271
+
+
+def _serialize_writers(db: Session):
+    """
+    Makes change-log ids commit in increasing order on PostgreSQL.
+
+    Sequence values are handed out before commit, so two concurrent writers could commit
+    out of order and a reader could advance its cursor past a row that is not yet visible.
+    A transaction-scoped advisory lock keeps writers in line until they commit.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_advisory_xact_lock(_CHANGE_LOG_LOCK_KEY)))
+
+
+def _note_cursor(db: Session):
+    """
+    Remembers the cursor before this transaction's first change-log row. Every change the
+    transaction writes comes after it, so a client handed a truncated push event can read
+    them all from /project/changes.
+    """
+    if "pending_change_since" not in db.info:
+        db.info["pending_change_since"] = current_cursor(db)
+
+
+def _pending_event(db: Session, project_id: int) -> dict:
+    events = db.info.setdefault("pending_change_events", {})
+    if project_id not in events:
+        events[project_id] = {"project_id": project_id, "since": db.info["pending_change_since"], "changes": []}
+    return events[project_id]
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(db: Session):
+    """Pushes one event per touched project to subscribers, only once the changes are committed."""
+    events = db.info.pop("pending_change_events", None)
+    db.info.pop("pending_change_since", None)
+    if events:
+        broker = get_broker()
+        for change_event in events.values():
+            broker.publish(change_event)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(db: Session):
+    db.info.pop("pending_change_events", None)
+    db.info.pop("pending_change_since", None)
+
+
+def record_changes(db: Session, changes: Iterable[Tuple[str, int, int, str]], collaborators: Optional[Iterable[str]] = None):
+    """
+    Appends (entity_type, entity_id, project_id, operation) rows to the change log.
+
+    Does not commit: the rows become visible together with the caller's own changes, and a
+    push event per project is published to subscribers after the commit. `collaborators`
+    (emails) lets "all my projects" subscribers pick up projects they were just added to.
+    """
+    rows = [
+        {"entity_type": entity_type, "entity_id": entity_id, "project_id": project_id, "operation": operation}
+        for entity_type, entity_id, project_id, operation in changes
+    ]
+    if not rows:
+        return
+    _serialize_writers(db)
+    _note_cursor(db)
+    db.execute(insert(ChangeLogEntry), rows)
+
+    for row in rows:
+        pending = _pending_event(db, row["project_id"])
+        pending["changes"].append({"entity": row["entity_type"], "id": row["entity_id"], "op": row["operation"]})
+        if collaborators is not None:
+            pending["collaborators"] = list(collaborators)
+
+
+def record_project_timeline_deleted(db: Session, project_ids: List[int]):
+    """
+    Writes tombstones for every timeline entry of the given projects with a single INSERT ... SELECT.
+
+    The push event carries a single timeline_entry delete without an id, meaning "all entries".
+    """
+    if not project_ids:
+        return
+    _serialize_writers(db)
+    _note_cursor(db)
+    for project_id in project_ids:
+        _pending_event(db, project_id)["changes"].append({"entity": TIMELINE_ENTRY, "id": None, "op": DELETE})
+    db.execute(
+        insert(ChangeLogEntry).from_select(
+            ["entity_type", "entity_id", "project_id", "operation"],
+            select(literal(TIMELINE_ENTRY), TimelineEntry.id, TimelineEntry.project_id, literal(DELETE)).where(
+                TimelineEntry.project_id.in_(project_ids)
+            ),
+        )
+    )
+
+
+def current_cursor(db: Session) -> int:
+    """Latest change-log id; read it before taking a snapshot so the feed replays anything that races the snapshot."""
+    return db.query(func.max(ChangeLogEntry.id)).scalar() or 0
+
+
+def read_changes(db: Session, since: int, limit: int) -> Tuple[List[Tuple[str, int, int, str]], int, bool]:
+    """
+    Reads up to `limit` change-log rows after cursor `since`, collapsed to the latest change per row.
+
+    Returns:
+        tuple: ([(entity_type, entity_id, project_id, operation), ...], next cursor, has_more)
+    """
+    rows = (
+        db.query(
+            ChangeLogEntry.id,
+            ChangeLogEntry.entity_type,
+            ChangeLogEntry.entity_id,
+            ChangeLogEntry.project_id,
+            ChangeLogEntry.operation,
+        )
+        .filter(ChangeLogEntry.id > since)
+        .order_by(ChangeLogEntry.id)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest = OrderedDict()
+    for _, entity_type, entity_id, project_id, operation in rows:
+        key = (entity_type, entity_id)
+        latest.pop(key, None)
+        latest[key] = (entity_type, entity_id, project_id, operation)
+
+    cursor = rows[-1][0] if rows else since
+    return list(latest.values()), cursor, has_more
@@ -0,0 +1,181 @@
+import orjson
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.text_operations import OperationError, apply, base_length, normalize, target_length, transform
+from app.models.document import Document, DocumentOperation
+from app.models.project import Project
+from app.schemas.document_schema import DocumentOperationRequest
+
+# Clients further behind than this must reload the document instead of rebasing their edit.
+MAX_REBASE_OPERATIONS = 1000
+# Materialized texts kept in memory so loads only replay operations newer than the cached version.
+TEXT_CACHE_SIZE = 256
+
+_text_cache: "OrderedDict[int, Tuple[int, str]]" = OrderedDict()
+_text_cache_lock = threading.Lock()
+
+
+def _cached_text(document_id: int) -> Optional[Tuple[int, str]]:
+    with _text_cache_lock:
+        cached = _text_cache.get(document_id)
+        if cached is not None:
+            _text_cache.move_to_end(document_id)
+        return cached
+
+
+def _cache_text(document_id: int, version: int, text: str):
+    with _text_cache_lock:
+        cached = _text_cache.get(document_id)
+        if cached is None or cached[0] <= version:
+            _text_cache[document_id] = (version, text)
+            _text_cache.move_to_end(document_id)
+        while len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+
+
+def _operations_after(db: Session, document_id: int, version: int) -> List[Tuple[int, list, Optional[str]]]:
+    """(version, ops, client_id) of every operation newer than `version`, oldest first."""
+    rows = (
+        db.query(DocumentOperation.version, DocumentOperation.ops, DocumentOperation.client_id)
+        .filter(DocumentOperation.document_id == document_id, DocumentOperation.version > version)
+        .order_by(DocumentOperation.version)
+        .all()
+    )
+    return [(v, orjson.loads(ops), client_id) for v, ops, client_id in rows]
+
+
+def _materialize(db: Session, document: Document) -> str:
+    """Text of `document` at its current version: the newest cached or snapshotted text plus later operations."""
+    cached = _cached_text(document.id)
+    if cached is not None and document.snapshot_version <= cached[0] <= document.version:
+        version, text = cached
+    else:
+        version, text = document.snapshot_version, document.snapshot
+
+    if version < document.version:
+        for _, ops, _ in _operations_after(db, document.id, version):
+            text = apply(text, ops)
+        _cache_text(document.id, document.version, text)
+    return text
+
+
+def _require_project(project_id: int, db: Session):
+    if not db.query(Project.id).filter(Project.id == project_id, Project.deleted_at.is_(None)).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+
+
+def get_document(project_id: int, db: Session) -> dict:
+    """Returns the document text and version for a project (version 0 and empty before the first edit)."""
+    _require_project(project_id, db)
+    document = db.query(Document).filter(Document.project_id == project_id).first()
+    if not document:
+        return {"project_id": project_id, "version": 0, "content": ""}
+    return {"project_id": project_id, "version": document.version, "content": _materialize(db, document)}
+
+
+def get_document_operations(project_id: int, since: int, db: Session) -> dict:
+    """Returns the operations applied after version `since`, so a client can catch up without reloading."""
+    _require_project(project_id, db)
+    document = db.query(Document).filter(Document.project_id == project_id).first()
+    if not document:
+        return {"project_id": project_id, "version": 0, "operations": []}
+    operations = [
+        {"version": version, "client_id": client_id, "ops": ops}
+        for version, ops, client_id in _operations_after(db, document.id, since)
+    ]
+    return {"project_id": project_id, "version": document.version, "operations": operations}
+
+
+def _lock_document(project_id: int, db: Session) -> Document:
+    """Loads the project's document row for update, creating it on first edit."""
+    document = db.query(Document).filter(Document.project_id == project_id).with_for_update().first()
+    if document:
+        return document
+    try:
+        with db.begin_nested():
+            db.add(Document(project_id=project_id, version=0, length=0, snapshot="", snapshot_version=0))
+    except IntegrityError:
+        # Another editor created it first.
+        pass
+    return db.query(Document).filter(Document.project_id == project_id).with_for_update().one()
+
+
+def export_project_documents(project_ids: List[int], db: Session) -> Dict[int, dict]:
+    """Current version and text of the given projects' documents, keyed by project id."""
+    return {
+        document.project_id: {"version": document.version, "content": _materialize(db, document)}
+        for document in db.query(Document).filter(Document.project_id.in_(project_ids))
+    }
+
+
+def delete_project_documents(project_ids: List[int], db: Session):
+    """Removes the documents of the given projects and their operation logs (does not commit)."""
+    document_ids = db.query(Document.id).filter(Document.project_id.in_(project_ids)).scalar_subquery()
+    db.query(DocumentOperation).filter(DocumentOperation.document_id.in_(document_ids)).delete(synchronize_session=False)
+    db.query(Document).filter(Document.project_id.in_(project_ids)).delete(synchronize_session=False)
+
+
+def apply_document_operation(project_id: int, request: DocumentOperationRequest, db: Session) -> dict:
+    """
+    Applies one edit to a project's document.
+
+    The operation is merged (transformed) against any operations committed since
+    `request.base_version`, appended to the log, and the document version advances by one.
+    Only the operation is written, so the cost follows the edit size; the full text is
+    rewritten into the snapshot every DOCUMENT_SNAPSHOT_INTERVAL versions.
+
+    Returns:
+        dict: The new version and the operation as applied (after merging).
+    """
+    _require_project(project_id, db)
+    try:
+        op = normalize(request.ops)
+    except OperationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    document = _lock_document(project_id, db)
+    if request.base_version > document.version:
+        raise HTTPException(status_code=409, detail=f"Document is at version {document.version}")
+    if document.version - request.base_version > MAX_REBASE_OPERATIONS:
+        raise HTTPException(status_code=409, detail="Edit is too far behind; reload the document")
+
+    try:
+        for _, concurrent, _ in _operations_after(db, document.id, request.base_version):
+            # Operations already in the log win ties, so they are transformed as the first argument.
+            _, op = transform(concurrent, op)
+        if base_length(op) != document.length:
+            raise OperationError(f"Operation spans {base_length(op)} characters but the document has {document.length}")
+    except OperationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    new_version = document.version + 1
+    snapshot = None
+    if new_version - document.snapshot_version >= settings.DOCUMENT_SNAPSHOT_INTERVAL:
+        snapshot = apply(_materialize(db, document), op)
+        document.snapshot = snapshot
+        document.snapshot_version = new_version
+
+    db.add(
+        DocumentOperation(
+            document_id=document.id,
+            version=new_version,
+            ops=orjson.dumps(op).decode(),
+            client_id=request.client_id,
+        )
+    )
+    document.version = new_version
+    document.length = target_length(op)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Concurrent edit; retry against the latest version")
+    if snapshot is not None:
+        _cache_text(document.id, new_version, snapshot)
+
+    return {"version": new_version, "client_id": request.client_id, "ops": op}
@@ -0,0 +1,232 @@
+"""
+Deterministic text-to-LaTeX conversion for the common, simple cases.
+
+Handles paragraphs, Markdown-style headings, bullet and numbered lists (nested by
+indentation), **bold** / *emphasis* / `code`, links, inline ($..$, \\(..\\)) and display
+($$..$$, \\[..\\]) math, fenced code blocks and pipe tables. Everything else is escaped.
+
+`convert` also returns a confidence in [0, 1]: constructs the rules cannot translate
+faithfully (stray LaTeX commands, Unicode math symbols, HTML, images, unbalanced
+markers) lower it, and callers fall back to the LLM below their threshold.
+"""
+
+import re
+from typing import List, Tuple
+
+_ESCAPES = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+_ESCAPE_RE = re.compile(r"[\\&%$#_{}~^]")
+
+_INLINE_RE = re.compile(
+    r"""
+    (?P<math>\$(?=\S)[^$\n]+?(?<=\S)\$)
+    |\\\((?P<paren>.+?)\\\)
+    |`(?P<code>[^`\n]+)`
+    |\*\*(?=\S)(?P<bold>.+?)(?<=\S)\*\*
+    |\*(?=\S)(?P<em>[^*\n]+?)(?<=\S)\*
+    |(?<!\w)_(?=\S)(?P<uem>[^_\n]+?)(?<=\S)_(?!\w)
+    |!?\[(?P<link_text>[^\]\n]+)\]\((?P<link_url>[^)\s]+)\)
+    """,
+    re.X,
+)
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_LIST_RE = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(.*)$")
+_TABLE_SEPARATOR_RE = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+_HEADING_COMMANDS = ("section", "subsection", "subsubsection", "paragraph", "subparagraph", "subparagraph")
+
+# Signs the text needs more than the rules offer, with the confidence factor each applies.
+_SUSPICIOUS = (
+    (re.compile(r"\\[a-zA-Z]+"), 0.3),  # already contains LaTeX commands
+    (re.compile(r"[\u0370-\u03ff\u2190-\u22ff\u2a00-\u2aff]"), 0.4),  # Greek letters, arrows, math operators
+    (re.compile(r"</?[a-zA-Z][^>]*>"), 0.5),  # HTML
+    (re.compile(r"(?<!\\)\$|\*\*|(?<!\w)\*(?=\S)"), 0.6),  # unbalanced math / emphasis markers
+    (re.compile(r"\[\^"), 0.6),  # footnotes
+)
+
+
+def escape(text: str) -> str:
+    """Escapes LaTeX special characters in plain text."""
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES[m.group()], text)
+
+
+class _Converter:
+    def __init__(self):
+        self.confidence = 1.0
+
+    def _penalize(self, plain: str):
+        for pattern, factor in _SUSPICIOUS:
+            if pattern.search(plain):
+                self.confidence *= factor
+
+    def inline(self, text: str) -> str:
+        parts, pos = [], 0
+        for m in _INLINE_RE.finditer(text):
+            parts.append(self._plain(text[pos : m.start()]))
+            kind = m.lastgroup
+            if kind == "math":
+                parts.append(m.group("math"))
+            elif kind == "paren":
+                parts.append(f"\\({m.group('paren')}\\)")
+            elif kind == "code":
+                parts.append(f"\\texttt{{{escape(m.group('code'))}}}")
+            elif kind == "bold":
+                parts.append(f"\\textbf{{{self.inline(m.group('bold'))}}}")
+            elif kind in ("em", "uem"):
+                parts.append(f"\\emph{{{self.inline(m.group(kind))}}}")
+            else:
+                if m.group().startswith("!"):
+                    # Images need files the converter cannot see.
+                    self.confidence *= 0.3
+                url = m.group("link_url").replace("\\", "/").replace("%", "\\%").replace("#", "\\#")
+                parts.append(f"\\href{{{url}}}{{{self.inline(m.group('link_text'))}}}")
+            pos = m.end()
+        parts.append(self._plain(text[pos:]))
+        return "".join(parts)
+
+    def _plain(self, text: str) -> str:
+        self._penalize(text)
+        return escape(text)
+
+    def _table(self, lines: List[str]) -> str:
+        rows = [[cell.strip() for cell in line.strip().strip("|").split("|")] for line in lines]
+        header, body = rows[0], rows[2:]
+        columns = len(header)
+        if any(len(row) != columns for row in body):
+            self.confidence *= 0.5
+        out = [f"\\begin{{tabular}}{{|{'|'.join('l' * columns)}|}}", "\\hline"]
+        out.append(" & ".join(f"\\textbf{{{self.inline(c)}}}" for c in header) + " \\\\")
+        out.append("\\hline")
+        for row in body:
+            row = (row + [""] * columns)[:columns]
+            out.append(" & ".join(self.inline(c) for c in row) + " \\\\")
+        out.append("\\hline")
+        out.append("\\end{tabular}")
+        return "\n".join(out)
+
+    def _list(self, lines: List[str]) -> str:
+        out: List[str] = []
+        stack: List[Tuple[int, str]] = []  # (indent, environment)
+        for line in lines:
+            m = _LIST_RE.match(line)
+            if not m:
+                # Continuation of the previous item.
+                out[-1] += " " + self.inline(line.strip())
+                continue
+            indent = len(m.group(1).expandtabs(4))
+            env = "enumerate" if m.group(2)[0].isdigit() else "itemize"
+            while stack and indent < stack[-1][0]:
+                out.append(f"\\end{{{stack.pop()[1]}}}")
+            if not stack or indent > stack[-1][0]:
+                stack.append((indent, env))
+                out.append(f"\\begin{{{env}}}")
+            elif stack[-1][1] != env:
+                out.append(f"\\end{{{stack.pop()[1]}}}")
+                stack.append((indent, env))
+                out.append(f"\\begin{{{env}}}")
+            out.append(f"\\item {self.inline(m.group(3))}")
+        while stack:
+            out.append(f"\\end{{{stack.pop()[1]}}}")
+        return "\n".join(out)
+
+    def convert(self, text: str) -> str:
+        lines = text.replace("\r\n", "\n").split("\n")
+        blocks: List[str] = []
+        paragraph: List[str] = []
+
+        def flush_paragraph():
+            if paragraph:
+                blocks.append(self.inline("\n".join(line.strip() for line in paragraph)))
+                paragraph.clear()
+
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            stripped = line.strip()
+
+            if not stripped:
+                flush_paragraph()
+                i += 1
+                continue
+
+            if stripped.startswith("```"):
+                flush_paragraph()
+                end = next((j for j in range(i + 1, len(lines)) if lines[j].strip().startswith("```")), None)
+                if end is None:
+                    self.confidence *= 0.5
+                    end = len(lines)
+                blocks.append("\\begin{verbatim}\n" + "\n".join(lines[i + 1 : end]) + "\n\\end{verbatim}")
+                i = end + 1
+                continue
+
+            for opener, closer in (("$$", "$$"), ("\\[", "\\]")):
+                if stripped.startswith(opener):
+                    flush_paragraph()
+                    rest = stripped[len(opener) :]
+                    if rest.endswith(closer) and rest != "":
+                        math, i = rest[: -len(closer)], i + 1
+                    else:
+                        end = next((j for j in range(i + 1, len(lines)) if lines[j].strip().endswith(closer)), None)
+                        if end is None:
+                            self.confidence *= 0.3
+                            end = len(lines) - 1
+                        math = "\n".join([rest] + lines[i + 1 : end] + [lines[end].strip()[: -len(closer)]])
+                        i = end + 1
+                    blocks.append("\\[\n" + math.strip() + "\n\\]")
+                    break
+            else:
+                heading = _HEADING_RE.match(stripped)
+                if heading:
+                    flush_paragraph()
+                    command = _HEADING_COMMANDS[len(heading.group(1)) - 1]
+                    blocks.append(f"\\{command}{{{self.inline(heading.group(2))}}}")
+                    i += 1
+                    continue
+
+                if stripped.startswith("|") and i + 1 < len(lines) and _TABLE_SEPARATOR_RE.match(lines[i + 1]):
+                    flush_paragraph()
+                    end = i + 2
+                    while end < len(lines) and lines[end].strip().startswith("|"):
+                        end += 1
+                    blocks.append(self._table(lines[i:end]))
+                    i = end
+                    continue
+
+                if _LIST_RE.match(line):
+                    flush_paragraph()
+                    end = i + 1
+                    while end < len(lines) and lines[end].strip() and (
+                        _LIST_RE.match(lines[end]) or lines[end].startswith((" ", "\t"))
+                    ):
+                        end += 1
+                    blocks.append(self._list(lines[i:end]))
+                    i = end
+                    continue
+
+                paragraph.append(line)
+                i += 1
+
+        flush_paragraph()
+        return "\n\n".join(blocks)
+
+
+def convert(text: str) -> Tuple[str, float]:
+    """
+    Converts text to a LaTeX body fragment (no preamble).
+
+    Returns:
+        tuple: (latex, confidence); confidence is 1.0 when every construct was understood.
+    """
+    converter = _Converter()
+    latex = converter.convert(text)
+    return latex, round(converter.confidence, 3)
@@ -1,13 +1,52 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 from openai import OpenAI
 from app.core.config import settings
+from app.core.metrics import LATEX_CONVERSIONS
+from app.services import latex_rules_service
+from app.services.llm_service import create_chat_completion
+
+# Retries are handled by the LLM scheduler in llm_service.
+client = OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+
+LATEX_MODEL = "gpt-4o-mini"
+FRAGMENT_SYSTEM_PROMPT = (
+    "You are an AI that converts text to LaTeX. Convert the given passage into a LaTeX body fragment. "
+    "Return only the LaTeX for the passage: no preamble, no \\begin{document}, no code fences."
+)
+# Wraps reassembled fragments; the packages cover what fragments typically use.
+LATEX_PREAMBLE = "\\documentclass{article}\n\\usepackage{amsmath,amssymb,graphicx,hyperref}\n\\begin{document}\n\n"
+LATEX_POSTAMBLE = "\n\n\\end{document}"
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_CODE_FENCE = re.compile(r"^```[a-zA-Z]*\n?|\n?```$")
+
+_fragment_cache: "OrderedDict[str, str]" = OrderedDict()
+_fragment_cache_lock = threading.Lock()
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
 def generate_latex_from_text(content: str) -> str:
-    """Generate LaTeX code from given text using OpenAI."""
+    """
+    Generate LaTeX code from given text.
+
+    Simple text (paragraphs, lists, headings, emphasis, math, pipe tables) is converted by
+    the local rules; the text goes to OpenAI only when the rules are not confident.
+    """
+    latex, confidence = latex_rules_service.convert(content)
+    if confidence >= settings.LATEX_FAST_PATH_MIN_CONFIDENCE:
+        LATEX_CONVERSIONS.inc("document", "rules")
+        return LATEX_PREAMBLE + latex + LATEX_POSTAMBLE
+    LATEX_CONVERSIONS.inc("document", "llm")
+
     prompt = f"Convert this text to LaTeX: {content}"
     
-    response = client.chat.completions.create(
+    response = create_chat_completion(
+        client,
+        "latex",
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": "You are an AI that converts text to LaTeX."},
@@ -15,4 +54,105 @@ def generate_latex_from_text(content: str) -> str:
         ],
     )
     
-    return response.choices[0].message.content.strip()
\ No newline at end of file
+    return response.choices[0].message.content.strip()
+
+
+def split_fragments(content: str) -> List[str]:
+    """Splits text into paragraphs (blocks separated by blank lines), dropping empty ones."""
+    return [p.strip() for p in _PARAGRAPH_BREAK.split(content) if p.strip()]
+
+
+def _fragment_key(fragment: str) -> str:
+    # The model and prompt are part of the key so changing either invalidates cached fragments.
+    return hashlib.sha256(f"{LATEX_MODEL}\0{FRAGMENT_SYSTEM_PROMPT}\0{fragment}".encode()).hexdigest()
+
+
+def _convert_fragment(fragment: str) -> str:
+    latex, confidence = latex_rules_service.convert(fragment)
+    if confidence >= settings.LATEX_FAST_PATH_MIN_CONFIDENCE:
+        LATEX_CONVERSIONS.inc("fragment", "rules")
+        return latex
+    LATEX_CONVERSIONS.inc("fragment", "llm")
+
+    response = create_chat_completion(
+        client,
+        "latex_fragment",
+        model=LATEX_MODEL,
+        messages=[
+            {"role": "system", "content": FRAGMENT_SYSTEM_PROMPT},
+            {"role": "user", "content": fragment},
+        ],
+    )
+    return _CODE_FENCE.sub("", response.choices[0].message.content.strip()).strip()
+
+
+def _cache_fragment(key: str, latex: str):
+    with _fragment_cache_lock:
+        _fragment_cache[key] = latex
+        _fragment_cache.move_to_end(key)
+        while len(_fragment_cache) > settings.LATEX_FRAGMENT_CACHE_SIZE:
+            _fragment_cache.popitem(last=False)
+
+
+def generate_latex_incremental(content: str) -> dict:
+    """
+    Converts text to LaTeX paragraph by paragraph, reusing cached conversions.
+
+    Each paragraph is hashed; only paragraphs not seen before are sent to the model
+    (concurrently, up to LATEX_MAX_CONCURRENCY), so re-converting an edited document
+    costs about as much as the edited paragraphs.
+
+    Returns:
+        dict: The assembled LaTeX document plus fragment, converted and reused counts.
+    """
+    fragments = split_fragments(content)
+    keys = [_fragment_key(f) for f in fragments]
+
+    converted = {}
+    with _fragment_cache_lock:
+        for key in keys:
+            if key in _fragment_cache:
+                _fragment_cache.move_to_end(key)
+                converted[key] = _fragment_cache[key]
+
+    # Repeated paragraphs within one document are converted once.
+    missing = {key: fragment for key, fragment in zip(keys, fragments) if key not in converted}
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(settings.LATEX_MAX_CONCURRENCY, len(missing))) as pool:
+            for key, latex in zip(missing, pool.map(_convert_fragment, missing.values())):
+                converted[key] = latex
+                _cache_fragment(key, latex)
+
+    body = "\n\n".join(converted[key] for key in keys)
+    return {
+        "latex": LATEX_PREAMBLE + body + LATEX_POSTAMBLE,
+        "fragments": len(fragments),
+        "converted": len(missing),
+        "reused": sum(1 for key in keys if key not in missing),
+    }
+
+
+def _convert_batch_item(content: str) -> dict:
+    try:
+        return {"latex": generate_latex_from_text(content), "error": None}
+    except Exception as e:
+        print(f"LaTeX batch item failed: {e}")
+        return {"latex": None, "error": str(e) or type(e).__name__}
+
+
+def generate_latex_batch(contents: List[str], max_concurrency: Optional[int] = None) -> List[dict]:
+    """
+    Converts several texts to LaTeX concurrently (at most LATEX_MAX_CONCURRENCY at a time).
+
+    Results are returned in input order; a failed item carries its error instead of
+    failing the whole batch.
+
+    Returns:
+        list: One {"index", "latex", "error"} dict per input text.
+    """
+    if not contents:
+        return []
+    workers = min(max_concurrency or settings.LATEX_MAX_CONCURRENCY, len(contents))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_convert_batch_item, contents))
+    return [{"index": i, **result} for i, result in enumerate(results)]
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import time
+from openai import APIConnectionError
+from app.core.config import settings
+from app.core.llm_scheduler import (
+    PRIORITY_INTERACTIVE,
+    PriorityRateLimiter,
+    SingleFlight,
+    backoff_delay,
+)
+from app.core.metrics import LLM_PROMPT_TOKENS, LLM_QUEUE_WAIT, LLM_REQUEST_DURATION, LLM_REQUESTS, LLM_TOKENS
+from app.core.prompts import estimate_message_tokens
+
+# Rough completion size reserved against the token budget when the caller sets no max_tokens.
+DEFAULT_COMPLETION_TOKENS = 1000
+
+rate_limiter = PriorityRateLimiter(settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE)
+_single_flight = SingleFlight()
+
+
+def _request_key(model: str, messages: list, kwargs: dict) -> str:
+    payload = json.dumps({"model": model, "messages": messages, "kwargs": kwargs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _retry_after(exc: Exception):
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    status = getattr(exc, "status_code", None)
+    return isinstance(exc, APIConnectionError) or status == 429 or (status is not None and status >= 500)
+
+
+def _call_with_retries(client, call_site: str, model: str, messages: list, priority: int, kwargs: dict):
+    prompt_tokens = estimate_message_tokens(messages)
+    LLM_PROMPT_TOKENS.observe(prompt_tokens, call_site, "estimated")
+    estimated = prompt_tokens + kwargs.get("max_tokens", DEFAULT_COMPLETION_TOKENS)
+    attempt = 0
+    while True:
+        waited = rate_limiter.acquire(estimated, priority)
+        LLM_QUEUE_WAIT.observe(waited, call_site)
+
+        start = time.perf_counter()
+        try:
+            response = client.chat.completions.create(model=model, messages=messages, **kwargs)
+        except Exception as e:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - start, call_site, model)
+            if not _is_retryable(e) or attempt >= settings.LLM_MAX_RETRIES:
+                LLM_REQUESTS.inc(call_site, model, "error")
+                raise
+            LLM_REQUESTS.inc(call_site, model, "retry")
+            time.sleep(backoff_delay(attempt, settings.LLM_RETRY_BASE_DELAY, settings.LLM_RETRY_MAX_DELAY, _retry_after(e)))
+            attempt += 1
+            continue
+
+        LLM_REQUEST_DURATION.observe(time.perf_counter() - start, call_site, model)
+        LLM_REQUESTS.inc(call_site, model, "success")
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            LLM_TOKENS.inc(call_site, model, "prompt", amount=usage.prompt_tokens or 0)
+            LLM_PROMPT_TOKENS.observe(usage.prompt_tokens or 0, call_site, "reported")
+            LLM_TOKENS.inc(call_site, model, "completion", amount=usage.completion_tokens or 0)
+            rate_limiter.record_usage(estimated, usage.total_tokens or estimated)
+        return response
+
+
+def create_chat_completion(client, call_site: str, model: str, messages: list, priority: int = PRIORITY_INTERACTIVE, **kwargs):
+    """
+    Runs a chat completion through the shared LLM scheduler.
+
+    Identical in-flight requests are coalesced into one API call, calls are admitted through
+    request/token per-minute budgets in priority order, and 429/5xx failures are retried with
+    jittered exponential backoff. Latency, token usage and outcomes are recorded per call site.
+
+    Args:
+        client: The OpenAI client used for the call.
+        call_site (str): Metric label identifying the caller (e.g. "timeline").
+        model (str): The model name.
+        messages (list): Chat messages passed to the completion.
+        priority (int): PRIORITY_INTERACTIVE for user-facing calls, PRIORITY_BATCH for background work.
+
+    Returns:
+        The completion response returned by the client.
+    """
+    key = _request_key(model, messages, kwargs)
+    response, shared = _single_flight.do(
+        key, lambda: _call_with_retries(client, call_site, model, messages, priority, kwargs)
+    )
+    if shared:
+        LLM_REQUESTS.inc(call_site, model, "coalesced")
+    return response
@@ -0,0 +1,182 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import case, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.change_log import ChangeLogEntry
+from app.models.metric_snapshot import PortfolioMetricSnapshot, ProjectMetricSnapshot
+from app.models.project import Project
+from app.models.timeline import TimelineEntry
+from app.services.change_log_service import current_cursor
+
+PHASE_FIELDS = ("total_phases", "completed_phases", "in_progress_phases", "upcoming_phases", "completion_percentage")
+
+
+def _percentage(completed: int, total: int) -> int:
+    # Same rounding as build_project_metrics.
+    return int((completed / total) * 100) if total > 0 else 0
+
+
+def _full_counts(db: Session, day: date, project_ids: Optional[Iterable[int]] = None) -> Dict[int, list]:
+    """[total, completed, upcoming] on `day` per live project (all of them, or `project_ids`)."""
+    query = (
+        db.query(
+            Project.id,
+            func.count(TimelineEntry.id),
+            func.coalesce(func.sum(case((TimelineEntry.end < day, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((TimelineEntry.start > day, 1), else_=0)), 0),
+        )
+        .outerjoin(TimelineEntry, TimelineEntry.project_id == Project.id)
+        .filter(Project.deleted_at.is_(None))
+        .group_by(Project.id)
+    )
+    if project_ids is not None:
+        query = query.filter(Project.id.in_(list(project_ids)))
+    return {project_id: [total, completed, upcoming] for project_id, total, completed, upcoming in query}
+
+
+def _incremental_counts(db: Session, day: date, previous: PortfolioMetricSnapshot) -> Dict[int, list]:
+    """
+    Counts on `day` derived from the previous day's snapshot.
+
+    From one day to the next an entry only changes status on its start day (upcoming to in
+    progress) and the day after its end (to completed), so unchanged projects apply those
+    two deltas. Projects with change-log entries since the previous snapshot (edited,
+    created, deleted or archived) are recomputed from their timeline instead.
+    """
+    changed = {
+        project_id
+        for (project_id,) in db.query(ChangeLogEntry.project_id)
+        .filter(ChangeLogEntry.id > previous.change_cursor)
+        .distinct()
+    }
+    counts = {
+        project_id: [total, completed, upcoming]
+        for project_id, total, completed, upcoming in db.query(
+            ProjectMetricSnapshot.project_id,
+            ProjectMetricSnapshot.total_phases,
+            ProjectMetricSnapshot.completed_phases,
+            ProjectMetricSnapshot.upcoming_phases,
+        ).filter(ProjectMetricSnapshot.day == previous.day)
+        if project_id not in changed
+    }
+
+    started = db.query(TimelineEntry.project_id, func.count()).filter(TimelineEntry.start == day).group_by(TimelineEntry.project_id)
+    for project_id, count in started:
+        if project_id in counts:
+            counts[project_id][2] -= count
+    ended = db.query(TimelineEntry.project_id, func.count()).filter(TimelineEntry.end == day - timedelta(days=1)).group_by(TimelineEntry.project_id)
+    for project_id, count in ended:
+        if project_id in counts:
+            counts[project_id][1] += count
+
+    if changed:
+        counts.update(_full_counts(db, day, changed))
+    return counts
+
+
+def _write_snapshot(db: Session, day: date, counts: Dict[int, list], cursor: int) -> PortfolioMetricSnapshot:
+    rows = []
+    for project_id, (total, completed, upcoming) in counts.items():
+        rows.append({
+            "project_id": project_id,
+            "day": day,
+            "total_phases": total,
+            "completed_phases": completed,
+            "in_progress_phases": total - completed - upcoming,
+            "upcoming_phases": upcoming,
+            "completion_percentage": _percentage(completed, total),
+        })
+    if rows:
+        db.execute(insert(ProjectMetricSnapshot), rows)
+
+    total = sum(row["total_phases"] for row in rows)
+    completed = sum(row["completed_phases"] for row in rows)
+    upcoming = sum(row["upcoming_phases"] for row in rows)
+    portfolio = PortfolioMetricSnapshot(
+        day=day,
+        projects=len(rows),
+        total_phases=total,
+        completed_phases=completed,
+        in_progress_phases=total - completed - upcoming,
+        upcoming_phases=upcoming,
+        completion_percentage=_percentage(completed, total),
+        change_cursor=cursor,
+    )
+    db.add(portfolio)
+    db.commit()
+    return portfolio
+
+
+def take_daily_snapshots(db: Session, day: Optional[date] = None) -> int:
+    """
+    Appends metric snapshots for every day after the latest one up to `day` (default today).
+
+    The first snapshot computes every project from its timeline; each later day starts
+    from the day before (see _incremental_counts). Days already snapshotted are skipped,
+    so the job can run any number of times a day. Each day commits separately. Future
+    days are rejected (they would block the real snapshots for those dates), and one
+    call catches up at most METRIC_SNAPSHOT_MAX_BACKFILL_DAYS days; a longer gap is
+    closed by calling again.
+
+    Returns:
+        int: Number of days written.
+    """
+    today = date.today()
+    day = day or today
+    if day > today:
+        raise HTTPException(status_code=400, detail="Snapshots cannot be taken for future days")
+    previous = db.query(PortfolioMetricSnapshot).order_by(PortfolioMetricSnapshot.day.desc()).first()
+    if previous is not None and previous.day >= day:
+        return 0
+
+    current = previous.day + timedelta(days=1) if previous is not None else day
+    day = min(day, current + timedelta(days=settings.METRIC_SNAPSHOT_MAX_BACKFILL_DAYS - 1))
+    written = 0
+    while current <= day:
+        # Read before the timeline, so changes racing the snapshot are recomputed next time.
+        cursor = current_cursor(db)
+        counts = _full_counts(db, current) if previous is None else _incremental_counts(db, current, previous)
+        try:
+            previous = _write_snapshot(db, current, counts, cursor)
+        except IntegrityError:
+            # A concurrent run wrote this day first; it carries on from here.
+            db.rollback()
+            return written
+        written += 1
+        print(f"Metrics snapshot for {current}: {len(counts)} projects")
+        current += timedelta(days=1)
+    return written
+
+
+def get_metric_trend(
+    db: Session, project_id: Optional[int] = None, start: Optional[date] = None, end: Optional[date] = None
+) -> dict:
+    """
+    Daily phase counts of a project (or of the whole portfolio) from `start` to `end`.
+
+    Returns:
+        dict: Column-oriented series, "days" plus one list per PHASE_FIELDS entry (and
+        "projects" for the portfolio), for days that have a snapshot.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=89)
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days >= settings.ANALYTICS_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.ANALYTICS_MAX_POINTS} points per series")
+
+    if project_id is None:
+        model, fields = PortfolioMetricSnapshot, ("projects",) + PHASE_FIELDS
+        query = db.query(model.day, *(getattr(model, f) for f in fields))
+    else:
+        model, fields = ProjectMetricSnapshot, PHASE_FIELDS
+        query = db.query(model.day, *(getattr(model, f) for f in fields)).filter(model.project_id == project_id)
+    rows = query.filter(model.day >= start, model.day <= end).order_by(model.day).all()
+
+    series: Dict[str, List] = {"days": [row[0].isoformat() for row in rows]}
+    for index, field in enumerate(fields, 1):
+        series[field] = [row[index] for row in rows]
+    return {"project_id": project_id, **series}
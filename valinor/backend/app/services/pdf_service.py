@@ -5,6 +5,23 @@ from openai import OpenAI
 import json
 from app.models.template import Template, TemplateSection, TemplateSubtitle
 from app.db.session import SessionLocal
+from typing import Optional
+from app.core.config import settings
+from app.core.metrics import PDF_PAGE_PARSE_DURATION, PDF_PAGES, PDF_PARSE_DURATION, TEMPLATE_EXTRACTIONS
+from app.core.llm_scheduler import PRIORITY_BATCH
+from app.core.prompts import PromptBudget
+from app.services.llm_service import create_chat_completion
+from app.services.pdf_structure_service import LineCollector, extract_structure
+from app.services.template_dedup_service import find_duplicate_templates, index_template_signature
+from app.services.template_service import invalidate_template_catalog
+
+TEMPLATE_SYSTEM_PROMPT = "You are an AI that converts documents into structured templates with sections and subtitles."
+TEMPLATE_INSTRUCTIONS = """Build a template with sections and subtitles from the document below.
+Return only a JSON object: {"name": str, "description": str, "sections": [{"title": str, "subtitles": [str]}]}
+Rules: 2-5 sections, each with a clear title and 2-4 subtitles; keep names concise but descriptive.
+
+Document:
+"""
 
 def parse_pdf(contents: bytes, filename: str):
     """
@@ -14,19 +31,34 @@ def parse_pdf(contents: bytes, filename: str):
         contents (bytes): The binary content of the uploaded PDF.
 
     Returns:
-        dict: A dictionary containing filename, page count, and extracted text.
+        dict: A dictionary containing filename, page count, extracted text, and the
+        section structure found in the outline or headings (None if not confident).
     """
     try:
-        pdf_file = BytesIO(contents)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        with PDF_PARSE_DURATION.time():
+            pdf_file = BytesIO(contents)
+            pdf_reader = PyPDF2.PdfReader(pdf_file)
 
-        text_content = [page.extract_text() for page in pdf_reader.pages]
-        full_text = "\n".join(filter(None, text_content))  # Remove None values
+            text_content = []
+            # Records font sizes while extracting, so heading detection needs no second pass.
+            lines = LineCollector()
+            for page in pdf_reader.pages:
+                with PDF_PAGE_PARSE_DURATION.time():
+                    text_content.append(page.extract_text(visitor_text=lines))
+            PDF_PAGES.inc(amount=len(text_content))
+            full_text = "\n".join(filter(None, text_content))  # Remove None values
+            try:
+                structure = extract_structure(pdf_reader, lines.finish())
+            except Exception as e:
+                # The structure is a bonus; a broken outline must not fail the upload.
+                print(f"Structure extraction failed for {filename}: {e}")
+                structure = None
 
         return {
             "filename": filename,
             "page_count": len(pdf_reader.pages),
-            "content": full_text
+            "content": full_text,
+            "structure": structure,
         }
     except Exception as e:
         raise ValueError(f"Failed to parse PDF: {str(e)}")
@@ -43,40 +75,22 @@ def generate_template_data(raw_text: str, file_name: str) -> dict:
         dict: Structured template data ready for DB insertion
     """
     try:
-        client = OpenAI()
+        client = OpenAI(max_retries=0)
 
-        prompt = f"""
-        Analyze the following document text and generate a structured template object.
-        Create a logical structure with sections and subtitles based on the document content.
-        
-        Return the response as a valid JSON object with this exact structure:
-        {{
-          "name": "string",
-          "description": "string",
-          "sections": [
-            {{
-              "title": "string",
-              "subtitles": ["string", "string"]
-            }}
-          ]
-        }}
-
-        Rules:
-        - Each section should have a clear title
-        - Subtitles should be an array of strings
-        - Keep section and subtitle names concise but descriptive
-        - Extract 2-5 sections from the content
-        - Each section should have 2-4 subtitles
-
-        Document content:
-        {raw_text}
-        """
+        # The document is the only part that grows; shrink it to what the budget leaves.
+        document = PromptBudget("pdf_template", settings.LLM_PROMPT_BUDGET_PDF_TEMPLATE).fit(
+            [TEMPLATE_SYSTEM_PROMPT, TEMPLATE_INSTRUCTIONS], raw_text
+        )
+        prompt = TEMPLATE_INSTRUCTIONS + document
 
         print("Generating template data...")
-        response = client.chat.completions.create(
+        response = create_chat_completion(
+            client,
+            "pdf_template",
             model="gpt-4",
+            priority=PRIORITY_BATCH,
             messages=[
-                {"role": "system", "content": "You are an AI that converts documents into structured templates with sections and subtitles."},
+                {"role": "system", "content": TEMPLATE_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ]
         )
@@ -135,10 +149,13 @@ def create_template_in_db(template_data: dict) -> Template:
             
             template.sections.append(section)
 
-        # Add and commit to database
+        # Add and commit to database, together with the signature used for duplicate detection
         db.add(template)
+        db.flush()
+        index_template_signature(db, template.id, template_data["sections"])
         db.commit()
         db.refresh(template)
+        invalidate_template_catalog()
         print("Template created in database")
         return template
         
@@ -148,23 +165,70 @@ def create_template_in_db(template_data: dict) -> Template:
     finally:
         db.close()
 
-def generate_template(raw_text: str, file_name: str) -> Template:
+def template_data_from_structure(structure: dict, file_name: str) -> dict:
+    """Builds template data (as generate_template_data returns it) from a locally extracted structure."""
+    return {
+        "name": structure.get("name") or file_name.rsplit(".", 1)[0],
+        "description": f"Template extracted from {file_name}",
+        "icon": None,
+        "sections": structure["sections"],
+    }
+
+
+def find_template_duplicates(template_data: dict) -> list:
+    """Looks up existing templates with nearly the same sections and subtitles as `template_data`."""
+    db = SessionLocal()
+    try:
+        return find_duplicate_templates(db, template_data["sections"])
+    finally:
+        db.close()
+
+
+def get_existing_template(template_id: int) -> Template:
+    db = SessionLocal()
+    try:
+        return db.query(Template).filter(Template.id == template_id).first()
+    finally:
+        db.close()
+
+
+def generate_template(
+    raw_text: str, file_name: str, structure: Optional[dict] = None, reuse_duplicates: bool = False
+) -> dict:
     """
     Main function that coordinates template generation and database creation.
     
     Args:
         raw_text (str): The extracted text content from the PDF.
         file_name (str): The name of the uploaded file.
+        structure (dict, optional): Sections found in the PDF outline or headings by parse_pdf;
+            when given, the LLM is skipped.
+        reuse_duplicates (bool): Return the closest existing template instead of creating
+            a near-duplicate of it.
         
     Returns:
-        Template: The created Template object with all relationships
+        dict: The template (created or reused), whether it was reused, and the near-duplicate
+        templates found in the catalog so clients can offer to reuse one of them.
     """
     print("Generating template...")
-    # First generate the template data using AI
-    template_data = generate_template_data(raw_text, file_name)
+    if structure:
+        print(f"Using the document {structure['method']} for the template structure")
+        TEMPLATE_EXTRACTIONS.inc(structure["method"])
+        template_data = template_data_from_structure(structure, file_name)
+    else:
+        # Otherwise generate the template data using AI
+        TEMPLATE_EXTRACTIONS.inc("llm")
+        template_data = generate_template_data(raw_text, file_name)
     
+    duplicates = find_template_duplicates(template_data)
+    if duplicates and reuse_duplicates:
+        existing = get_existing_template(duplicates[0]["template_id"])
+        if existing is not None:
+            print(f"Reusing template {existing.id} ({duplicates[0]['similarity']:.2f} similar)")
+            return {"template": existing, "reused": True, "duplicates": duplicates}
+
     # Then create it in the database
     created_template = create_template_in_db(template_data)
     print(f"The following template was created: {created_template}")
-    return created_template
+    return {"template": created_template, "reused": False, "duplicates": duplicates}
 
@@ -0,0 +1,195 @@
+"""
+Local extraction of a template's section/subtitle tree from a PDF.
+
+Two sources, tried in order:
+
+1. The PDF outline (bookmarks): top-level entries become sections, their children subtitles.
+2. Heading typography: text noticeably larger than the body font, or bold, becomes a
+   heading; numbering ("2.", "2.1", "IV.") and relative size decide its level.
+
+A structure is only returned when it looks trustworthy (enough sections, headings that
+are short and a small share of the text); otherwise callers fall back to the LLM.
+"""
+
+import re
+from collections import Counter
+from typing import List, Optional
+
+MIN_SECTIONS = 2
+MAX_SECTIONS = 40
+MAX_HEADING_LENGTH = 100
+# Text at least this much larger than the body font counts as a heading.
+HEADING_SIZE_RATIO = 1.15
+# More heading lines than this share of all lines means the typography is not a reliable signal.
+MAX_HEADING_SHARE = 0.5
+
+_NUMBERING_RE = re.compile(r"^\s*(?:(?P<arabic>\d+(?:\.\d+)*)\.?|(?P<roman>[IVXLC]+)\.|(?P<letter>[A-Z])\.)\s+(?=\S)")
+_BOLD_FONT_RE = re.compile(r"bold|black|heavy|semibold|demi", re.I)
+
+
+def _clean_title(title: str) -> str:
+    return _NUMBERING_RE.sub("", " ".join(title.split())).strip(" .:")
+
+
+def _numbering_level(text: str) -> Optional[int]:
+    m = _NUMBERING_RE.match(text)
+    if not m:
+        return None
+    if m.group("arabic"):
+        return m.group("arabic").count(".") + 1
+    return 1 if m.group("roman") else 2
+
+
+def _confident(sections: List[dict]) -> bool:
+    if not MIN_SECTIONS <= len(sections) <= MAX_SECTIONS:
+        return False
+    titles = [s["title"] for s in sections] + [t for s in sections for t in s["subtitles"]]
+    return all(0 < len(t) <= MAX_HEADING_LENGTH for t in titles) and len(set(s["title"] for s in sections)) == len(sections)
+
+
+def _tree_from_levels(headings: List[tuple]) -> tuple:
+    """Builds (name, sections) from (level, title) pairs, treating a lone top-level heading as the document name."""
+    name = None
+    levels = sorted(set(level for level, _ in headings))
+    if len(levels) > 1 and sum(1 for level, _ in headings if level == levels[0]) == 1 and headings[0][0] == levels[0]:
+        name = headings[0][1]
+        headings = headings[1:]
+        levels = levels[1:]
+
+    sections: List[dict] = []
+    top = levels[0] if levels else 1
+    for level, title in headings:
+        if level == top:
+            sections.append({"title": title, "subtitles": []})
+        elif sections and level == top + 1:
+            sections[-1]["subtitles"].append(title)
+    return name, sections
+
+
+def from_outline(reader) -> Optional[dict]:
+    """Section tree from the PDF bookmarks, or None when the outline is missing or unconvincing."""
+    try:
+        outline = reader.outline
+    except Exception:
+        return None
+
+    headings = []
+
+    def walk(items, level):
+        for item in items:
+            if isinstance(item, list):
+                walk(item, level + 1)
+            else:
+                title = _clean_title(str(getattr(item, "title", "") or ""))
+                if title:
+                    headings.append((level, title))
+
+    walk(outline or [], 1)
+    if not headings:
+        return None
+    name, sections = _tree_from_levels(headings)
+    if not _confident(sections):
+        return None
+    return {"name": name, "sections": sections, "method": "outline"}
+
+
+class LineCollector:
+    """
+    `visitor_text` callback for PyPDF2's `extract_text` that records each text line with its
+    rendered font size and whether the font is bold, so headings can be found in the same
+    pass that extracts the text.
+    """
+
+    def __init__(self):
+        self.lines: List[dict] = []
+        self._current = None
+        self._last_y = None
+
+    def __call__(self, text, cm, tm, font_dict, font_size):
+        scale = abs((tm[3] if tm else 1) * (cm[3] if cm else 1)) or 1
+        size = round((font_size or 0) * scale, 1)
+        y = (tm[5] if tm else 0) * (cm[3] if cm else 1) + (cm[5] if cm else 0)
+        font_name = str(font_dict.get("/BaseFont", "")) if hasattr(font_dict, "get") else str(font_dict or "")
+        bold = bool(_BOLD_FONT_RE.search(font_name))
+
+        if self._last_y is not None and abs(y - self._last_y) > 1:
+            self._close()
+        self._last_y = y
+
+        pieces = text.split("\n")
+        for i, piece in enumerate(pieces):
+            if i > 0:
+                self._close()
+            if not piece.strip():
+                continue
+            if self._current is None:
+                self._current = {"text": piece, "size": size, "bold": bold}
+            else:
+                self._current["text"] += piece
+                self._current["size"] = max(self._current["size"], size)
+                self._current["bold"] = self._current["bold"] and bold
+
+    def _close(self):
+        if self._current is not None and self._current["text"].strip():
+            self._current["text"] = " ".join(self._current["text"].split())
+            self.lines.append(self._current)
+        self._current = None
+
+    def finish(self) -> List[dict]:
+        self._close()
+        return self.lines
+
+
+def from_headings(lines: List[dict]) -> Optional[dict]:
+    """Section tree from heading typography, or None when headings cannot be told apart reliably."""
+    if not lines:
+        return None
+    weights = Counter()
+    for line in lines:
+        weights[line["size"]] += len(line["text"])
+    body_size = weights.most_common(1)[0][0]
+    if not body_size:
+        return None
+
+    candidates = []
+    for line in lines:
+        text = line["text"]
+        # Headings are short and do not read like sentences.
+        if len(text) > MAX_HEADING_LENGTH or text.endswith((",", ";")) or (text.endswith(".") and len(text.split()) > 8):
+            continue
+        larger = line["size"] >= body_size * HEADING_SIZE_RATIO
+        if larger or (line["bold"] and line["size"] >= body_size):
+            candidates.append(line)
+    if not candidates or len(candidates) > MAX_HEADING_SHARE * len(lines):
+        return None
+
+    # Numbered headings take their level from the numbering; an unnumbered heading set larger
+    # than all of them is the document title. Without numbering, bigger type is a higher level.
+    numbered = [c for c in candidates if _numbering_level(c["text"])]
+    headings = []
+    if len(numbered) * 2 >= len(candidates):
+        largest_numbered = max(c["size"] for c in numbered)
+        for c in candidates:
+            level = _numbering_level(c["text"]) or (0 if c["size"] > largest_numbered else None)
+            if level is not None and _clean_title(c["text"]):
+                headings.append((level, _clean_title(c["text"])))
+    else:
+        sizes = sorted({c["size"] for c in candidates}, reverse=True)
+        for c in candidates:
+            if _clean_title(c["text"]):
+                headings.append((sizes.index(c["size"]) + 1, _clean_title(c["text"])))
+    if not headings:
+        return None
+
+    name, sections = _tree_from_levels(headings)
+    if not _confident(sections):
+        return None
+    return {"name": name, "sections": sections, "method": "headings"}
+
+
+def extract_structure(reader, lines: List[dict]) -> Optional[dict]:
+    """
+    Returns {"name", "sections": [{"title", "subtitles"}], "method"} built from the outline or
+    heading typography of a parsed PDF, or None when neither gives a confident structure.
+    """
+    return from_outline(reader) or from_headings(lines)
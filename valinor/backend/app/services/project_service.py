@@ -1,8 +1,12 @@
 import json
+import threading
+import time
+import orjson
+from collections import defaultdict
 from datetime import date
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, update
 from fastapi import HTTPException
 from app.schemas.project_schema import (
     CreateProjectRequest,
@@ -20,6 +24,18 @@ from app.models.timeline import TimelineEntry
 from app.models.user import User
 from app.models.associations import project_collaborators
 from app.models.template import Template, TemplateSection, TemplateSubtitle
+from app.services.change_log_service import (
+    DELETE,
+    PROJECT,
+    TIMELINE_ENTRY,
+    UPSERT,
+    read_changes,
+    record_changes,
+    record_project_timeline_deleted,
+)
+from app.services.document_service import delete_project_documents
+from app.db.session import SessionLocal
+from app.db.json_aggregation import as_text, json_array, json_object, supports_json_aggregation
 
 
 def create_project(request: CreateProjectRequest, db: Session) -> ProjectResponse:
@@ -43,8 +59,8 @@ def create_project(request: CreateProjectRequest, db: Session) -> ProjectRespons
     )
 
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    # Flush (not commit) so the project, its timeline and their change-log rows commit together.
+    db.flush()
     print(f"Project inserted: {new_project.id}")
 
     collaborators = db.query(User).filter(User.email.in_(request.collaborators)).all()
@@ -74,6 +90,16 @@ def create_project(request: CreateProjectRequest, db: Session) -> ProjectRespons
         timeline_entries.append(timeline_entry)
 
     db.add_all(timeline_entries)
+    db.flush()
+    record_changes(
+        db,
+        [(PROJECT, new_project.id, new_project.id, UPSERT)]
+        + [
+            (TIMELINE_ENTRY, entry.id, new_project.id, UPSERT)
+            for entry in timeline_entries
+        ],
+        collaborators=[user.email for user in collaborators],
+    )
     db.commit()
 
     for timeline_entry in timeline_entries:
@@ -107,218 +133,408 @@ def create_project(request: CreateProjectRequest, db: Session) -> ProjectRespons
     }
 
 
-def get_projects_overview(db: Session) -> List[ProjectResponse]:
+def _timeline_entry_dict(row) -> dict:
+    """Builds a TimelineEntryResponse-shaped dict from a timeline row tuple (no model validation)."""
+    entry_id, project_id, section, subtitle, responsible_email, description, start, end = row
+    return {
+        "id": entry_id,
+        "project_id": project_id,
+        "section": section,
+        "subtitle": subtitle,
+        "responsible_email": responsible_email,
+        "description": description,
+        "start": start,
+        "end": end,
+    }
+
+
+def _timeline_rows_query(db: Session):
+    # Column order must match the unpacking in _timeline_entry_dict.
+    return db.query(
+        TimelineEntry.id,
+        TimelineEntry.project_id,
+        TimelineEntry.section,
+        TimelineEntry.subtitle,
+        User.email.label("responsible_email"),
+        TimelineEntry.description,
+        TimelineEntry.start,
+        TimelineEntry.end,
+    ).outerjoin(User, TimelineEntry.responsible_id == User.id)
+
+
+# Top-level fields of a ProjectResponse, in response order, and the relations loaded with extra queries.
+PROJECT_FIELDS = ("id", "title", "description", "template", "template_id", "start_date", "deadline")
+PROJECT_RELATIONS = ("collaborators", "timeline")
+
+
+def resolve_project_fields(fields: Optional[str] = None, include: Optional[str] = None):
+    """
+    Parses the `fields` / `include` query options of the project read endpoints.
+
+    - Neither given: every field and relation (the full ProjectResponse).
+    - `fields` given: only those fields; relations may be listed in `fields` or `include`.
+    - Only `include` given: every scalar field plus the listed relations.
+    The project id is always returned.
+
+    Returns:
+        tuple: (scalar field names in response order, set of relation names)
+
+    Raises:
+        HTTPException: 400 if an unknown field or relation is requested.
+    """
+    if fields is None and include is None:
+        return list(PROJECT_FIELDS), set(PROJECT_RELATIONS)
+
+    requested_fields = {f.strip() for f in (fields or "").split(",") if f.strip()}
+    requested_relations = {r.strip() for r in (include or "").split(",") if r.strip()}
+    unknown = (requested_fields - set(PROJECT_FIELDS) - set(PROJECT_RELATIONS)) | (
+        requested_relations - set(PROJECT_RELATIONS)
+    )
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown project fields: {', '.join(sorted(unknown))}")
+
+    relations = requested_relations | (requested_fields & set(PROJECT_RELATIONS))
+    if fields is None:
+        return list(PROJECT_FIELDS), relations
+    scalar = [f for f in PROJECT_FIELDS if f == "id" or f in requested_fields]
+    return scalar, relations
+
+
+def _project_rows_query(db: Session, scalar_fields: List[str]):
+    """Selects only the requested project columns; the template join runs only when its name is needed."""
+    columns = [Template.name if f == "template" else getattr(Project, f) for f in scalar_fields]
+    query = db.query(*columns).filter(Project.deleted_at.is_(None))
+    if "template" in scalar_fields:
+        query = query.join(Template, Project.template_id == Template.id)
+    return query
+
+
+def _project_dict(scalar_fields: List[str], row, collaborators: Optional[List[str]], timeline: Optional[List[dict]]) -> dict:
+    """Builds a (possibly sparse) ProjectResponse-shaped dict from a project row tuple, without model validation."""
+    project = dict(zip(scalar_fields, row))
+    if collaborators is not None:
+        project["collaborators"] = collaborators
+    if timeline is not None:
+        project["timeline"] = timeline
+    return project
+
+
+def get_projects_overview(db: Session, fields: Optional[str] = None, include: Optional[str] = None) -> List[dict]:
     """
-    Fetch all projects from the database and return them in the new response format.
+    Fetch all projects from the database and return them in the ProjectResponse format.
+
+    Collaborators and timeline entries are loaded with one query each and grouped by project,
+    and the response is built as plain dicts straight from the row tuples; routes encode it
+    directly (see ORJSONResponse) instead of re-validating it through response_model.
+    `fields` / `include` (see resolve_project_fields) narrow the selected columns and skip
+    the collaborator and timeline queries entirely when those relations are not requested.
 
     Args:
         db (Session): SQLAlchemy database session.
+        fields (str, optional): Comma-separated response fields.
+        include (str, optional): Comma-separated relations ("timeline", "collaborators").
 
     Returns:
-        List[ProjectResponse]: A list of ProjectResponse objects, each containing:
+        List[dict]: One ProjectResponse-shaped dict per project, each containing (when selected):
             - id (int): The project ID.
             - title (str): The project title.
             - description (str): The project description.
             - template (str): The name of the template associated with the project.
+            - template_id (int): The ID of the template.
+            - start_date (date): The start date of the project.
+            - deadline (date): The deadline of the project.
             - collaborators (List[str]): A list of email addresses of the project's collaborators.
-            - start_date (datetime): The start date of the project.
-            - deadline (datetime): The deadline of the project.
-            - timeline (List[TimelineEntryResponse]): A list of timeline entries associated with the project, each containing:
+            - timeline (List[dict]): The project's timeline entries, each containing:
                 - id (int): The timeline entry ID.
                 - project_id (int): The ID of the project the timeline entry belongs to.
                 - section (str): The section of the timeline entry.
                 - subtitle (str): The subtitle of the timeline entry.
                 - responsible_email (str): The email of the user responsible for the timeline entry.
                 - description (str): The description of the timeline entry.
-                - start (datetime): The start date of the timeline entry.
-                - end (datetime): The end date of the timeline entry.
-
-    Fetch all projects from the database and return them in the new response format.
+                - start (date): The start date of the timeline entry.
+                - end (date): The end date of the timeline entry.
     """
+    scalar_fields, relations = resolve_project_fields(fields, include)
+    return _project_dicts(db, scalar_fields, relations)
 
-    projects = (
-        db.query(
-            Project.id,
-            Project.title,
-            Project.description,
-            Project.template_id,
-            Project.start_date,
-            Project.deadline,
-            Template.name.label("template_name"),
-        )
-        .join(Template, Project.template_id == Template.id)
-        .all()
-    )
 
-    project_list = []
+def get_projects_by_ids(project_ids: List[int], db: Session) -> List[dict]:
+    """Full ProjectResponse-shaped dicts for the given (live) projects, loaded with three queries."""
+    return _project_dicts(db, list(PROJECT_FIELDS), set(PROJECT_RELATIONS), project_ids)
 
-    for proj in projects:
-        # Fetch collaborators for the project
-        collaborators = (
-            db.query(User.email)
-            .join(project_collaborators, project_collaborators.c.user_id == User.id)
-            .filter(project_collaborators.c.project_id == proj.id)
-            .all()
-        )
 
-        # Fetch timeline entries for the project
-        timeline_entries = (
-            db.query(
-                TimelineEntry.id,
-                TimelineEntry.project_id,
-                TimelineEntry.section,
-                TimelineEntry.subtitle,
-                User.email.label("responsible_email"),
-                TimelineEntry.description,
-                TimelineEntry.start,
-                TimelineEntry.end,
-            )
-            .outerjoin(User, TimelineEntry.responsible_id == User.id)
-            .filter(TimelineEntry.project_id == proj.id)
-            .all()
+def _project_dicts(db: Session, scalar_fields: List[str], relations, project_ids: Optional[List[int]] = None) -> List[dict]:
+    """Projects (all of them, or only `project_ids`) with their relations grouped in from one query each."""
+    projects = _project_rows_query(db, scalar_fields)
+    if project_ids is not None:
+        projects = projects.filter(Project.id.in_(project_ids))
+    projects = projects.all()
+
+    collaborators_by_project = None
+    if "collaborators" in relations:
+        collaborators_by_project = defaultdict(list)
+        collaborator_rows = db.query(project_collaborators.c.project_id, User.email).join(
+            User, project_collaborators.c.user_id == User.id
         )
+        if project_ids is not None:
+            collaborator_rows = collaborator_rows.filter(project_collaborators.c.project_id.in_(project_ids))
+        for project_id, email in collaborator_rows.all():
+            collaborators_by_project[project_id].append(email)
+
+    timeline_by_project = None
+    if "timeline" in relations:
+        timeline_by_project = defaultdict(list)
+        timeline_rows = _timeline_rows_query(db)
+        if project_ids is not None:
+            timeline_rows = timeline_rows.filter(TimelineEntry.project_id.in_(project_ids))
+        for row in timeline_rows.all():
+            timeline_by_project[row[1]].append(_timeline_entry_dict(row))
+
+    # "id" is always the first selected column.
+    return [
+        _project_dict(
+            scalar_fields,
+            proj,
+            collaborators_by_project[proj[0]] if collaborators_by_project is not None else None,
+            timeline_by_project[proj[0]] if timeline_by_project is not None else None,
+        )
+        for proj in projects
+    ]
 
-        formatted_timeline = [
-            TimelineEntryResponse(
-                id=entry.id,
-                project_id=entry.project_id,
-                section=entry.section,
-                subtitle=entry.subtitle,
-                responsible_email=entry.responsible_email,
-                description=entry.description,
-                start=entry.start,
-                end=entry.end,
-            )
-            for entry in timeline_entries
-        ]
 
-        project_list.append(
-            ProjectResponse(
-                id=proj.id,
-                title=proj.title,
-                description=proj.description,
-                template=proj.template_name,
-                template_id=proj.template_id,
-                collaborators=[c.email for c in collaborators],
-                start_date=proj.start_date,
-                deadline=proj.deadline,
-                timeline=formatted_timeline,
-            )
-        )
+def soft_delete_projects(project_ids: List[int], db: Session) -> List[int]:
+    """
+    Marks projects deleted with a single UPDATE and commits.
+
+    Deleted projects disappear from every read at once; their rows (timeline entries,
+    collaborator links, documents) are removed later by purge_deleted_projects.
+
+    Returns:
+        List[int]: The ids that were deleted by this call (unknown or already deleted ids are skipped).
+    """
+    deleted = sorted(
+        db.execute(
+            update(Project)
+            .where(Project.id.in_(set(project_ids)), Project.deleted_at.is_(None))
+            .values(deleted_at=func.now())
+            .returning(Project.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+    # Tombstones for sync clients and push subscribers, while the timeline rows still exist to be selected
+    record_project_timeline_deleted(db, deleted)
+    record_changes(db, [(PROJECT, project_id, project_id, DELETE) for project_id in deleted])
+    db.commit()
+    return deleted
 
-    return project_list
+
+def bulk_delete_projects(project_ids: List[int], db: Session) -> dict:
+    """Soft-deletes many projects at once; see soft_delete_projects."""
+    deleted = soft_delete_projects(project_ids, db)
+    deleted_set = set(deleted)
+    return {"deleted": deleted, "not_found": sorted(set(project_ids) - deleted_set)}
 
 
 def delete_project_by_id(project_id: int, db: Session):
-    """Deletes a project and its associated timeline entries."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    """Deletes a project and its associated timeline entries (rows are purged in the background)."""
+    if not soft_delete_projects([project_id], db):
         raise HTTPException(status_code=404, detail="Project not found")
+    return {"message": "Project and its timeline deleted successfully"}
 
-    # Delete all timeline entries related to this project
-    db.query(TimelineEntry).filter(TimelineEntry.project_id == project_id).delete()
 
-    db.delete(project)
-    db.commit()
+def purge_deleted_projects(db: Session, batch_size: Optional[int] = None, pause: Optional[float] = None) -> int:
+    """
+    Removes the rows of soft-deleted projects, a few projects per transaction.
 
-    return {"message": "Project and its timeline deleted successfully"}
+    Each batch is committed separately with a short pause in between, so a large cleanup
+    never holds locks on the timeline and collaborator tables for long.
 
+    Returns:
+        int: Number of projects purged.
+    """
+    batch_size = batch_size or settings.PROJECT_PURGE_BATCH_SIZE
+    pause = settings.PROJECT_PURGE_PAUSE_SECONDS if pause is None else pause
+    purged = 0
+    while True:
+        project_ids = [
+            project_id
+            for (project_id,) in db.query(Project.id)
+            .filter(Project.deleted_at.isnot(None))
+            .order_by(Project.deleted_at)
+            .limit(batch_size)
+        ]
+        if not project_ids:
+            return purged
+        delete_project_documents(project_ids, db)
+        db.query(TimelineEntry).filter(TimelineEntry.project_id.in_(project_ids)).delete(synchronize_session=False)
+        db.execute(project_collaborators.delete().where(project_collaborators.c.project_id.in_(project_ids)))
+        db.query(Project).filter(Project.id.in_(project_ids)).delete(synchronize_session=False)
+        db.commit()
+        purged += len(project_ids)
+        print(f"Purged {purged} deleted projects")
+        if pause:
+            time.sleep(pause)
 
-def get_project_full(project_id: int, db: Session) -> ProjectResponse:
 
-    # Retrieve the project with its template name
-    project_data = (
-        db.query(
-            Project.id,
-            Project.title,
-            Project.description,
-            Project.start_date,
-            Project.deadline,
-            Project.template_id,
-            Template.name.label("template_name"),
-        )
-        .join(Template, Project.template_id == Template.id)
-        .filter(Project.id == project_id)
-        .first()
-    )
+_purge_lock = threading.Lock()
+_purge_requested = threading.Event()
+
+
+def purge_deleted_projects_in_background():
+    """
+    Background-task entry point for purge_deleted_projects with its own session.
+
+    Only one purge runs per process; a request arriving while one is running makes it
+    look for more deleted projects before it stops.
+    """
+    _purge_requested.set()
+    if not _purge_lock.acquire(blocking=False):
+        return
+    try:
+        while _purge_requested.is_set():
+            _purge_requested.clear()
+            db = SessionLocal()
+            try:
+                purge_deleted_projects(db)
+            except Exception as e:
+                db.rollback()
+                print(f"Purging deleted projects failed: {e}")
+                return
+            finally:
+                db.close()
+    finally:
+        _purge_lock.release()
+
+
+def get_project_full(
+    project_id: int, db: Session, fields: Optional[str] = None, include: Optional[str] = None
+) -> Optional[dict]:
+    """
+    Retrieve a single project with its collaborators and timeline as a ProjectResponse-shaped dict.
+
+    `fields` / `include` (see resolve_project_fields) narrow the response; relations that are
+    not requested are never queried. Returns None when the project does not exist.
+    """
+    scalar_fields, relations = resolve_project_fields(fields, include)
+
+    # Retrieve the project (with its template name when requested)
+    project_data = _project_rows_query(db, scalar_fields).filter(Project.id == project_id).first()
 
     if not project_data:
         return None
 
-    # Retrieve collaborators' emails
-    collaborators = (
-        db.query(User.email)
-        .join(project_collaborators, project_collaborators.c.user_id == User.id)
-        .filter(project_collaborators.c.project_id == project_id)
-        .all()
-    )
+    collaborators = None
+    if "collaborators" in relations:
+        # Retrieve collaborators' emails
+        collaborators = [
+            c.email
+            for c in db.query(User.email)
+            .join(project_collaborators, project_collaborators.c.user_id == User.id)
+            .filter(project_collaborators.c.project_id == project_id)
+            .all()
+        ]
 
-    timeline_entries_data = (
-        db.query(
-            TimelineEntry.id,
-            TimelineEntry.project_id,
-            TimelineEntry.section,
-            TimelineEntry.subtitle,
-            TimelineEntry.description,
-            TimelineEntry.start,
-            TimelineEntry.end,
-            User.email.label("responsible_email"),
-        )
-        .outerjoin(User, TimelineEntry.responsible_id == User.id)
-        .filter(TimelineEntry.project_id == project_id)
-        .all()
-    )
+    timeline = None
+    if "timeline" in relations:
+        timeline_entries_data = _timeline_rows_query(db).filter(TimelineEntry.project_id == project_id).all()
+        timeline = [_timeline_entry_dict(row) for row in timeline_entries_data]
 
-    # Format timeline entries to match TimelineEntryResponse
-    formatted_timeline = [
-        TimelineEntryResponse(
-            id=entry.id,
-            project_id=entry.project_id,
-            section=entry.section,
-            subtitle=entry.subtitle,
-            responsible_email=entry.responsible_email,
-            description=entry.description,
-            start=entry.start,
-            end=entry.end,
+    return _project_dict(scalar_fields, project_data, collaborators, timeline)
+
+
+def _project_json_statement(dialect: str, project_id: int, scalar_fields: List[str], relations):
+    """One statement returning the ProjectResponse-shaped JSON document of a project."""
+    pairs = [(f, Template.name if f == "template" else getattr(Project, f)) for f in scalar_fields]
+    if "collaborators" in relations:
+        collaborator_rows = (
+            select(User.id)
+            .join(project_collaborators, project_collaborators.c.user_id == User.id)
+            .where(project_collaborators.c.project_id == Project.id)
         )
-        for entry in timeline_entries_data
-    ]
+        pairs.append(("collaborators", json_array(dialect, User.email, collaborator_rows, User.email, correlate=[Project])))
+    if "timeline" in relations:
+        # Keys and order match _timeline_entry_dict.
+        entry = json_object(dialect, [
+            ("id", TimelineEntry.id),
+            ("project_id", TimelineEntry.project_id),
+            ("section", TimelineEntry.section),
+            ("subtitle", TimelineEntry.subtitle),
+            ("responsible_email", User.email),
+            ("description", TimelineEntry.description),
+            ("start", TimelineEntry.start),
+            ("end", TimelineEntry.end),
+        ])
+        timeline_rows = (
+            select(TimelineEntry.id)
+            .outerjoin(User, TimelineEntry.responsible_id == User.id)
+            .where(TimelineEntry.project_id == Project.id)
+        )
+        pairs.append(("timeline", json_array(dialect, entry, timeline_rows, TimelineEntry.id, correlate=[Project])))
 
-    # Assemble the final ProjectResponse using the gathered data
-    project_response = ProjectResponse(
-        id=project_data.id,
-        title=project_data.title,
-        description=project_data.description,
-        template=project_data.template_name,
-        template_id=project_data.template_id,
-        collaborators=[c.email for c in collaborators],
-        start_date=project_data.start_date,
-        deadline=project_data.deadline,
-        timeline=formatted_timeline,
+    statement = (
+        select(as_text(dialect, json_object(dialect, pairs)))
+        .select_from(Project)
+        .where(Project.id == project_id, Project.deleted_at.is_(None))
     )
-    return project_response
+    if "template" in scalar_fields:
+        statement = statement.join(Template, Project.template_id == Template.id)
+    return statement
+
+
+def get_project_json(
+    project_id: int, db: Session, fields: Optional[str] = None, include: Optional[str] = None
+) -> Optional[bytes]:
+    """
+    Same response as get_project_full, serialized by the database in a single statement.
+
+    The project, its collaborators and its timeline are assembled with json_build_object /
+    json_agg (JSON1 functions on SQLite) and returned as encoded JSON, ready to send as is.
+    Other databases fall back to get_project_full. Returns None when the project does not exist.
+    """
+    scalar_fields, relations = resolve_project_fields(fields, include)
+    if not supports_json_aggregation(db):
+        project = get_project_full(project_id, db, fields, include)
+        return orjson.dumps(project) if project is not None else None
+
+    dialect = db.get_bind().dialect.name
+    document = db.execute(_project_json_statement(dialect, project_id, scalar_fields, relations)).scalar()
+    return document.encode() if document is not None else None
 
 
 def get_project_metrics(project_id: int, db: Session):
     # Fetch the project
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.query(Project).filter(Project.id == project_id, Project.deleted_at.is_(None)).first()
     if not project:
         return None
 
     # Fetch timeline entries for the project
     timeline_entries = db.query(TimelineEntry).filter(TimelineEntry.project_id == project_id).all()
 
+    return build_project_metrics(
+        [(entry.start, entry.end) for entry in timeline_entries],
+        [{"id": user.id, "email": user.email, "name": user.name} for user in project.collaborators],
+    )
+
+
+def build_project_metrics(phases: List[tuple], team_members: List[dict]) -> dict:
+    """
+    Computes the ProjectMetricsResponse for a project.
+
+    Args:
+        phases (list): (start, end) dates of the project's timeline entries.
+        team_members (list): {"id", "email", "name"} of each collaborator.
+    """
     # Calculate phase metrics
     today = date.today()
-    total_phases = len(timeline_entries)
+    total_phases = len(phases)
     completed_phases = 0
     in_progress_phases = 0
     upcoming_phases = 0
 
-    for entry in timeline_entries:
-        if entry.end < today:
+    for start, end in phases:
+        if end < today:
             completed_phases += 1
-        elif entry.start > today:
+        elif start > today:
             upcoming_phases += 1
         else:
             in_progress_phases += 1
@@ -326,7 +542,6 @@ def get_project_metrics(project_id: int, db: Session):
     completion_percentage = int((completed_phases / total_phases) * 100) if total_phases > 0 else 0
 
     # Team metrics: count the collaborators (assuming all are active)
-    team_members = project.collaborators
     total_members = len(team_members)
     active_members = total_members  # For demonstration purposes
 
@@ -334,7 +549,7 @@ def get_project_metrics(project_id: int, db: Session):
         "team": {
             "total_members": total_members,
             "active_members": active_members,
-            "team_members": [{"id": user.id, "email": user.email, "name": user.name} for user in team_members],
+            "team_members": team_members,
             "roles_distribution": {},  # No role info provided, so return an empty dict
         },
         "phases": {
@@ -352,3 +567,56 @@ def get_project_metrics(project_id: int, db: Session):
         "last_updated": today.isoformat(),
     }
     return metrics
+
+
+def get_project_changes(since: int, db: Session, limit: int = 500) -> dict:
+    """
+    Returns project and timeline changes recorded after cursor `since`.
+
+    Each changed row appears once with its latest state: upserts carry the current row
+    (projects without their timeline, which syncs as separate timeline_entry changes),
+    deletes are tombstones without data. Clients store the returned cursor and pass it
+    back as `since`; `has_more` means another page is immediately available.
+    """
+    changes, cursor, has_more = read_changes(db, since, limit)
+
+    upserted_projects = [c[1] for c in changes if c[0] == PROJECT and c[3] == UPSERT]
+    upserted_entries = [
+        c[1] for c in changes if c[0] == TIMELINE_ENTRY and c[3] == UPSERT
+    ]
+
+    projects = {}
+    if upserted_projects:
+        scalar_fields = list(PROJECT_FIELDS)
+        collaborators_by_project = defaultdict(list)
+        collaborator_rows = (
+            db.query(project_collaborators.c.project_id, User.email)
+            .join(User, project_collaborators.c.user_id == User.id)
+            .filter(project_collaborators.c.project_id.in_(upserted_projects))
+            .all()
+        )
+        for project_id, email in collaborator_rows:
+            collaborators_by_project[project_id].append(email)
+        for row in _project_rows_query(db, scalar_fields).filter(Project.id.in_(upserted_projects)).all():
+            projects[row[0]] = _project_dict(scalar_fields, row, collaborators_by_project[row[0]], None)
+
+    entries = {}
+    if upserted_entries:
+        for row in _timeline_rows_query(db).filter(TimelineEntry.id.in_(upserted_entries)).all():
+            entries[row[0]] = _timeline_entry_dict(row)
+
+    feed = []
+    for entity_type, entity_id, project_id, operation in changes:
+        current = projects if entity_type == PROJECT else entries
+        data = current.get(entity_id) if operation == UPSERT else None
+        # A row upserted in this page but already gone is reported as deleted.
+        feed.append(
+            {
+                "entity": entity_type,
+                "id": entity_id,
+                "project_id": project_id,
+                "op": UPSERT if data is not None else DELETE,
+                "data": data,
+            }
+        )
+    return {"cursor": cursor, "has_more": has_more, "changes": feed}
@@ -0,0 +1,116 @@
+import asyncio
+import orjson
+from typing import AsyncIterator, Optional, Set
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect
+from sqlalchemy.orm import Session
+from app.core.broker import Subscription, get_broker
+from app.core.config import settings
+from app.models.associations import project_collaborators
+from app.models.project import Project
+from app.models.user import User
+
+
+def subscription_project_ids(db: Session, projects: Optional[str], user: Optional[str]) -> Set[int]:
+    """
+    Resolves the initial project set of a push subscription.
+
+    Args:
+        projects (str, optional): Comma-separated project ids.
+        user (str, optional): Collaborator email; subscribes to all of this user's projects.
+
+    Returns:
+        set: The project ids to follow.
+    """
+    if not projects and not user:
+        raise HTTPException(status_code=400, detail="Pass `projects` and/or `user` to subscribe")
+
+    project_ids = set()
+    for value in (projects or "").split(","):
+        value = value.strip()
+        if not value:
+            continue
+        if not value.isdigit():
+            raise HTTPException(status_code=400, detail=f"Invalid project id: {value}")
+        project_ids.add(int(value))
+
+    if user:
+        project_ids.update(
+            project_id
+            for (project_id,) in db.query(project_collaborators.c.project_id)
+            .join(User, User.id == project_collaborators.c.user_id)
+            .join(Project, Project.id == project_collaborators.c.project_id)
+            .filter(User.email == user, Project.deleted_at.is_(None))
+        )
+    return project_ids
+
+
+def _forget_deleted_project(subscription: Subscription, change_event: dict):
+    if any(c["entity"] == "project" and c["op"] == "delete" for c in change_event["changes"]):
+        subscription.project_ids.discard(change_event["project_id"])
+
+
+async def sse_events(subscription: Subscription) -> AsyncIterator[str]:
+    """
+    Server-Sent Events stream for `subscription`.
+
+    Emits `change` events, a comment every PUSH_HEARTBEAT_SECONDS to keep proxies from
+    closing the connection, and a final `dropped` event if the client fell too far behind.
+    """
+    broker = get_broker()
+    try:
+        yield ": subscribed\n\n"
+        while True:
+            try:
+                change_event = await asyncio.wait_for(subscription.get(), settings.PUSH_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if change_event is None:
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            _forget_deleted_project(subscription, change_event)
+            yield "event: change\ndata: " + orjson.dumps(change_event).decode() + "\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def _apply_client_messages(websocket: WebSocket, subscription: Subscription):
+    # Clients adjust their subscription with {"subscribe": [ids]} / {"unsubscribe": [ids]}.
+    while True:
+        try:
+            message = orjson.loads(await websocket.receive_text())
+            subscription.project_ids.update(int(i) for i in message.get("subscribe", ()))
+            subscription.project_ids.difference_update(int(i) for i in message.get("unsubscribe", ()))
+        except (orjson.JSONDecodeError, AttributeError, TypeError, ValueError):
+            await websocket.send_json({"type": "error", "detail": "Expected {\"subscribe\": [ids]} or {\"unsubscribe\": [ids]}"})
+
+
+async def websocket_events(websocket: WebSocket, subscription: Subscription):
+    """
+    Sends change events for `subscription` over an accepted WebSocket until either side closes.
+
+    A client that falls too far behind receives {"type": "dropped"} and the socket is closed;
+    it should resync through /project/changes before reconnecting.
+    """
+    broker = get_broker()
+    reader = asyncio.create_task(_apply_client_messages(websocket, subscription))
+    try:
+        while True:
+            getter = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({getter, reader}, return_when=asyncio.FIRST_COMPLETED)
+            if reader in done:
+                getter.cancel()
+                reader.result()  # re-raises the disconnect
+                return
+            change_event = getter.result()
+            if change_event is None:
+                await websocket.send_json({"type": "dropped"})
+                await websocket.close(code=1013)
+                return
+            _forget_deleted_project(subscription, change_event)
+            await websocket.send_text(orjson.dumps({"type": "change", **change_event}).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+        broker.unsubscribe(subscription)
@@ -0,0 +1,237 @@
+import threading
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import Integer, cast, func, literal, null, or_, select, text, union_all
+from sqlalchemy.orm import Session
+from app.core.search_index import InvertedIndex
+from app.models.project import Project
+from app.models.search import SEARCH_CONFIG, SEARCH_TITLES, search_vector
+from app.models.template import Template, TemplateSection, TemplateSubtitle
+from app.models.timeline import TimelineEntry
+from app.services.change_log_service import DELETE, PROJECT, TIMELINE_ENTRY, current_cursor, read_changes
+
+SEARCH_TYPES = ("template", "section", "subtitle", "project", "timeline_entry")
+
+
+def resolve_search_types(types: Optional[str]) -> List[str]:
+    """Parses a comma-separated `types` filter (all types when empty); 400 on unknown names."""
+    if not types:
+        return list(SEARCH_TYPES)
+    requested = [t.strip() for t in types.split(",") if t.strip()]
+    unknown = [t for t in requested if t not in SEARCH_TYPES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(unknown)}")
+    return requested
+
+
+# --- PostgreSQL: tsvector + GIN, trigram similarity ---
+def _postgres_selects(query: str) -> Dict[str, object]:
+    tsquery = func.websearch_to_tsquery(text(f"'{SEARCH_CONFIG}'::regconfig"), query)
+
+    def rank_and_match(entity):
+        vector, title = search_vector(entity), SEARCH_TITLES[entity]
+        rank = func.ts_rank_cd(vector, tsquery) + func.similarity(title, query)
+        return rank.label("score"), or_(vector.op("@@")(tsquery), title.op("%")(query))
+
+    no_id = cast(null(), Integer)
+    selects = {}
+
+    score, match = rank_and_match("template")
+    selects["template"] = select(
+        literal("template").label("type"), Template.id, Template.name.label("title"),
+        Template.description.label("snippet"), Template.id.label("template_id"), no_id.label("project_id"), score,
+    ).where(match)
+
+    score, match = rank_and_match("section")
+    selects["section"] = (
+        select(
+            literal("section").label("type"), TemplateSection.id, TemplateSection.title.label("title"),
+            Template.name.label("snippet"), TemplateSection.template_id.label("template_id"), no_id.label("project_id"), score,
+        )
+        .join(Template, Template.id == TemplateSection.template_id)
+        .where(match)
+    )
+
+    score, match = rank_and_match("subtitle")
+    selects["subtitle"] = (
+        select(
+            literal("subtitle").label("type"), TemplateSubtitle.id, TemplateSubtitle.subtitle.label("title"),
+            TemplateSection.title.label("snippet"), TemplateSection.template_id.label("template_id"), no_id.label("project_id"), score,
+        )
+        .join(TemplateSection, TemplateSection.id == TemplateSubtitle.section_id)
+        .where(match)
+    )
+
+    score, match = rank_and_match("project")
+    selects["project"] = select(
+        literal("project").label("type"), Project.id, Project.title.label("title"),
+        Project.description.label("snippet"), Project.template_id.label("template_id"), Project.id.label("project_id"), score,
+    ).where(match, Project.deleted_at.is_(None))
+
+    score, match = rank_and_match("timeline_entry")
+    selects["timeline_entry"] = (
+        select(
+            literal("timeline_entry").label("type"), TimelineEntry.id,
+            func.coalesce(TimelineEntry.subtitle, TimelineEntry.section).label("title"),
+            TimelineEntry.description.label("snippet"), no_id.label("template_id"), TimelineEntry.project_id.label("project_id"), score,
+        )
+        .join(Project, Project.id == TimelineEntry.project_id)
+        .where(match, Project.deleted_at.is_(None))
+    )
+    return selects
+
+
+def _search_postgres(db: Session, query: str, types: List[str], limit: int, offset: int):
+    selects = _postgres_selects(query)
+    results = union_all(*(selects[t] for t in types)).subquery()
+    rows = db.execute(
+        select(results).order_by(results.c.score.desc(), results.c.type, results.c.id).limit(limit + 1).offset(offset)
+    ).all()
+    hits = [
+        {
+            "type": row.type,
+            "id": row.id,
+            "title": row.title,
+            "snippet": row.snippet,
+            "template_id": row.template_id,
+            "project_id": row.project_id,
+            "score": round(float(row.score), 4),
+        }
+        for row in rows[:limit]
+    ]
+    return hits, len(rows) > limit
+
+
+# --- Other databases: in-process inverted index kept current from the change log ---
+class _FallbackIndex:
+    """
+    Search index for one database, built on first use and then updated incrementally:
+    templates are append-only (new ids are loaded), project and timeline changes are
+    replayed from the change log.
+    """
+
+    def __init__(self):
+        self.index = InvertedIndex()
+        self.cursor = None
+        self.max_template_id = 0
+        self.lock = threading.Lock()
+
+    def _add_templates(self, db: Session, after_id: int):
+        for template_id, name, description in db.query(Template.id, Template.name, Template.description).filter(Template.id > after_id):
+            self.index.add(("template", template_id), f"{name} {description or ''}", {
+                "type": "template", "id": template_id, "title": name, "snippet": description,
+                "template_id": template_id, "project_id": None,
+            })
+            self.max_template_id = max(self.max_template_id, template_id)
+        sections = (
+            db.query(TemplateSection.id, TemplateSection.title, TemplateSection.template_id, Template.name)
+            .join(Template, Template.id == TemplateSection.template_id)
+            .filter(TemplateSection.template_id > after_id)
+        )
+        for section_id, title, template_id, template_name in sections:
+            self.index.add(("section", section_id), title, {
+                "type": "section", "id": section_id, "title": title, "snippet": template_name,
+                "template_id": template_id, "project_id": None,
+            })
+        subtitles = (
+            db.query(TemplateSubtitle.id, TemplateSubtitle.subtitle, TemplateSection.title, TemplateSection.template_id)
+            .join(TemplateSection, TemplateSection.id == TemplateSubtitle.section_id)
+            .filter(TemplateSection.template_id > after_id)
+        )
+        for subtitle_id, subtitle, section_title, template_id in subtitles:
+            self.index.add(("subtitle", subtitle_id), subtitle, {
+                "type": "subtitle", "id": subtitle_id, "title": subtitle, "snippet": section_title,
+                "template_id": template_id, "project_id": None,
+            })
+
+    def _add_projects(self, db: Session, project_ids: Optional[List[int]] = None):
+        rows = db.query(Project.id, Project.title, Project.description, Project.template_id).filter(
+            Project.deleted_at.is_(None)
+        )
+        if project_ids is not None:
+            rows = rows.filter(Project.id.in_(project_ids))
+        for project_id, title, description, template_id in rows:
+            self.index.add(("project", project_id), f"{title} {description or ''}", {
+                "type": "project", "id": project_id, "title": title, "snippet": description,
+                "template_id": template_id, "project_id": project_id,
+            })
+
+    def _add_timeline_entries(self, db: Session, entry_ids: Optional[List[int]] = None):
+        rows = (
+            db.query(
+                TimelineEntry.id, TimelineEntry.project_id, TimelineEntry.section, TimelineEntry.subtitle, TimelineEntry.description
+            )
+            .join(Project, Project.id == TimelineEntry.project_id)
+            .filter(Project.deleted_at.is_(None))
+        )
+        if entry_ids is not None:
+            rows = rows.filter(TimelineEntry.id.in_(entry_ids))
+        for entry_id, project_id, section, subtitle, description in rows:
+            self.index.add(("timeline_entry", entry_id), f"{section} {subtitle or ''} {description or ''}", {
+                "type": "timeline_entry", "id": entry_id, "title": subtitle or section, "snippet": description,
+                "template_id": None, "project_id": project_id,
+            })
+
+    def refresh(self, db: Session):
+        with self.lock:
+            if self.cursor is None:
+                # Take the cursor first so changes racing the initial load are replayed next time.
+                self.cursor = current_cursor(db)
+                self._add_templates(db, 0)
+                self._add_projects(db)
+                self._add_timeline_entries(db)
+                return
+
+            self._add_templates(db, self.max_template_id)
+            has_more = True
+            while has_more:
+                changes, self.cursor, has_more = read_changes(db, self.cursor, 5000)
+                upserts = {PROJECT: [], TIMELINE_ENTRY: []}
+                for entity_type, entity_id, _, operation in changes:
+                    if operation == DELETE:
+                        self.index.remove((entity_type, entity_id))
+                    else:
+                        upserts[entity_type].append(entity_id)
+                if upserts[PROJECT]:
+                    self._add_projects(db, upserts[PROJECT])
+                if upserts[TIMELINE_ENTRY]:
+                    self._add_timeline_entries(db, upserts[TIMELINE_ENTRY])
+
+
+_fallback_indexes: Dict[object, _FallbackIndex] = {}
+_fallback_indexes_lock = threading.Lock()
+
+
+def _search_fallback(db: Session, query: str, types: List[str], limit: int, offset: int):
+    bind = db.get_bind()
+    with _fallback_indexes_lock:
+        fallback = _fallback_indexes.setdefault(bind, _FallbackIndex())
+    fallback.refresh(db)
+    wanted = set(types)
+    hits, has_more = fallback.index.search(query, limit, offset, accept=lambda payload: payload["type"] in wanted)
+    return [{**payload, "score": round(score, 4)} for score, payload in hits], has_more
+
+
+def search(db: Session, query: str, types: Optional[str] = None, limit: int = 20, offset: int = 0) -> dict:
+    """
+    Ranked full-text search over template names, section titles, subtitles, project titles and
+    descriptions, and timeline entries.
+
+    On PostgreSQL this uses the GIN tsvector indexes plus trigram similarity for fuzzy title
+    matches; on other databases an in-process inverted index kept current from the change log.
+
+    Args:
+        query (str): Search terms (web-search syntax on PostgreSQL: quotes, OR, -term).
+        types (str, optional): Comma-separated result types to include.
+        limit (int): Page size.
+        offset (int): Number of results to skip.
+
+    Returns:
+        dict: The page of results, ordered by score, and whether more results follow.
+    """
+    wanted = resolve_search_types(types)
+    if db.get_bind().dialect.name == "postgresql":
+        results, has_more = _search_postgres(db, query, wanted, limit, offset)
+    else:
+        results, has_more = _search_fallback(db, query, wanted, limit, offset)
+    return {"query": query, "limit": limit, "offset": offset, "has_more": has_more, "results": results}
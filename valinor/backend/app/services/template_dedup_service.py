@@ -0,0 +1,226 @@
+import json
+import re
+from typing import Dict, List, Optional
+from sqlalchemy import and_, func, insert, or_
+from sqlalchemy.orm import Session, selectinload
+from app.core import minhash
+from app.core.config import settings
+from app.models.template import Template, TemplateSection
+from app.models.template_signature import TemplateLshBucket, TemplateSignature
+
+BACKFILL_BATCH_SIZE = 500
+
+_NUMBERING_RE = re.compile(r"^\s*(?:\d+(?:\.\d+)*\.?|[ivxlc]+[.)]|[a-z][.)])\s+", re.IGNORECASE)
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def _normalize_title(title: str) -> str:
+    """Lowercases and drops numbering and punctuation, so "2. Related Work" matches "Related work"."""
+    return _NON_WORD_RE.sub(" ", _NUMBERING_RE.sub("", title or "").lower()).strip()
+
+
+def template_features(sections: List[dict]) -> set:
+    """
+    Feature set of a template: its normalized section titles and subtitles.
+
+    Args:
+        sections (list): [{"title": str, "subtitles": [str, ...]}, ...] as in template data.
+    """
+    features = set()
+    for section in sections:
+        title = _normalize_title(section["title"])
+        if title:
+            features.add(f"s:{title}")
+        for subtitle in section.get("subtitles") or []:
+            subtitle = _normalize_title(subtitle)
+            if subtitle:
+                features.add(f"t:{subtitle}")
+    return features
+
+
+def _sections_data(template: Template) -> List[dict]:
+    return [{"title": s.title, "subtitles": [sub.subtitle for sub in s.subtitles]} for s in template.sections]
+
+
+def index_template_signature(db: Session, template_id: int, sections: List[dict]) -> Optional[List[int]]:
+    """
+    Stores the MinHash signature and LSH buckets of a template in the current transaction.
+
+    Returns:
+        list: The signature, or None for a template without sections.
+    """
+    features = template_features(sections)
+    if not features:
+        return None
+    signature = minhash.signature(features)
+    db.add(TemplateSignature(template_id=template_id, signature=json.dumps(signature)))
+    # One executemany instead of an INSERT per band.
+    db.execute(insert(TemplateLshBucket), _bucket_rows(template_id, signature))
+    return signature
+
+
+def _bucket_rows(template_id: int, signature: List[int]) -> List[dict]:
+    return [{"template_id": template_id, "band": band, "bucket": bucket} for band, bucket in minhash.band_buckets(signature)]
+
+
+def find_duplicate_templates(
+    db: Session, sections: List[dict], threshold: Optional[float] = None, limit: int = 5
+) -> List[dict]:
+    """
+    Finds stored templates whose section structure is nearly the same as `sections`.
+
+    Candidates come from the (band, bucket) index, so the lookup touches only templates
+    sharing a band with the new one; each candidate is then confirmed with its full signature.
+
+    Returns:
+        list: [{"template_id", "name", "similarity"}, ...], most similar first.
+    """
+    threshold = settings.TEMPLATE_DUPLICATE_THRESHOLD if threshold is None else threshold
+    features = template_features(sections)
+    if not features:
+        return []
+    signature = minhash.signature(features)
+    bands = [
+        and_(TemplateLshBucket.band == band, TemplateLshBucket.bucket == bucket)
+        for band, bucket in minhash.band_buckets(signature)
+    ]
+    candidate_ids = db.query(TemplateLshBucket.template_id).filter(or_(*bands)).distinct().subquery()
+    candidates = (
+        db.query(TemplateSignature.template_id, TemplateSignature.signature, Template.name)
+        .join(Template, Template.id == TemplateSignature.template_id)
+        .filter(TemplateSignature.template_id.in_(candidate_ids.select()))
+        .all()
+    )
+    duplicates = []
+    for template_id, stored, name in candidates:
+        similarity = minhash.similarity(signature, json.loads(stored))
+        if similarity >= threshold:
+            duplicates.append({"template_id": template_id, "name": name, "similarity": similarity})
+    duplicates.sort(key=lambda d: (-d["similarity"], d["template_id"]))
+    return duplicates[:limit]
+
+
+def backfill_template_signatures(db: Session) -> int:
+    """Signs templates created before signatures were stored. Returns how many were signed."""
+    signed = 0
+    while True:
+        templates = (
+            db.query(Template)
+            .outerjoin(TemplateSignature, TemplateSignature.template_id == Template.id)
+            .filter(TemplateSignature.template_id.is_(None))
+            .options(selectinload(Template.sections).selectinload(TemplateSection.subtitles))
+            .order_by(Template.id)
+            .limit(BACKFILL_BATCH_SIZE)
+            .all()
+        )
+        if not templates:
+            return signed
+        signatures, buckets = [], []
+        for template in templates:
+            features = template_features(_sections_data(template))
+            # An empty signature keeps section-less templates from being picked up again on every batch.
+            signature = minhash.signature(features) if features else []
+            signatures.append({"template_id": template.id, "signature": json.dumps(signature)})
+            if signature:
+                buckets.extend(_bucket_rows(template.id, signature))
+            signed += 1
+        db.execute(insert(TemplateSignature), signatures)
+        if buckets:
+            db.execute(insert(TemplateLshBucket), buckets)
+        db.commit()
+        print(f"Signed {signed} templates for duplicate detection")
+
+
+def duplicate_report(db: Session, threshold: Optional[float] = None) -> dict:
+    """
+    Groups the existing catalog into clusters of near-duplicate templates.
+
+    Candidate pairs are templates sharing an LSH bucket; pairs confirmed above `threshold`
+    are merged into groups. The oldest template of each group is suggested as the one to keep.
+    Read-only: templates without a signature yet (created before signatures were stored)
+    are left out until backfill_template_signatures has signed them.
+
+    Returns:
+        dict: The threshold, number of templates checked and the duplicate groups.
+    """
+    threshold = settings.TEMPLATE_DUPLICATE_THRESHOLD if threshold is None else threshold
+
+    shared = (
+        db.query(TemplateLshBucket.band, TemplateLshBucket.bucket)
+        .group_by(TemplateLshBucket.band, TemplateLshBucket.bucket)
+        .having(func.count() > 1)
+        .subquery()
+    )
+    rows = (
+        db.query(TemplateLshBucket.band, TemplateLshBucket.bucket, TemplateLshBucket.template_id)
+        .join(shared, and_(shared.c.band == TemplateLshBucket.band, shared.c.bucket == TemplateLshBucket.bucket))
+        .all()
+    )
+    buckets: Dict[tuple, List[int]] = {}
+    for band, bucket, template_id in rows:
+        buckets.setdefault((band, bucket), []).append(template_id)
+
+    involved = {template_id for members in buckets.values() for template_id in members}
+    signatures, names = {}, {}
+    if involved:
+        for template_id, stored, name in (
+            db.query(TemplateSignature.template_id, TemplateSignature.signature, Template.name)
+            .join(Template, Template.id == TemplateSignature.template_id)
+            .filter(TemplateSignature.template_id.in_(involved))
+        ):
+            signatures[template_id], names[template_id] = json.loads(stored), name
+
+    # Union-find over confirmed pairs.
+    parent = {}
+
+    def find(x):
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    # Identical signatures are merged up front, so a large cluster of exact copies
+    # contributes one candidate instead of a quadratic number of pairs.
+    pair_similarity = {}
+    canonical: Dict[tuple, int] = {}
+    for template_id in sorted(signatures):
+        first = canonical.setdefault(tuple(signatures[template_id]), template_id)
+        if first != template_id:
+            pair_similarity[(first, template_id)] = 1.0
+            parent[find(template_id)] = find(first)
+
+    candidate_pairs = set()
+    for members in buckets.values():
+        distinct = sorted({canonical[tuple(signatures[template_id])] for template_id in members})
+        for i, a in enumerate(distinct):
+            for b in distinct[i + 1 :]:
+                candidate_pairs.add((a, b))
+
+    for a, b in candidate_pairs:
+        similarity = minhash.similarity(signatures[a], signatures[b])
+        if similarity >= threshold:
+            pair_similarity[(a, b)] = similarity
+            parent[find(b)] = find(a)
+
+    groups: Dict[int, List[int]] = {}
+    for template_id in parent:
+        groups.setdefault(find(template_id), []).append(template_id)
+
+    group_similarities: Dict[int, List[float]] = {}
+    for (a, _), similarity in pair_similarity.items():
+        group_similarities.setdefault(find(a), []).append(similarity)
+
+    report = []
+    for root, members in groups.items():
+        members.sort()
+        similarities = group_similarities[root]
+        report.append({
+            "keep_template_id": members[0],
+            "templates": [{"id": template_id, "name": names[template_id]} for template_id in members],
+            "min_similarity": min(similarities),
+            "max_similarity": max(similarities),
+        })
+    report.sort(key=lambda group: (-len(group["templates"]), group["keep_template_id"]))
+
+    checked = db.query(func.count(TemplateSignature.template_id)).filter(TemplateSignature.signature != "[]").scalar()
+    return {"threshold": threshold, "templates_checked": checked, "groups": report}
@@ -1,8 +1,10 @@
 import json
 import datetime
-from typing import List
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import threading
+import orjson
+from typing import List, Optional
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, select
 from fastapi import HTTPException
 from app.schemas.project_schema import (
     CreateProjectRequest,
@@ -17,6 +19,8 @@ from app.models.timeline import TimelineEntry
 from app.models.user import User
 from app.models.associations import project_collaborators
 from app.models.template import Template, TemplateSection, TemplateSubtitle
+from app.core.compression import CompressedPayload
+from app.db.json_aggregation import as_text, json_array, json_object, supports_json_aggregation
 
 
 def get_all_templates(db: Session):
@@ -27,3 +31,100 @@ def get_all_templates(db: Session):
 def get_template_by_id(template_id: int, db: Session):
     """Retrieves a template by its ID."""
     return db.query(Template).filter(Template.id == template_id).first()
+
+
+def _template_tree(dialect: str):
+    """JSON of a template with its sections and subtitles (TemplateResponse shape), correlated to Template."""
+    subtitle = json_object(dialect, [("id", TemplateSubtitle.id), ("subtitle", TemplateSubtitle.subtitle)])
+    subtitle_rows = select(TemplateSubtitle.id).where(TemplateSubtitle.section_id == TemplateSection.id)
+    section = json_object(dialect, [
+        ("id", TemplateSection.id),
+        ("title", TemplateSection.title),
+        ("subtitles", json_array(dialect, subtitle, subtitle_rows, TemplateSubtitle.id, correlate=[TemplateSection])),
+    ])
+    section_rows = select(TemplateSection.id).where(TemplateSection.template_id == Template.id)
+    return json_object(dialect, [
+        ("id", Template.id),
+        ("name", Template.name),
+        ("description", Template.description),
+        ("icon", Template.icon),
+        ("sections", json_array(dialect, section, section_rows, TemplateSection.id, correlate=[Template])),
+    ])
+
+
+def _template_dicts(query) -> List[dict]:
+    """Template dicts (TemplateResponse shape) built in Python, for databases without JSON aggregation."""
+    templates = query.options(selectinload(Template.sections).selectinload(TemplateSection.subtitles)).all()
+    return [
+        {
+            "id": template.id,
+            "name": template.name,
+            "description": template.description,
+            "icon": template.icon,
+            "sections": [
+                {
+                    "id": section.id,
+                    "title": section.title,
+                    "subtitles": [{"id": s.id, "subtitle": s.subtitle} for s in section.subtitles],
+                }
+                for section in template.sections
+            ],
+        }
+        for template in templates
+    ]
+
+
+def get_template_json(template_id: int, db: Session) -> Optional[bytes]:
+    """
+    Returns a template with its sections and subtitles as encoded JSON, assembled by the
+    database in one statement (None when the template does not exist).
+    """
+    if not supports_json_aggregation(db):
+        template = _template_dicts(db.query(Template).filter(Template.id == template_id))
+        return orjson.dumps(template[0]) if template else None
+    dialect = db.get_bind().dialect.name
+    document = db.execute(select(as_text(dialect, _template_tree(dialect))).where(Template.id == template_id)).scalar()
+    return document.encode() if document is not None else None
+
+
+# --- Serialized template catalog ---
+_catalog_lock = threading.Lock()
+_catalog_cache = {"version": None, "payload": None}
+
+
+def _catalog_version(db: Session):
+    """Cheap change marker for the catalog; templates are only ever added together with their sections."""
+    return db.query(func.count(Template.id), func.max(Template.id)).one()
+
+
+def _build_catalog(db: Session) -> bytes:
+    if not supports_json_aggregation(db):
+        return orjson.dumps(_template_dicts(db.query(Template).order_by(Template.id)))
+    dialect = db.get_bind().dialect.name
+    catalog = json_array(dialect, _template_tree(dialect), select(Template.id), Template.id)
+    return db.execute(select(as_text(dialect, catalog))).scalar().encode()
+
+
+def get_template_catalog(db: Session) -> CompressedPayload:
+    """
+    Returns the full template catalog as serialized JSON with precompressed variants.
+
+    The payload is cached per process and rebuilt only when the catalog version changes,
+    so concurrent workers notice templates created elsewhere.
+    """
+    version = tuple(_catalog_version(db))
+    cached = _catalog_cache["payload"]
+    if cached is not None and _catalog_cache["version"] == version:
+        return cached
+    with _catalog_lock:
+        if _catalog_cache["payload"] is None or _catalog_cache["version"] != version:
+            _catalog_cache["payload"] = CompressedPayload(_build_catalog(db))
+            _catalog_cache["version"] = version
+        return _catalog_cache["payload"]
+
+
+def invalidate_template_catalog():
+    """Drops the cached catalog; called after templates are written."""
+    with _catalog_lock:
+        _catalog_cache["payload"] = None
+        _catalog_cache["version"] = None
@@ -17,8 +17,16 @@ from app.models.timeline import TimelineEntry
 from app.models.user import User
 from app.models.associations import project_collaborators
 from app.models.template import Template, TemplateSection, TemplateSubtitle
+from app.core.prompts import PromptBudget, compact_outline
+from app.services.llm_service import create_chat_completion
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+# Retries are handled by the LLM scheduler in llm_service.
+client = OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+
+TIMELINE_SYSTEM_PROMPT = (
+    "You are an expert project manager who creates detailed project timelines, "
+    "with entries for every section and subtitle of the project template."
+)
 
 
 def generate_project_timeline(request: GenerateTimelineRequest, db: Session):
@@ -30,48 +38,39 @@ def generate_project_timeline(request: GenerateTimelineRequest, db: Session):
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
 
-    # Convert sections & subtitles into JSON format
-    template_structure = {
-        "sections": [
-            {
-                "title": section.title,
-                "subtitles": [subtitle.subtitle for subtitle in section.subtitles],
-            }
-            for section in template.sections
-        ]
-    }
-
-    # Convert assignments
-    assignments_json = json.dumps(request.section_assignments)
+    # Sections one per line, with the assignee of a section inline; other assignments
+    # (e.g. of a single subtitle) are listed after the outline.
+    sections = [(section.title, [subtitle.subtitle for subtitle in section.subtitles]) for section in template.sections]
+    section_titles = {title for title, _ in sections}
+    outline = compact_outline(sections, request.section_assignments)
+    other_assignments = "; ".join(
+        f"{name} [{email}]" for name, email in request.section_assignments.items() if name not in section_titles
+    )
 
-    prompt = (
-        f"Generate a detailed project timeline for the project titled '{request.project_title}'.\n"
-        f"Description: {request.project_description}\n"
-        f"Template Structure: {json.dumps(template_structure)}\n"
+    head = f"Project: {request.project_title}\nDescription: "
+    body = (
+        f"\nPeriod: {request.start_date} to {request.deadline}\n"
         f"Collaborators: {', '.join(request.collaborators)}\n"
-        f"Start Date: {request.start_date}\n"
-        f"Deadline: {request.deadline}\n"
-        f"Assignments: {assignments_json}\n\n"
-        f"Constraints:\n"
-        f"- All timeline dates must be between the project start date ({request.start_date}) and the deadline ({request.deadline}).\n"
-        f"- Ensure that for any given collaborator, tasks do not overlap.\n"
-        f"- Provide detailed timeline entries for every section and every subtitle listed in the template structure.\n\n"
-        f"Output Requirements:\n"
-        f"Return a valid JSON array where each element is an object with the following keys:\n"
-        f"  - 'section': The section title.\n"
-        f"  - 'subtitle': The subtitle title (or null if none).\n"
-        f"  - 'responsible_email': The assigned collaborator's email for that section/subtitle, if any (or null).\n"
-        f"  - 'start': The start date in YYYY-MM-DD format.\n"
-        f"  - 'end': The end date in YYYY-MM-DD format.\n\n"
-        f"Ensure that the timeline is as detailed as possible, providing entries for every section and subtitle, and that all dates are realistic and sequential so that the entire project is completed by the deadline.\n"
-        f"Output only the JSON array with no additional text."
+        f"Sections ([assignee]: subtitles):\n{outline}\n"
+        + (f"Other assignments: {other_assignments}\n" if other_assignments else "")
+        + "\nRules:\n"
+        "- Every section and every subtitle gets an entry.\n"
+        "- All dates lie within the period; a collaborator's entries never overlap.\n"
+        "- Dates are realistic and sequential so the project finishes by the deadline.\n\n"
+        "Output only a JSON array of objects with keys section, subtitle (null if none), "
+        "responsible_email (the assignee, or null), start and end (YYYY-MM-DD)."
+    )
+    description = PromptBudget("timeline", settings.LLM_PROMPT_BUDGET_TIMELINE).fit(
+        [TIMELINE_SYSTEM_PROMPT, head, body], request.project_description
     )
 
-    response = client.chat.completions.create(
+    response = create_chat_completion(
+        client,
+        "timeline",
         model="gpt-4o-mini",
         messages=[
-            {"role": "system", "content": "You are an expert project manager who creates detailed project timelines."},
-            {"role": "user", "content": prompt},
+            {"role": "system", "content": TIMELINE_SYSTEM_PROMPT},
+            {"role": "user", "content": head + description + body},
         ],
     )
 
@@ -0,0 +1,182 @@
+import csv
+import io
+import random
+from datetime import date, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+from app.db.base import Base
+from app.models import project, user, template, timeline, change_log, document, template_signature, archive, idempotency, metric_snapshot  # noqa: F401  (registers tables on Base.metadata)
+from app.models.associations import project_collaborators
+from app.models.project import Project
+from app.models.template import Template, TemplateSection, TemplateSubtitle
+from app.models.timeline import TimelineEntry
+from app.models.user import User
+
+BATCH_SIZE = 10000
+
+# Named data volumes, sized by their approximate number of timeline entries.
+SCALES = {
+    "1k": dict(users=50, templates=10, projects=42),
+    "100k": dict(users=2000, templates=200, projects=4200),
+    "1m": dict(users=20000, templates=1000, projects=42000),
+}
+
+# Insert order that satisfies every foreign key.
+TABLES = [
+    User.__table__,
+    Template.__table__,
+    TemplateSection.__table__,
+    TemplateSubtitle.__table__,
+    Project.__table__,
+    project_collaborators,
+    TimelineEntry.__table__,
+]
+
+
+def create_bench_engine(database_url: str) -> Engine:
+    """Creates an engine for a benchmark database; in-memory SQLite shares one connection across threads."""
+    if database_url.startswith("sqlite"):
+        return create_engine(database_url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    return create_engine(database_url)
+
+
+def _copy_rows(conn, table, rows):
+    """Bulk loads `rows` into `table`, using COPY on PostgreSQL and executemany elsewhere."""
+    if not rows:
+        return
+    if conn.dialect.name != "postgresql":
+        conn.execute(insert(table), rows)
+        return
+
+    columns = list(table.c.keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # COPY ... CSV reads an unquoted empty field as NULL.
+        writer.writerow(["" if row.get(c) is None else row[c] for c in columns])
+    buffer.seek(0)
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+class _BatchLoader:
+    """Buffers generated rows per table and flushes them in foreign key order."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.buffers = {table.name: [] for table in TABLES}
+        self.counts = {table.name: 0 for table in TABLES}
+
+    def add(self, table, row):
+        buffer = self.buffers[table.name]
+        buffer.append(row)
+        self.counts[table.name] += 1
+        if len(buffer) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        for table in TABLES:
+            _copy_rows(self.conn, table, self.buffers[table.name])
+            self.buffers[table.name] = []
+
+
+def seed_database(
+    engine: Engine,
+    users: int = 500,
+    templates: int = 500,
+    sections_per_template: int = 6,
+    subtitles_per_section: int = 4,
+    projects: int = 2000,
+    collaborators_per_project: int = 3,
+    entries_per_project: int = 24,
+    seed: int = 0,
+) -> dict:
+    """
+    Creates the schema on `engine` and fills it with representative synthetic data.
+
+    Rows are generated as a stream and bulk loaded in batches, so memory stays flat
+    at the 1M scale. Primary keys are assigned up front so no generated ids are read back.
+
+    Args:
+        engine (Engine): Engine bound to an empty, disposable database.
+        seed (int): Seed for the random generator, so runs are reproducible.
+
+    Returns:
+        dict: Row count per table name.
+    """
+    rng = random.Random(seed)
+    Base.metadata.create_all(bind=engine)
+    base_date = date(2024, 1, 1)
+
+    with engine.begin() as conn:
+        loader = _BatchLoader(conn)
+
+        for u in range(1, users + 1):
+            loader.add(User.__table__, {"id": u, "email": f"user{u}@example.com", "name": f"User {u}"})
+
+        section_id = subtitle_id = 0
+        for t in range(1, templates + 1):
+            loader.add(Template.__table__, {"id": t, "name": f"Template {t}", "description": f"Seeded template {t}", "icon": None})
+            for s in range(sections_per_template):
+                section_id += 1
+                loader.add(TemplateSection.__table__, {"id": section_id, "template_id": t, "title": f"Section {s + 1}"})
+                for st in range(subtitles_per_section):
+                    subtitle_id += 1
+                    loader.add(
+                        TemplateSubtitle.__table__,
+                        {"id": subtitle_id, "section_id": section_id, "subtitle": f"Subtitle {s + 1}.{st + 1}"},
+                    )
+
+        entry_id = 0
+        for p in range(1, projects + 1):
+            start_date = base_date + timedelta(days=rng.randrange(730))
+            loader.add(
+                Project.__table__,
+                {
+                    "id": p,
+                    "title": f"Project {p}",
+                    "description": f"Seeded project {p}",
+                    "start_date": start_date,
+                    "deadline": start_date + timedelta(days=entries_per_project * 7),
+                    "template_id": rng.randint(1, templates),
+                },
+            )
+            members = rng.sample(range(1, users + 1), min(collaborators_per_project, users))
+            for u in members:
+                loader.add(project_collaborators, {"user_id": u, "project_id": p})
+            for e in range(entries_per_project):
+                entry_id += 1
+                start = start_date + timedelta(days=e * 7)
+                loader.add(
+                    TimelineEntry.__table__,
+                    {
+                        "id": entry_id,
+                        "project_id": p,
+                        "responsible_id": rng.choice(members) if members else None,
+                        "description": None,
+                        "section": f"Section {e // max(subtitles_per_section, 1) + 1}",
+                        "subtitle": f"Subtitle {e + 1}",
+                        "start": start,
+                        "end": start + timedelta(days=6),
+                    },
+                )
+        loader.flush()
+
+    if engine.dialect.name == "postgresql":
+        # Explicit ids bypass the serial sequences; realign them so later inserts do not collide.
+        with engine.begin() as conn:
+            for table in TABLES:
+                if "id" in table.c and loader.counts[table.name]:
+                    conn.exec_driver_sql(
+                        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), {loader.counts[table.name]})"
+                    )
+    # Refresh planner statistics so plans reflect the seeded volume.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+    return dict(loader.counts)
@@ -0,0 +1,132 @@
+"""
+Per-entry serialization cost of project responses, before and after the fast path.
+
+"before" rebuilds what the routes used to do: one Pydantic model per timeline
+row, FastAPI's response_model round trip (dump, validate, serialize) and the
+stdlib JSON encoder. "after" is the current path: dicts built straight from
+row tuples and encoded once with orjson. Query time is excluded; rows are
+fetched once and reused.
+
+Usage (from valinor/backend):
+    python -m benchmarks.serialization --entries 1000 5000 20000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from app.models.associations import project_collaborators
+from app.models.project import Project
+from app.models.template import Template
+from app.models.user import User
+from app.schemas.project_schema import ProjectResponse, TimelineEntryResponse
+from app.services.project_service import PROJECT_FIELDS, _project_dict, _timeline_entry_dict, _timeline_rows_query
+from benchmarks.seed import create_bench_engine, seed_database
+from sqlalchemy.orm import Session
+
+PROJECT_ADAPTER = TypeAdapter(ProjectResponse)
+
+
+def legacy_encode(project_row, collaborators, rows) -> bytes:
+    timeline = [
+        TimelineEntryResponse(
+            id=r.id,
+            project_id=r.project_id,
+            section=r.section,
+            subtitle=r.subtitle,
+            responsible_email=r.responsible_email,
+            description=r.description,
+            start=r.start,
+            end=r.end,
+        )
+        for r in rows
+    ]
+    model = ProjectResponse(
+        id=project_row.id,
+        title=project_row.title,
+        description=project_row.description,
+        template=project_row.template_name,
+        template_id=project_row.template_id,
+        collaborators=collaborators,
+        start_date=project_row.start_date,
+        deadline=project_row.deadline,
+        timeline=timeline,
+    )
+    # FastAPI's serialize_response for a returned model: dump, validate against response_model, serialize.
+    validated = PROJECT_ADAPTER.validate_python(model.model_dump(), from_attributes=True)
+    return JSONResponse(PROJECT_ADAPTER.dump_python(validated, mode="json")).body
+
+
+def fast_encode(project_row, collaborators, rows) -> bytes:
+    # project_row carries the template name as "template_name"; realign it to the response field order.
+    values = [project_row.template_name if f == "template" else getattr(project_row, f) for f in PROJECT_FIELDS]
+    return ORJSONResponse(_project_dict(list(PROJECT_FIELDS), values, collaborators, [_timeline_entry_dict(r) for r in rows])).body
+
+
+def _time(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def measure(entries: int, repeats: int) -> dict:
+    engine = create_bench_engine("sqlite://")
+    seed_database(engine, users=50, templates=1, projects=1, entries_per_project=entries)
+    with Session(engine) as db:
+        project_row = (
+            db.query(
+                Project.id,
+                Project.title,
+                Project.description,
+                Project.start_date,
+                Project.deadline,
+                Project.template_id,
+                Template.name.label("template_name"),
+            )
+            .join(Template, Project.template_id == Template.id)
+            .first()
+        )
+        collaborators = [
+            email
+            for (email,) in db.query(User.email)
+            .join(project_collaborators, project_collaborators.c.user_id == User.id)
+            .filter(project_collaborators.c.project_id == project_row.id)
+        ]
+        rows = _timeline_rows_query(db).all()
+
+    before, after = legacy_encode(project_row, collaborators, rows), fast_encode(project_row, collaborators, rows)
+    if json.loads(before) != json.loads(after):
+        raise AssertionError("fast path output differs from the legacy response")
+
+    legacy = _time(lambda: legacy_encode(project_row, collaborators, rows), repeats)
+    fast = _time(lambda: fast_encode(project_row, collaborators, rows), repeats)
+    return {
+        "entries": entries,
+        "before_us_per_entry": round(legacy / entries * 1e6, 3),
+        "after_us_per_entry": round(fast / entries * 1e6, 3),
+        "speedup": round(legacy / fast, 1),
+        "payload_bytes": len(after),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeats", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    print(f"{'entries':>8} {'before us/entry':>16} {'after us/entry':>15} {'speedup':>8} {'bytes':>10}")
+    for entries in args.entries:
+        r = measure(entries, args.repeats)
+        print(f"{r['entries']:>8} {r['before_us_per_entry']:>16} {r['after_us_per_entry']:>15} {r['speedup']:>7}x {r['payload_bytes']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import json
+import unittest
+from app.core.broker import NOTIFY_PAYLOAD_LIMIT, notify_payload
+
+
+def _event(entries: int, collaborators: int = 3) -> dict:
+    return {
+        "project_id": 7,
+        "since": 41,
+        "changes": [{"entity": "project", "id": 7, "op": "upsert"}]
+        + [{"entity": "timeline_entry", "id": 100_000 + i, "op": "upsert"} for i in range(entries)],
+        "collaborators": [f"collaborator-{i}@example.com" for i in range(collaborators)],
+    }
+
+
+class NotifyPayloadTest(unittest.TestCase):
+    def test_small_event_is_relayed_in_full(self):
+        event = _event(10)
+        self.assertEqual(json.loads(notify_payload(event)), event)
+
+    def test_large_event_is_compacted_under_the_limit(self):
+        event = _event(400)
+        self.assertGreater(len(json.dumps(event)), NOTIFY_PAYLOAD_LIMIT)
+
+        payload = notify_payload(event)
+        self.assertLess(len(payload.encode()), NOTIFY_PAYLOAD_LIMIT)
+        compact = json.loads(payload)
+        self.assertTrue(compact["truncated"])
+        self.assertEqual(compact["project_id"], 7)
+        self.assertEqual(compact["since"], 41)
+        self.assertEqual(compact["changes"], [{"entity": "project", "id": 7, "op": "upsert"}])
+        self.assertEqual(compact["collaborators"], event["collaborators"])
+
+    def test_collaborators_are_dropped_when_they_do_not_fit(self):
+        payload = notify_payload(_event(400, collaborators=400))
+        self.assertLess(len(payload.encode()), NOTIFY_PAYLOAD_LIMIT)
+        self.assertNotIn("collaborators", json.loads(payload))
+
+
+if __name__ == "__main__":
+    unittest.main()